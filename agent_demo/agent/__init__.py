@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+"""Agent implementations for agent_demo."""
+from .parallel_react_agent import ParallelReActAgent
+
+__all__ = ["ParallelReActAgent"]
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""并发执行同一步中多个工具调用的 ReAct 智能体。"""
+from typing import Any
+
+from agentscope.agent import ReActAgent
+from agentscope.message import Msg
+
+
+class ParallelReActAgent(ReActAgent):
+    """同一步中的多个工具调用并发执行的 `ReActAgent`。
+
+    开启 `parallel_tool_calls` 后，ReActAgent 用 `asyncio.gather` 同时执行
+    模型在一步中发出的全部工具调用，但每个工具结果是在它执行完时写入
+    记忆的，顺序取决于谁先完成。本类在每次推理（以及最终总结）之前，
+    把最后一批工具结果按对应工具调用的顺序重新排列，保证提示词中的
+    工具结果顺序与模型发出调用的顺序一致、且每次运行都相同。
+
+    同步工具要真正并发，还需用 `tools.parallel.run_in_executor` 包装后再注册，
+    否则它们会在事件循环线程上依次执行；函数体内做同步 IO 的异步工具
+    用 `tools.parallel.run_coroutine_in_thread` 包装。
+
+    记忆需提供 `content` 列表（`InMemoryMemory`、`TokenWindowMemory` 均满足）。
+
+    被 `interrupt()` 打断时，进行中的模型请求和工具调用通过 asyncio 取消立即
+    停止（`execute_python_code_warm` 会同时 kill 正在执行的代码）。ReActAgent
+    默认会清空记忆；本类保留已经生成的推理内容和已完成的工具结果，下一轮
+    可以在此基础上继续，不必从头再来。
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        kwargs["parallel_tool_calls"] = True
+        super().__init__(*args, **kwargs)
+
+    async def _reasoning(self, *args: Any, **kwargs: Any) -> Msg:
+        await self._restore_tool_result_order()
+        return await super()._reasoning(*args, **kwargs)
+
+    async def _summarizing(self, *args: Any, **kwargs: Any) -> Msg:
+        await self._restore_tool_result_order()
+        return await super()._summarizing(*args, **kwargs)
+
+    async def handle_interrupt(self, *args: Any, **kwargs: Any) -> Msg:
+        """保留记忆（被打断前的推理和工具结果），只追加一条说明被打断的回复。"""
+        response_msg = Msg(
+            self.name,
+            "我的回复被打断了，已完成的步骤都保留着。需要我继续吗？",
+            "assistant",
+            metadata={"interrupted": True},
+        )
+        await self.print(response_msg, True)
+        await self.memory.add(response_msg)
+        return response_msg
+
+    async def _restore_tool_result_order(self) -> None:
+        stored: list[Msg] = self.memory.content
+        # 找到最后一条包含工具调用的消息，其后应全部是对应的工具结果
+        for call_index in range(len(stored) - 1, -1, -1):
+            if stored[call_index].has_content_blocks("tool_use"):
+                break
+        else:
+            return
+        order = {
+            block["id"]: position
+            for position, block in enumerate(stored[call_index].get_content_blocks("tool_use"))
+        }
+        results = stored[call_index + 1:]
+        result_ids = [_tool_result_id(msg) for msg in results]
+        if len(results) < 2 or any(result_id not in order for result_id in result_ids):
+            return
+        ordered = sorted(results, key=lambda msg: order[_tool_result_id(msg)])
+        if all(a is b for a, b in zip(ordered, results)):
+            return
+        await self.memory.delete(range(call_index + 1, len(stored)))
+        await self.memory.add(ordered)
+
+
+def _tool_result_id(msg: Msg) -> str | None:
+    """消息只包含一个工具结果时返回其调用 id，否则返回 None。"""
+    if isinstance(msg.content, str) or len(msg.content) != 1:
+        return None
+    block = msg.content[0]
+    return block.get("id") if block.get("type") == "tool_result" else None
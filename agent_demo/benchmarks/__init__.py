@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks and local stand-in services for agent_demo."""
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""离线的智能体编排压测：用 `ReplayChatModel` 回放模型响应，不需要网络。
+
+两个压测对象：
+
+- react：`ParallelReActAgent`，每轮先调用一次工具，再通过 `generate_response` 结束
+- custom：`customeAgent.MyAgent`，每轮一次模型调用
+
+默认先用一个脚本化的本地模型录制一轮对话到临时 cassette，再回放压测；
+`--cassette` 指定用真实模型录制的 cassette（例如
+`ReplayChatModel(path, model=DashScopeChatModel(...), mode="record")` 录下的）。
+每轮开始前清空记忆并重置回放进度，各轮的请求完全相同。
+
+`--ttft` / `--tokens-per-second` 模拟模型延迟；都不指定时不等待，测得的
+就是格式化、记忆、工具调度等编排本身的开销。
+
+用法（在 agent_demo 目录下）：
+
+    python -m benchmarks.bench_agent_replay --turns 200 --agents 1,8
+    python -m benchmarks.bench_agent_replay --variants react --ttft 0.3 --tokens-per-second 40
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Callable
+
+from agentscope.agent import AgentBase
+from agentscope.formatter import DashScopeChatFormatter
+from agentscope.memory import InMemoryMemory
+from agentscope.message import Msg, TextBlock
+from agentscope.model import ChatModelBase, ChatResponse
+from agentscope.tool import Toolkit, ToolResponse
+
+from agent import ParallelReActAgent
+from model import ReplayChatModel
+from model._compat import ChatUsage
+
+BENCH_QUESTION = "今天东莞长安镇天气如何？"
+BENCH_ANSWER = "东莞长安镇今天多云，气温 24 到 31 摄氏度，午后可能有阵雨，出门记得带伞。" * 3
+
+
+async def lookup_weather(city: str) -> ToolResponse:
+    """查询城市的天气。
+
+    Args:
+        city (str): 城市名
+    """
+    return ToolResponse(content=[TextBlock(type="text", text=f"{city}：多云，24~31℃，午后阵雨")])
+
+
+class _ScriptedModel(ChatModelBase):
+    """录制用的本地模型：带工具时先调用 `lookup_weather`，拿到结果后给出回答。"""
+
+    def __init__(self, stream: bool) -> None:
+        super().__init__("scripted", stream)
+
+    async def __call__(
+        self,
+        messages: list[dict],
+        tools: list[dict] | None = None,
+        **kwargs: Any,
+    ) -> ChatResponse | AsyncGenerator[ChatResponse, None]:
+        if not tools:
+            content = [{"type": "text", "text": BENCH_ANSWER}]
+        elif messages[-1].get("role") != "tool":
+            content = [
+                {
+                    "type": "tool_use",
+                    "id": "call_weather",
+                    "name": "lookup_weather",
+                    "input": {"city": "东莞长安镇"},
+                },
+            ]
+        else:
+            content = [
+                {
+                    "type": "tool_use",
+                    "id": "call_finish",
+                    "name": "generate_response",
+                    "input": {"response": BENCH_ANSWER},
+                },
+            ]
+        response = ChatResponse(
+            content=content,
+            usage=ChatUsage(input_tokens=200, output_tokens=len(BENCH_ANSWER), time=0.0),
+        )
+        if not self.stream:
+            return response
+
+        async def single_chunk() -> AsyncGenerator[ChatResponse, None]:
+            yield response
+
+        return single_chunk()
+
+
+def create_react_agent(model: ChatModelBase) -> AgentBase:
+    toolkit = Toolkit()
+    toolkit.register_tool_function(lookup_weather)
+    return ParallelReActAgent(
+        name="jarvis",
+        sys_prompt="你是一个人工智能助手。",
+        model=model,
+        formatter=DashScopeChatFormatter(),
+        toolkit=toolkit,
+        memory=InMemoryMemory(),
+    )
+
+
+def create_custom_agent(model: ChatModelBase) -> AgentBase:
+    from customeAgent import MyAgent
+
+    return MyAgent(model=model)
+
+
+AGENT_FACTORIES: dict[str, Callable[[ChatModelBase], AgentBase]] = {
+    "react": create_react_agent,
+    "custom": create_custom_agent,
+}
+
+
+@dataclass
+class ReplayBenchResult:
+    """一轮压测的统计结果。"""
+
+    variant: str
+    agents: int
+    turns: int
+    model_calls: int
+    wall_seconds: float
+    latencies: list[float]
+
+    @property
+    def turns_per_second(self) -> float:
+        return self.turns / self.wall_seconds if self.wall_seconds else 0.0
+
+    def percentile(self, q: int) -> float:
+        if len(self.latencies) == 1:
+            return self.latencies[0]
+        return statistics.quantiles(self.latencies, n=100, method="inclusive")[q - 1]
+
+
+async def record_cassette(variant: str, path: str, stream: bool) -> None:
+    """用脚本化模型跑一轮对话，把模型响应录制到 cassette。"""
+    model = ReplayChatModel(path, model=_ScriptedModel(stream), mode="record")
+    agent = AGENT_FACTORIES[variant](model)
+    _silence(agent)
+    await agent(Msg("user", BENCH_QUESTION, "user"))
+
+
+async def run_variant(
+    variant: str,
+    cassette: str,
+    num_agents: int,
+    turns: int,
+    replay_kwargs: dict[str, Any],
+) -> ReplayBenchResult:
+    """`num_agents` 个智能体并发，各自回放对话，共 `turns` 轮。"""
+    latencies: list[float] = []
+    models: list[ReplayChatModel] = []
+
+    async def worker(count: int) -> None:
+        # 压测只关心编排开销，请求细节对不上时按录制顺序回放
+        model = ReplayChatModel(cassette, mode="replay", strict=False, **replay_kwargs)
+        models.append(model)
+        agent = AGENT_FACTORIES[variant](model)
+        _silence(agent)
+        for _ in range(count):
+            await agent.memory.clear()
+            model.rewind()
+            start = time.perf_counter()
+            await agent(Msg("user", BENCH_QUESTION, "user"))
+            latencies.append(time.perf_counter() - start)
+
+    counts = [turns // num_agents + (i < turns % num_agents) for i in range(num_agents)]
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(count) for count in counts if count))
+    wall = time.perf_counter() - start
+    model_calls = sum(model.replayed for model in models)
+    return ReplayBenchResult(variant, num_agents, turns, model_calls, wall, latencies)
+
+
+def _silence(agent: AgentBase) -> None:
+    # 压测时不打印每条消息，避免控制台输出成为瓶颈
+    agent._disable_console_output = True
+
+
+def print_results(results: list[ReplayBenchResult]) -> None:
+    header = (
+        f"{'variant':<8}{'agents':>7}{'turns':>7}{'calls':>7}"
+        f"{'p50(ms)':>10}{'p95(ms)':>10}{'turns/s':>10}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r.variant:<8}{r.agents:>7}{r.turns:>7}{r.model_calls:>7}"
+            f"{r.percentile(50) * 1000:>10.2f}{r.percentile(95) * 1000:>10.2f}"
+            f"{r.turns_per_second:>10.1f}"
+        )
+
+
+async def run(args: argparse.Namespace) -> list[ReplayBenchResult]:
+    replay_kwargs = {
+        "stream": not args.no_stream,
+        "time_scale": args.time_scale,
+        "ttft": args.ttft,
+        "tokens_per_second": args.tokens_per_second,
+        "chunk_chars": args.chunk_chars,
+    }
+    levels = [int(n) for n in args.agents.split(",")]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for variant in args.variants.split(","):
+            if variant not in AGENT_FACTORIES:
+                raise ValueError(f"未知的压测对象：{variant}")
+            cassette = args.cassette
+            if cassette is None:
+                cassette = os.path.join(tmp_dir, f"{variant}.json")
+                await record_cassette(variant, cassette, replay_kwargs["stream"])
+            for num_agents in levels:
+                results.append(
+                    await run_variant(variant, cassette, num_agents, args.turns, replay_kwargs),
+                )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="离线的智能体编排压测")
+    parser.add_argument("--variants", default="react,custom", help="逗号分隔的压测对象")
+    parser.add_argument("--turns", type=int, default=100, help="每组的对话轮数")
+    parser.add_argument("--agents", default="1,8", help="逗号分隔的并发智能体数")
+    parser.add_argument("--cassette", default=None, help="回放指定的 cassette，不再录制")
+    parser.add_argument("--no-stream", action="store_true", help="以非流式方式回放")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="录制耗时的缩放倍数")
+    parser.add_argument("--ttft", type=float, default=None, help="模拟的首块耗时（秒）")
+    parser.add_argument(
+        "--tokens-per-second", type=float, default=None, help="模拟的生成速度"
+    )
+    parser.add_argument("--chunk-chars", type=int, default=16, help="流式回放时每块的字符数")
+    args = parser.parse_args()
+
+    print_results(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
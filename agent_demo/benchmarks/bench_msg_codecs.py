@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""Msg 编解码器基准测试。
+
+对 `message.codecs` 中注册的每个编解码器，分别在纯文本消息和带大块 base64
+媒体的消息上测量编码 / 解码速度和编码后的大小：
+
+- json：标准库，无额外依赖
+- orjson / msgpack：安装 `pip install -e ".[fast]"` 后可用
+- pickle5：媒体数据走带外缓冲区，只适用于可信的进程内 / 本机数据
+
+用法（在 agent_demo 目录下）：
+
+    python -m benchmarks.bench_msg_codecs --iterations 2000 --media-kb 256
+
+`--codecs json,pickle5` 只测指定的编解码器。
+"""
+import argparse
+import base64
+import os
+import statistics
+import time
+from dataclasses import dataclass
+
+from agentscope.message import Msg
+
+from message.codecs import MsgCodec, available_codecs, get_codec
+
+BENCH_TEXT = "你好，这是一条用于测试序列化性能的消息。" * 20
+
+
+@dataclass
+class CodecResult:
+    """一个编解码器在一种消息上的统计结果。"""
+
+    codec: str
+    message: str
+    encoded_bytes: int
+    encode_seconds: list[float]
+    decode_seconds: list[float]
+
+    @property
+    def encode_ops(self) -> float:
+        return 1 / statistics.median(self.encode_seconds)
+
+    @property
+    def decode_ops(self) -> float:
+        return 1 / statistics.median(self.decode_seconds)
+
+    @property
+    def encode_mb_s(self) -> float:
+        return self.encoded_bytes * self.encode_ops / 1024 / 1024
+
+    @property
+    def decode_mb_s(self) -> float:
+        return self.encoded_bytes * self.decode_ops / 1024 / 1024
+
+
+def build_messages(media_kb: int) -> dict[str, Msg]:
+    """构造纯文本消息和带一张图片、一段音频的媒体消息。"""
+    text_msg = Msg("Friday", BENCH_TEXT, "assistant")
+
+    def media_block(block_type: str, media_type: str) -> dict:
+        data = base64.b64encode(os.urandom(media_kb * 1024)).decode("ascii")
+        return {
+            "type": block_type,
+            "source": {"type": "base64", "media_type": media_type, "data": data},
+        }
+
+    media_msg = Msg(
+        "user",
+        [
+            {"type": "text", "text": BENCH_TEXT},
+            media_block("image", "image/png"),
+            media_block("audio", "audio/wav"),
+        ],
+        "user",
+    )
+    return {"text": text_msg, "media": media_msg}
+
+
+def bench_codec(codec: MsgCodec, label: str, msg: Msg, iterations: int) -> CodecResult:
+    """对一条消息重复编码、解码 `iterations` 次，并检查往返结果一致。"""
+    encoded = codec.encode(msg)
+    if codec.decode(encoded).to_dict() != msg.to_dict():
+        raise AssertionError(f"{codec.name} 编解码 {label} 消息后内容不一致")
+
+    encode_seconds = []
+    decode_seconds = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        encoded = codec.encode(msg)
+        encode_seconds.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        codec.decode(encoded)
+        decode_seconds.append(time.perf_counter() - start)
+    return CodecResult(codec.name, label, len(encoded), encode_seconds, decode_seconds)
+
+
+def print_results(results: list[CodecResult]) -> None:
+    header = (
+        f"{'codec':<10}{'message':<9}{'bytes':>11}"
+        f"{'enc ops/s':>12}{'enc MB/s':>10}{'dec ops/s':>12}{'dec MB/s':>10}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r.codec:<10}{r.message:<9}{r.encoded_bytes:>11}"
+            f"{r.encode_ops:>12.0f}{r.encode_mb_s:>10.1f}"
+            f"{r.decode_ops:>12.0f}{r.decode_mb_s:>10.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Msg 编解码器基准测试")
+    parser.add_argument("--iterations", type=int, default=1000, help="每组测量的重复次数")
+    parser.add_argument("--media-kb", type=int, default=256, help="每个媒体块的原始大小（KB）")
+    parser.add_argument(
+        "--codecs", default=None, help="逗号分隔的编解码器，默认测试全部已注册的"
+    )
+    args = parser.parse_args()
+
+    names = args.codecs.split(",") if args.codecs else available_codecs()
+    messages = build_messages(args.media_kb)
+    results = []
+    for name in names:
+        codec = get_codec(name)
+        for label, msg in messages.items():
+            # 媒体消息更大，减少重复次数以控制总耗时
+            iterations = args.iterations if label == "text" else max(args.iterations // 20, 10)
+            results.append(bench_codec(codec, label, msg, iterations))
+
+    print(f"已注册的编解码器：{', '.join(available_codecs())}")
+    print_results(results)
+
+
+if __name__ == "__main__":
+    main()
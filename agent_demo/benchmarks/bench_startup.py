@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""启动导入耗时基准测试。
+
+在全新的解释器中用 `python -X importtime` 执行若干导入语句，统计每条语句
+的总导入耗时（多次取中位数），并列出累计耗时最多的模块，用来确认一次
+短命的调用只为它真正用到的子模块付出导入代价。
+
+默认场景成对出现：通过包的延迟导入层只取一个名字，与导入该包的全部
+子模块对比。只有 `tools` 和 `model` 使用延迟导入：前者只用
+`python_exec` 时省掉 httpx、requests，后者只用 `metrics` 时省掉整个
+agentscope。其余的包都离不开 agentscope，而 agentscope 的 `__init__` 会
+立即导入它的全部子模块，延迟导入省不下什么，保持普通导入。
+
+用法（在 agent_demo 目录下）：
+
+    python -m benchmarks.bench_startup --repeat 5 --top 10
+
+`--statement "from tools import gpt_sovits_text_to_audio"` 只测指定的语句（可重复）。
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+DEFAULT_STATEMENTS = [
+    "import agentscope",
+    "from tools import execute_python_code_warm",
+    "import tools.gpt_sovits_tts, tools.python_exec",
+    "from model import ReplyMetrics",
+    "import model.cached_model, model.embedding, model.metrics, model.replay",
+]
+
+
+@dataclass
+class ImportProfile:
+    """一条导入语句的统计结果。"""
+
+    statement: str
+    totals_us: list[int]
+    modules: int
+    top: list[tuple[int, str]]
+    error: str | None = None
+
+    @property
+    def median_ms(self) -> float:
+        return statistics.median(self.totals_us) / 1000 if self.totals_us else float("nan")
+
+
+def profile_statement(statement: str, repeat: int, top: int) -> ImportProfile:
+    """在 `repeat` 个全新的解释器中执行导入语句，解析 `-X importtime` 的输出。"""
+    totals = []
+    cumulative: dict[str, list[int]] = {}
+    modules = 0
+    # 第一次运行会编译并写入 .pyc，不计入结果
+    for i in range(repeat + 1):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", statement],
+            cwd=PROJECT_DIR,
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "失败"
+            return ImportProfile(statement, [], 0, [], error)
+        if i == 0:
+            continue
+        rows = _parse_importtime(proc.stderr)
+        # 顶层模块（缩进最少）的累计耗时之和即这条语句的总导入耗时
+        totals.append(sum(cum for cum, name in rows if not name.startswith(" ")))
+        modules = len(rows)
+        for cum, name in rows:
+            cumulative.setdefault(name.strip(), []).append(cum)
+    ranked = sorted(
+        ((int(statistics.median(values)), name) for name, values in cumulative.items()),
+        reverse=True,
+    )
+    return ImportProfile(statement, totals, modules, ranked[:top])
+
+
+def _parse_importtime(stderr: str) -> list[tuple[int, str]]:
+    """解析 `import time: self [us] | cumulative | imported package` 格式的行。"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        # 名字前的缩进表示嵌套层级，第一个空格是分隔符
+        rows.append((int(cumulative), name[1:]))
+    return rows
+
+
+def print_results(results: list[ImportProfile], show_top: bool) -> None:
+    header = f"{'statement':<64}{'median(ms)':>12}{'modules':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        if r.error:
+            print(f"{r.statement:<64}{'error':>12}  {r.error}")
+            continue
+        print(f"{r.statement:<64}{r.median_ms:>12.1f}{r.modules:>9}")
+    if not show_top:
+        return
+    for r in results:
+        if r.top:
+            print(f"\n{r.statement}")
+            for cumulative_us, name in r.top:
+                print(f"  {cumulative_us / 1000:>8.1f} ms  {name}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="启动导入耗时基准测试")
+    parser.add_argument("--repeat", type=int, default=5, help="每条语句重复的次数（取中位数）")
+    parser.add_argument("--top", type=int, default=8, help="列出累计耗时最多的模块数，0 表示不列出")
+    parser.add_argument(
+        "--statement", action="append", default=None, help="要测试的导入语句，可重复指定"
+    )
+    args = parser.parse_args()
+
+    statements = args.statement or DEFAULT_STATEMENTS
+    results = [profile_statement(s, args.repeat, args.top) for s in statements]
+    print_results(results, args.top > 0)
+
+
+if __name__ == "__main__":
+    main()
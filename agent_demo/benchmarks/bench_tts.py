@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""GPT-SoVITS TTS 工具压测。
+
+在本地模拟服务上分别压测三种调用方式，并在不同并发度下统计
+p50 / p95 / p99 延迟、吞吐量和内存峰值：
+
+- sync：每次调用直接 `requests.post`，不复用连接（工具最初的实现方式）
+- pooled：同步工具 `gpt_sovits_text_to_audio`，共享连接池
+- async：异步工具 `gpt_sovits_text_to_audio_async`，基于 httpx
+
+用法（在 agent_demo 目录下）：
+
+    python -m benchmarks.bench_tts --requests 200 --concurrency 1,4,16 --latency 0.05
+
+传入 `--api-url` 时压测指定的服务（例如真实的 GPT-SoVITS），不再启动模拟服务。
+"""
+import argparse
+import asyncio
+import base64
+import statistics
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable
+
+import requests
+from agentscope.message import AudioBlock
+from agentscope.tool import ToolResponse
+
+from benchmarks.fake_tts_server import FakeTTSConfig, start_fake_server
+from tools.gpt_sovits_tts import gpt_sovits_text_to_audio, gpt_sovits_text_to_audio_async
+from tools.tts_async_client import AsyncGPTSoVITSClient, set_default_async_client
+from tools.tts_client import GPTSoVITSClient, set_default_client
+
+BENCH_TEXT = "你好，这是一次语音合成压测。"
+BENCH_REF_AUDIO = "bench_ref.wav"
+BENCH_PROMPT_TEXT = "压测用参考音频"
+
+
+@dataclass
+class BenchResult:
+    """一轮压测的统计结果。"""
+
+    variant: str
+    concurrency: int
+    requests: int
+    errors: int
+    wall_seconds: float
+    latencies: list[float]
+    peak_memory_mb: float | None
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / self.wall_seconds if self.wall_seconds else 0.0
+
+    def percentile(self, q: float) -> float:
+        if not self.latencies:
+            return float("nan")
+        if len(self.latencies) == 1:
+            return self.latencies[0]
+        return statistics.quantiles(self.latencies, n=100, method="inclusive")[int(q) - 1]
+
+
+def _bare_requests_tts(api_url: str) -> ToolResponse:
+    """复现工具最初的实现：每次请求都新建连接。"""
+    response = requests.post(
+        f"{api_url}/tts",
+        json={
+            "text": BENCH_TEXT,
+            "text_lang": "zh",
+            "ref_audio_path": BENCH_REF_AUDIO,
+            "prompt_text": BENCH_PROMPT_TEXT,
+            "prompt_lang": "zh",
+        },
+        timeout=60,
+    )
+    response.raise_for_status()
+    return ToolResponse(
+        content=[
+            AudioBlock(
+                type="audio",
+                source={
+                    "type": "base64",
+                    "media_type": "audio/wav",
+                    "data": base64.b64encode(response.content).decode("utf-8"),
+                },
+            )
+        ],
+    )
+
+
+def _pooled_tts(api_url: str) -> ToolResponse:
+    return gpt_sovits_text_to_audio(
+        text=BENCH_TEXT,
+        ref_audio_path=BENCH_REF_AUDIO,
+        prompt_text=BENCH_PROMPT_TEXT,
+        api_url=api_url,
+        use_cache=False,
+        split_sentences=False,
+    )
+
+
+async def _async_tts(api_url: str) -> ToolResponse:
+    return await gpt_sovits_text_to_audio_async(
+        text=BENCH_TEXT,
+        ref_audio_path=BENCH_REF_AUDIO,
+        prompt_text=BENCH_PROMPT_TEXT,
+        api_url=api_url,
+        use_cache=False,
+        split_sentences=False,
+    )
+
+
+def _is_error(response: ToolResponse) -> bool:
+    return response.content[0]["type"] != "audio"
+
+
+def run_sync_variant(
+    name: str,
+    func: Callable[[str], ToolResponse],
+    api_url: str,
+    num_requests: int,
+    concurrency: int,
+    trace_memory: bool,
+) -> BenchResult:
+    """用线程池并发执行同步调用。"""
+    def one_call(_: int) -> tuple[float, bool]:
+        start = time.perf_counter()
+        try:
+            failed = _is_error(func(api_url))
+        except Exception:
+            failed = True
+        return time.perf_counter() - start, failed
+
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(one_call, range(num_requests)))
+    wall = time.perf_counter() - start
+    peak = _stop_tracing() if trace_memory else None
+    latencies = [latency for latency, _ in outcomes]
+    errors = sum(failed for _, failed in outcomes)
+    return BenchResult(name, concurrency, num_requests, errors, wall, latencies, peak)
+
+
+def run_async_variant(
+    api_url: str,
+    num_requests: int,
+    concurrency: int,
+    trace_memory: bool,
+) -> BenchResult:
+    """用 asyncio 并发执行异步工具。"""
+    async def run_all() -> list[tuple[float, bool]]:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one_call() -> tuple[float, bool]:
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    failed = _is_error(await _async_tts(api_url))
+                except Exception:
+                    failed = True
+                return time.perf_counter() - start, failed
+
+        return await asyncio.gather(*(one_call() for _ in range(num_requests)))
+
+    set_default_async_client(
+        AsyncGPTSoVITSClient(max_concurrency=concurrency, pool_size=concurrency)
+    )
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    outcomes = asyncio.run(run_all())
+    wall = time.perf_counter() - start
+    peak = _stop_tracing() if trace_memory else None
+    latencies = [latency for latency, _ in outcomes]
+    errors = sum(failed for _, failed in outcomes)
+    return BenchResult("async", concurrency, num_requests, errors, wall, latencies, peak)
+
+
+def _stop_tracing() -> float:
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def print_results(results: list[BenchResult]) -> None:
+    header = (
+        f"{'variant':<8}{'conc':>6}{'reqs':>7}{'errors':>8}"
+        f"{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'req/s':>10}{'peakMB':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        peak = f"{r.peak_memory_mb:.1f}" if r.peak_memory_mb is not None else "-"
+        print(
+            f"{r.variant:<8}{r.concurrency:>6}{r.requests:>7}{r.errors:>8}"
+            f"{r.percentile(50) * 1000:>10.1f}{r.percentile(95) * 1000:>10.1f}"
+            f"{r.percentile(99) * 1000:>10.1f}{r.throughput:>10.1f}{peak:>9}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="GPT-SoVITS TTS 工具压测")
+    parser.add_argument("--requests", type=int, default=100, help="每轮请求数")
+    parser.add_argument("--concurrency", default="1,4,16", help="逗号分隔的并发度列表")
+    parser.add_argument(
+        "--variants", default="sync,pooled,async", help="逗号分隔的压测对象"
+    )
+    parser.add_argument("--api-url", default=None, help="压测已有服务，不启动模拟服务")
+    parser.add_argument("--latency", type=float, default=0.05, help="模拟服务固定延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="模拟服务随机延迟（秒）")
+    parser.add_argument("--audio-seconds", type=float, default=2.0, help="模拟音频时长")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="模拟服务返回 503 的概率")
+    parser.add_argument(
+        "--no-memory", action="store_true", help="不统计内存（tracemalloc 会拖慢执行）"
+    )
+    args = parser.parse_args()
+
+    server = None
+    api_url = args.api_url
+    if api_url is None:
+        server, api_url = start_fake_server(
+            FakeTTSConfig(
+                latency=args.latency,
+                jitter=args.jitter,
+                audio_seconds=args.audio_seconds,
+                error_rate=args.error_rate,
+            )
+        )
+        print(f"使用模拟服务 {api_url}")
+
+    levels = [int(c) for c in args.concurrency.split(",")]
+    variants = args.variants.split(",")
+    trace_memory = not args.no_memory
+    results = []
+    try:
+        for concurrency in levels:
+            for variant in variants:
+                if variant == "sync":
+                    result = run_sync_variant(
+                        "sync", _bare_requests_tts, api_url,
+                        args.requests, concurrency, trace_memory,
+                    )
+                elif variant == "pooled":
+                    set_default_client(GPTSoVITSClient(pool_size=max(concurrency, 1)))
+                    result = run_sync_variant(
+                        "pooled", _pooled_tts, api_url,
+                        args.requests, concurrency, trace_memory,
+                    )
+                elif variant == "async":
+                    result = run_async_variant(
+                        api_url, args.requests, concurrency, trace_memory,
+                    )
+                else:
+                    raise ValueError(f"未知的压测对象：{variant}")
+                results.append(result)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    print_results(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""本地模拟的 GPT-SoVITS `/tts` 服务，用于在没有真实模型的机器上压测 TTS 工具。
+
+直接运行即可启动：
+
+    python -m benchmarks.fake_tts_server --port 9880 --latency 0.5 --audio-seconds 3
+
+服务只实现 `/tts` 接口：按配置的延迟等待后返回一段静音 WAV，
+请求体中 `streaming_mode` 为真时以分块方式逐段返回。
+"""
+import argparse
+import io
+import json
+import random
+import threading
+import time
+import wave
+from dataclasses import dataclass
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+@dataclass
+class FakeTTSConfig:
+    """模拟服务的行为配置。
+
+    Attributes:
+        latency (float): 每个请求返回前的固定等待时间（秒）
+        jitter (float): 在固定延迟基础上叠加的随机延迟上限（秒）
+        audio_seconds (float): 返回音频的时长，决定响应体大小
+        sample_rate (int): 返回音频的采样率
+        stream_chunks (int): 流式模式下把音频分成多少块发送
+        error_rate (float): 以该概率返回 503，用于验证重试与熔断
+    """
+
+    latency: float = 0.2
+    jitter: float = 0.0
+    audio_seconds: float = 2.0
+    sample_rate: int = 32000
+    stream_chunks: int = 8
+    error_rate: float = 0.0
+
+
+@lru_cache(maxsize=8)
+def make_silent_wav(seconds: float, sample_rate: int) -> bytes:
+    """生成指定时长的 16bit 单声道静音 WAV。"""
+    output = io.BytesIO()
+    with wave.open(output, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(sample_rate)
+        writer.writeframes(b"\x00\x00" * int(seconds * sample_rate))
+    return output.getvalue()
+
+
+class FakeTTSHandler(BaseHTTPRequestHandler):
+    """处理 `/tts` 请求的 handler，配置通过 `server.config` 读取。"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        if self.path.split("?")[0] != "/tts":
+            self._send_json(404, {"message": "not found"})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"message": "invalid json"})
+            return
+        if not payload.get("text"):
+            self._send_json(400, {"message": "text is required"})
+            return
+
+        config: FakeTTSConfig = self.server.config
+        time.sleep(config.latency + random.uniform(0, config.jitter))
+        if random.random() < config.error_rate:
+            self._send_json(503, {"message": "injected failure"})
+            return
+        audio = make_silent_wav(config.audio_seconds, config.sample_rate)
+
+        if payload.get("streaming_mode"):
+            self._send_chunked(audio, config)
+        else:
+            self.send_response(200)
+            self.send_header("Content-Type", "audio/wav")
+            self.send_header("Content-Length", str(len(audio)))
+            self.end_headers()
+            self.wfile.write(audio)
+
+    def _send_chunked(self, audio: bytes, config: FakeTTSConfig) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/wav")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        chunk_size = max(1, -(-len(audio) // config.stream_chunks))
+        for start in range(0, len(audio), chunk_size):
+            chunk = audio[start:start + chunk_size]
+            self.wfile.write(f"{len(chunk):X}\r\n".encode() + chunk + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args) -> None:
+        # 压测时每个请求一行日志会严重拖慢服务，默认静默
+        pass
+
+
+def start_fake_server(
+    config: FakeTTSConfig | None = None,
+    host: str = "127.0.0.1",
+    port: int = 0,
+) -> tuple[ThreadingHTTPServer, str]:
+    """在后台线程中启动模拟服务。
+
+    Args:
+        config (FakeTTSConfig | None, optional): 服务行为配置
+        host (str, optional): 监听地址
+        port (int, optional): 监听端口，为 0 时由系统分配空闲端口
+
+    Returns:
+        tuple[ThreadingHTTPServer, str]: 服务对象和可直接作为 `api_url` 的地址，
+            用完后调用 `server.shutdown()` 关闭
+    """
+    server = ThreadingHTTPServer((host, port), FakeTTSHandler)
+    server.daemon_threads = True
+    server.config = config or FakeTTSConfig()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="模拟 GPT-SoVITS /tts 服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9880)
+    parser.add_argument("--latency", type=float, default=0.2, help="固定延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="随机延迟上限（秒）")
+    parser.add_argument("--audio-seconds", type=float, default=2.0, help="返回音频时长")
+    parser.add_argument("--sample-rate", type=int, default=32000)
+    parser.add_argument("--stream-chunks", type=int, default=8)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回 503 的概率")
+    args = parser.parse_args()
+
+    config = FakeTTSConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        audio_seconds=args.audio_seconds,
+        sample_rate=args.sample_rate,
+        stream_chunks=args.stream_chunks,
+        error_rate=args.error_rate,
+    )
+    server = ThreadingHTTPServer((args.host, args.port), FakeTTSHandler)
+    server.daemon_threads = True
+    server.config = config
+    print(f"模拟 GPT-SoVITS 服务已启动：http://{args.host}:{args.port} ({config})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,9 @@ from agentscope.model import DashScopeChatModel
 import asyncio
 import os
 
-from agentscope.tool import Toolkit, execute_python_code
+from agentscope.tool import Toolkit
+from model import DEFAULT_CACHE_PATH, CachedChatModel
+from tools import execute_python_code_warm
 
 # 加载配置
 load_dotenv()
@@ -18,17 +20,20 @@ async def create_chat_agent() -> None:
     """创建ReAct 智能体并执行一个简单的任务"""
     # 工具准备
     toolKit = Toolkit()
-    toolKit.register_tool_function(execute_python_code)
+    toolKit.register_tool_function(execute_python_code_warm)
 
     # 创建智能体
     jarvis = ReActAgent(
         name="Jarvis",
         sys_prompt="你是一个名为Jarvis的助手",
-        model=DashScopeChatModel(
-            model_name="qwen-max",
-            api_key=os.environ["DASHSCOPE_API_KEY"],
-            stream=True,
-            enable_thinking=False
+        model=CachedChatModel(
+            DashScopeChatModel(
+                model_name="qwen-max",
+                api_key=os.environ["DASHSCOPE_API_KEY"],
+                stream=True,
+                enable_thinking=False
+            ),
+            persist_path=DEFAULT_CACHE_PATH,
         ),
         formatter=DashScopeChatFormatter(),
         toolkit=toolKit,
@@ -1,67 +1,167 @@
 import asyncio
 import os
+from collections import deque
 from typing import Any
 from dotenv import load_dotenv
 from agentscope.agent import AgentBase
 from agentscope.formatter import DashScopeChatFormatter
-from agentscope.memory import InMemoryMemory
-from agentscope.message import Msg
-from agentscope.model import DashScopeChatModel
+from agentscope.message import Msg, TextBlock
+from agentscope.model import ChatModelBase, DashScopeChatModel
+
+from formatter import IncrementalFormatter
+from memory import TokenWindowMemory, estimate_tokens
+from message import get_default_blob_store
+from model import (
+    DEFAULT_CACHE_PATH,
+    CachedChatModel,
+    ReplyMetrics,
+    summarize_metrics,
+)
+
+
+# 被打断后，用户发送这些内容（或不带消息调用）表示让 Agent 接着上次的回复继续
+CONTINUE_COMMANDS = {"继续", "接着说", "continue", "go on"}
+# 最多保留最近多少次回复的耗时统计
+MAX_REPLY_METRICS = 1000
 
 
 class MyAgent(AgentBase):
-    def __init__(self) -> None:
+    # observe 可以直接接收 BroadcastHub 共享的消息元组
+    accepts_msg_batch = True
+
+    def __init__(
+        self,
+        stream: bool = True,
+        model: ChatModelBase | None = None,
+        cache_ttl: float | None = None,
+    ) -> None:
+        """
+        Args:
+            stream: 是否流式调用模型，流式时每收到一块内容就打印一次
+            model: 自定义模型，默认使用 qwen-max；传入时以其 stream 属性为准
+            cache_ttl: 默认模型的响应缓存有效期（秒），None（默认）时不缓存。
+                天气、新闻这类答案随时间变化的问题不要开启，或只设几分钟
+        """
         super().__init__()
         self.name = "Friday"
         self.sys_prompt = "你是一个名为Friday的助手"
-        self.model = DashScopeChatModel(
-            model_name="qwen-max",
-            api_key=os.environ["DASHSCOPE_API_KEY"],
-            stream=False
-        )
-        self.formatter = DashScopeChatFormatter()
-        self.memory = InMemoryMemory()
+        # 系统提示消息只创建一次，保持 id 不变才能命中格式化缓存
+        self.sys_msg = Msg("system", self.sys_prompt, "system")
+        if model is None:
+            model = DashScopeChatModel(
+                model_name="qwen-max",
+                api_key=os.environ["DASHSCOPE_API_KEY"],
+                stream=stream
+            )
+            if cache_ttl is not None:
+                # 有效期内完全相同的请求直接返回缓存的回复，不再请求模型
+                # （语义层默认关闭：字面相近的问题可能含义不同，例如「今天」和「明天」）
+                model = CachedChatModel(model, ttl=cache_ttl, persist_path=DEFAULT_CACHE_PATH)
+        self.model = model
+        # 缓存每条消息的格式化结果，每轮只格式化新增的消息
+        self.formatter = IncrementalFormatter(DashScopeChatFormatter())
+        # 只保留 token 预算内的最近对话，避免提示词随轮数无限增长
+        # 图片、音频等大块数据移到磁盘，记忆里只保留文件引用
+        self.memory = TokenWindowMemory(max_tokens=4000, blob_store=get_default_blob_store())
+        # 最近若干次回复的首 token 时间、总耗时和生成速度，长期运行也不会无限增长
+        self.reply_metrics: deque[ReplyMetrics] = deque(maxlen=MAX_REPLY_METRICS)
+        # 正在生成的回复，被打断时保存其中已生成的部分
+        self._partial_msg: Msg | None = None
+        # 上一次被打断的回复（已写入记忆），下一轮可以接着它继续生成
+        self.interrupted_msg: Msg | None = None
 
     async def reply(self, msg: Msg | list[Msg] | None) -> Msg:
         """
         Agent 的核心响应方法
         agent 的核心逻辑方法，会根据输入生成响应消息。所有子类都需要实现这个方法，用于处理输入并生产回复
+
+        上一次回复被打断时，若 msg 为 None 或是「继续」之类的指令，则以已生成的
+        内容为前缀让模型接着写，不从头重新生成。续写依赖 DashScope 的 partial
+        模式，其他模型按普通的新消息处理，被打断的回复留在上下文中
         """
-        await self.memory.add(msg)
+        prefix = ""
+        if (
+            self.interrupted_msg is not None
+            and _is_continue_request(msg)
+            and _supports_partial(self.model)
+        ):
+            history = await self.memory.get_memory()
+            # 之后又收到了其他消息时无法续写，按新问题处理；
+            # 记忆可能返回重新加载的副本，按 id 比较
+            if history and history[-1].id == self.interrupted_msg.id:
+                prefix = self.interrupted_msg.get_text_content() or ""
+        if not prefix:
+            # 开始新的问题，被打断的回复作为普通上下文留在记忆里
+            self.interrupted_msg = None
+            await self.memory.add(msg)
+            history = await self.memory.get_memory()
 
         # 准备提示词
         prompt = await self.formatter.format(
             [
-                Msg("system", self.sys_prompt, "system"),
-                *await self.memory.get_memory()
+                self.sys_msg,
+                *history
             ],
         )
+        if prefix:
+            # 记忆中最后一条就是被打断的回复，用 DashScope 的 partial 模式从它的末尾续写
+            prompt[-1] = {"role": "assistant", "content": prefix, "partial": True}
 
         # 调用模型
+        metrics = ReplyMetrics(stream=self.model.stream)
+        self.reply_metrics.append(metrics)
         response = await self.model(prompt)
 
         msg = Msg(
             name=self.name,
-            content=response.content,
+            content=[],
             role="assistant",
         )
-
-        # 在记忆中记录响应
+        self._partial_msg = msg
+        cancelled = False
+        try:
+            if self.model.stream:
+                # 流式响应的每一块都是截至目前的完整内容，边收边打印同一条消息
+                usage = None
+                async for chunk in response:
+                    metrics.on_chunk()
+                    msg.content = _prepend_text(prefix, chunk.content)
+                    usage = chunk.usage
+                    await self.print(msg, False)
+            else:
+                metrics.on_chunk()
+                msg.content = _prepend_text(prefix, response.content)
+                usage = response.usage
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            # 被打断时留给 handle_interrupt 取走，其他情况（包括模型报错）都清空
+            if not cancelled:
+                self._partial_msg = None
+        metrics.finish(usage.output_tokens if usage else estimate_tokens(msg))
+
+        # 在记忆中记录响应，续写完成后用完整的回复替换被打断的那一段
+        await self._discard_interrupted()
         await self.memory.add(msg)
 
         # 打印消息
-        await self.print(msg)
+        await self.print(msg, True)
         return msg
 
-    async def observe(self, msg: Msg | list[Msg] | None) -> Msg:
+    async def observe(self, msg: Msg | list[Msg] | tuple[Msg, ...] | None) -> None:
         """
         被动接受消息
         作用：让 Agent 被动接收消息但不产生回复。这用于以下场景：
           - 订阅模式：Agent 作为订阅者，监听其他 Agent 的输出
           - 多 Agent 协作：通过 MsgHub，一个 Agent 的回复会广播给所有订阅者的 observe 方法
           - 仅观察：需要感知信息但不响应的情况
+        广播来的消息批次（列表或 BroadcastHub 共享的元组）一次性写入记忆，
+        已有的消息（例如自己的回复）按 id 跳过
         """
-        await self.memory.add(msg)
+        if msg is None:
+            return
+        await self.memory.add_many((msg,) if isinstance(msg, Msg) else msg)
 
     async def handle_interrupt(
             self,
@@ -71,13 +171,65 @@ class MyAgent(AgentBase):
         """
         处理中断
         作用：当 Agent 的回复过程被中断时的处理逻辑。
+
+        调用 `interrupt()` 会取消正在执行的 reply 任务，进行中的模型流式请求随之
+        被取消。已经生成的内容不会丢弃：它被标记为 interrupted 写入记忆，下一轮
+        发送「继续」即可从中断处接着生成，节省重新生成的时间和 token
         """
-        # 以固定响应为例
-        return Msg(
-            name=self.name,
-            content="我注意到您打断了我的回复，我能为你做些什么？",
-            role="assistant",
-        )
+        partial, self._partial_msg = self._partial_msg, None
+        if partial is None or not partial.get_text_content():
+            return Msg(
+                name=self.name,
+                content="我注意到您打断了我的回复，我能为你做些什么？",
+                role="assistant",
+            )
+
+        # 再次续写时被打断：新的部分已包含之前的内容，替换掉旧的那一段
+        await self._discard_interrupted()
+        partial.metadata = {**(partial.metadata or {}), "interrupted": True}
+        await self.memory.add(partial)
+        self.interrupted_msg = partial
+        await self.print(partial, True)
+        return partial
+
+    async def _discard_interrupted(self) -> None:
+        """从记忆中移除上一次被打断的回复（已被窗口移出时跳过）。"""
+        interrupted, self.interrupted_msg = self.interrupted_msg, None
+        if interrupted is None:
+            return
+        for index, stored in enumerate(self.memory.content):
+            if stored.id == interrupted.id:
+                await self.memory.delete(index)
+                return
+
+
+def _is_continue_request(msg: Msg | list[Msg] | None) -> bool:
+    if msg is None:
+        return True
+    if not isinstance(msg, Msg):
+        return False
+    return (msg.get_text_content() or "").strip().lower() in CONTINUE_COMMANDS
+
+
+def _supports_partial(model: ChatModelBase | None) -> bool:
+    """模型（或被缓存、回放包装的模型）是否支持 DashScope 的 partial 续写。"""
+    while model is not None:
+        if isinstance(model, DashScopeChatModel):
+            return True
+        model = getattr(model, "model", None)
+    return False
+
+
+def _prepend_text(prefix: str, content: list[dict]) -> list[dict]:
+    """把被打断时已生成的文本接到续写内容的第一个文本块前面。"""
+    if not prefix:
+        return content
+    blocks = list(content)
+    for i, block in enumerate(blocks):
+        if block.get("type") == "text":
+            blocks[i] = {**block, "text": prefix + block.get("text", "")}
+            return blocks
+    return [TextBlock(type="text", text=prefix), *blocks]
 
 
 # 加载配置
@@ -92,6 +244,8 @@ async def run_custom_agent() -> None:
         role="user",
     )
     await agent(msg)
+    print(summarize_metrics(agent.reply_metrics))
 
 
-asyncio.run(run_custom_agent())
+if __name__ == "__main__":
+    asyncio.run(run_custom_agent())
@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+"""Formatter wrappers for agent_demo."""
+from .incremental import IncrementalFormatter
+
+__all__ = ["IncrementalFormatter"]
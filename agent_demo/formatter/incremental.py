@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""增量格式化：缓存每条消息的格式化结果，只格式化新出现的消息。"""
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any
+
+from agentscope.formatter import FormatterBase
+from agentscope.message import Msg
+
+
+class IncrementalFormatter(FormatterBase):
+    """为聊天类 formatter 加上按消息缓存的包装器。
+
+    Agent 每轮都会把「系统提示 + 全部记忆」交给 formatter，而其中绝大部分
+    消息上一轮已经格式化过。本包装器以消息 id 为键缓存每条消息单独格式化
+    的结果，并记住当时的 `content` 对象及其内容指纹（各 block 序列化后的
+    哈希）；下次遇到同一条、内容未被替换、追加或原地修改的消息时直接复用，
+    只有新消息才会调用内部 formatter。
+    每轮的格式化开销因此只与新增消息数有关，记忆窗口滑动、插入摘要
+    也不影响已缓存的消息。
+
+    仅适用于「整体结果 = 各条消息结果依次拼接」的 formatter，例如
+    `DashScopeChatFormatter`、`OpenAIChatFormatter`；会把多条消息合并成
+    一段对话历史的 MultiAgent formatter 不能使用。
+
+    Args:
+        formatter (FormatterBase): 实际执行格式化的 formatter
+        max_entries (int, optional): 最多缓存多少条消息的格式化结果
+    """
+
+    def __init__(self, formatter: FormatterBase, max_entries: int = 4096) -> None:
+        super().__init__()
+        self.formatter = formatter
+        self.max_entries = max_entries
+        self._cache: OrderedDict[str, tuple[Any, bytes | None, list[dict]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def format(self, msgs: list[Msg], **kwargs: Any) -> list[dict]:
+        """格式化消息列表，已缓存的消息直接复用上次的结果。"""
+        if kwargs:
+            # 带额外参数的调用结果可能随参数变化，不走缓存
+            return await self.formatter.format(msgs, **kwargs)
+
+        formatted: list[dict] = []
+        for msg in msgs:
+            entry = self._cache.get(msg.id)
+            fingerprint = _fingerprint(msg.content)
+            if (
+                entry is not None
+                and entry[0] is msg.content
+                and entry[1] == fingerprint
+            ):
+                self._cache.move_to_end(msg.id)
+                self.hits += 1
+                parts = entry[2]
+            else:
+                self.misses += 1
+                parts = await self.formatter.format([msg])
+                # 同时保存 content 对象本身和指纹：用于判断内容是否被替换或修改，
+                # 并保证该对象在缓存期间不会被回收、id 不会被复用
+                self._cache[msg.id] = (msg.content, fingerprint, parts)
+                if len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+            # 浅拷贝一层，调用方修改返回的 dict 不会污染缓存
+            formatted.extend(dict(part) for part in parts)
+        return formatted
+
+    def clear(self) -> None:
+        """清空缓存。"""
+        self._cache.clear()
+
+
+def _fingerprint(content: Any) -> bytes | None:
+    """content 的内容指纹；字符串不可变，比较对象本身即可，返回 None。"""
+    if isinstance(content, str):
+        return None
+    raw = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).digest()
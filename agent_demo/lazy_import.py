@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""包级别的延迟导入：首次访问某个名字时才导入定义它的子模块（PEP 562）。"""
+import importlib
+from typing import Any, Callable
+
+
+def attach(
+    package_name: str,
+    submodule_attrs: dict[str, list[str]],
+) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """为包生成延迟导入用的 `__getattr__` 和 `__dir__`。
+
+    在包的 `__init__.py` 中使用：
+
+        __getattr__, __dir__ = attach(__name__, {
+            "gpt_sovits_tts": ["gpt_sovits_text_to_audio"],
+            "python_exec": ["execute_python_code_warm"],
+        })
+
+    `from tools import execute_python_code_warm` 只会导入 `tools.python_exec`，
+    `gpt_sovits_tts` 及其依赖（httpx、requests）在用到之前都不会被导入。
+    导入后的对象写回包的命名空间，之后的访问不再经过 `__getattr__`。子模块
+    本身（例如 `tools.python_exec`）仍然可以照常直接导入。
+
+    只在子模块的依赖确实很重、并且常常只用到其中一部分的包里使用；
+    `benchmarks/bench_startup.py` 可以测出实际节省的导入耗时。包中还应在
+    `if TYPE_CHECKING:` 下写出对应的普通导入语句，并在 `__all__` 中列出
+    这些名字，让 IDE、类型检查器和 ruff 都能看到它们。
+
+    Args:
+        package_name (str): 包名，即 `__init__.py` 中的 `__name__`
+        submodule_attrs (dict[str, list[str]]): 子模块名到其导出名字的映射
+
+    Returns:
+        tuple: `(__getattr__, __dir__)`
+    """
+    attr_to_module = {
+        attr: submodule
+        for submodule, attrs in submodule_attrs.items()
+        for attr in attrs
+    }
+    package = importlib.import_module(package_name)
+
+    def lazy_getattr(name: str) -> Any:
+        submodule = attr_to_module.get(name)
+        if submodule is None:
+            raise AttributeError(f"module {package_name!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(f"{package_name}.{submodule}"), name)
+        setattr(package, name, value)
+        return value
+
+    def lazy_dir() -> list[str]:
+        return sorted({*vars(package), *attr_to_module})
+
+    return lazy_getattr, lazy_dir
@@ -1,43 +1,78 @@
 import asyncio
 import os
 
-from agentscope.agent import ReActAgent, UserAgent
+from agentscope.agent import UserAgent
 from agentscope.formatter import DashScopeChatFormatter
-from agentscope.memory import InMemoryMemory
 from agentscope.model import DashScopeChatModel
-from agentscope.tool import Toolkit, execute_shell_command, execute_python_code, view_text_file
+from agentscope.tool import Toolkit, execute_shell_command, view_text_file
 from dotenv import load_dotenv
 
+from agent import ParallelReActAgent
+from memory import PersistentMemory
+from message import get_default_blob_store
+from model import DEFAULT_CACHE_PATH, CachedChatModel
+from tools import execute_python_code_warm
+from tools.parallel import run_coroutine_in_thread
+from tools.result_cache import idempotent_tool
+from tracing import export_chrome_trace, instrument_agent
+
 load_dotenv()
 
 toolkit = Toolkit()
+# execute_shell_command 基于 asyncio 子进程，本身不阻塞事件循环
 toolkit.register_tool_function(execute_shell_command)
-toolkit.register_tool_function(execute_python_code)
-toolkit.register_tool_function(view_text_file)
+# 在预热的 worker 池中执行 Python 代码，省去每次启动解释器的开销
+toolkit.register_tool_function(execute_python_code_warm)
+# 文件未修改时重复查看直接返回缓存的结果；未命中时 view_text_file 的同步读盘
+# 放到工作线程中执行，不阻塞同一步中的其他工具调用
+toolkit.register_tool_function(idempotent_tool(run_coroutine_in_thread(view_text_file)))
 
 
 async def main() -> None:
-    agent = ReActAgent(
+    agent = ParallelReActAgent(
         name="jarvis",
         sys_prompt="你是一个人工智能助手，协助用户执行命令和编写代码。",
-        model=DashScopeChatModel(
-            model_name="qwen-max",
-            api_key=os.environ["DASHSCOPE_API_KEY"],
-            enable_thinking=False,
-            stream=True
+        model=CachedChatModel(
+            DashScopeChatModel(
+                model_name="qwen-max",
+                api_key=os.environ["DASHSCOPE_API_KEY"],
+                enable_thinking=False,
+                stream=True,
+                # 允许模型在一步中发出多个相互独立的工具调用
+                generate_kwargs={"parallel_tool_calls": True},
+            ),
+            persist_path=DEFAULT_CACHE_PATH,
         ),
         formatter=DashScopeChatFormatter(),
         toolkit=toolkit,
-        memory=InMemoryMemory()
+        # 对话写入磁盘，重启后接着上次的对话继续；内存中只保留最近的消息
+        memory=PersistentMemory(
+            "~/.cache/agent_demo/memory/jarvis",
+            hot_window=100,
+            blob_store=get_default_blob_store(),
+        ),
     )
+    # 记录每轮格式化、模型调用、工具执行和记忆写入的耗时
+    tracer = instrument_agent(agent)
     user = UserAgent("User")
 
     msg = None
-    while True:
-        msg = await user(msg)
-        if msg.get_text_content() == 'exit':
-            break
-        msg = await agent(msg)
+    try:
+        while True:
+            msg = await user(msg)
+            if msg.get_text_content() == 'exit':
+                break
+            msg = await agent(msg)
+    finally:
+        # 用 chrome://tracing 或 https://ui.perfetto.dev 打开查看
+        export_chrome_trace(tracer, "~/.cache/agent_demo/traces/jarvis.json")
+        # 清理对话日志中已不再引用的媒体文件（一天内写入的文件会保留）
+        await asyncio.to_thread(_sweep_blobs, agent.memory)
+
+
+def _sweep_blobs(memory: PersistentMemory) -> None:
+    blob_store = memory.blob_store
+    blob_store.sweep(blob_store.referenced_paths(memory.read()))
 
 
 if __name__ == "__main__":
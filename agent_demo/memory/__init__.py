@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+"""Memory implementations for agent_demo."""
+from .persistent import PersistentMemory
+from .token_window import TokenWindowMemory, estimate_tokens, make_model_summarizer
+
+__all__ = [
+    "PersistentMemory",
+    "TokenWindowMemory",
+    "estimate_tokens",
+    "make_model_summarizer",
+]
@@ -0,0 +1,464 @@
+# -*- coding: utf-8 -*-
+"""追加写日志 + 偏移量索引的持久化记忆，重启后可立即恢复对话。"""
+import asyncio
+import bisect
+import hashlib
+import os
+import struct
+import threading
+from array import array
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
+
+from agentscope.memory import MemoryBase
+from agentscope.message import Msg
+
+from message.codecs import MsgCodec, default_codec, get_codec, get_codec_by_tag
+
+if TYPE_CHECKING:
+    from message import BlobStore
+
+_MAGIC = b"AGML"
+_VERSION = 1
+# 日志文件头：magic、版本、编码方式、代数（每次压缩加一）
+_LOG_HEADER = struct.Struct("<4sBcQ")
+# 索引文件头：代数、索引已覆盖的日志长度、有效记录的总字节数
+_INDEX_HEADER = struct.Struct("<QQQ")
+# 记录头：payload 长度、记录类型
+_RECORD_HEADER = struct.Struct("<IB")
+
+_RECORD_MSG = 1
+_RECORD_DELETE = 2
+_RECORD_CLEAR = 3
+
+# pickle 反序列化可以执行任意代码，不能用于落盘的日志
+_UNSAFE_CODECS = ("pickle5",)
+
+
+def _id_hash(msg_id: str) -> int:
+    digest = hashlib.blake2b(msg_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def _is_tool_result(msg: Msg) -> bool:
+    return (
+        not isinstance(msg.content, str)
+        and bool(msg.content)
+        and all(block.get("type") == "tool_result" for block in msg.content)
+    )
+
+
+class PersistentMemory(MemoryBase):
+    """把全部对话写入磁盘、只在内存中保留最近消息的记忆。
+
+    磁盘上有两个文件：
+
+    - `<name>.log`：追加写的记录日志，每条记录为「长度 + 类型 + payload」，
+      payload 的编码方式见 `message.codecs`，默认使用已安装的最快编码
+      （msgpack > orjson > json）。新增消息、删除、清空
+      都只在末尾追加一条记录，日志是唯一的事实来源
+    - `<name>.idx`：所有有效消息在日志中的偏移量及 id 的哈希（每条 16 字节），
+      用于重启时无需解析日志即可恢复、去重，以及按序号随机读取旧消息。
+      索引丢失或与日志不一致时会自动扫描日志重建
+
+    只有最近 `hot_window` 条消息常驻内存，`get_memory` 返回的也是这部分；
+    更早的消息留在磁盘上，需要时用 `read` 按序号加载。启动时只读取索引和
+    热窗口内的消息，与历史长度无关。删除和清空留下的无效记录超过
+    `compact_min_bytes` 且多于有效数据时，日志会被自动压缩重写。
+
+    异步接口中的文件读写都放到线程池执行，不阻塞事件循环；修改日志和索引的
+    操作由一把锁串行化。
+
+    Args:
+        path (str | os.PathLike): 日志文件路径（不含扩展名）
+        hot_window (int, optional): 常驻内存的最近消息条数
+        compact_min_bytes (int, optional): 触发自动压缩的最少无效字节数
+        fsync (bool, optional): 每次写入后是否 fsync，开启更安全但更慢
+        blob_store (BlobStore | None, optional): 配置后，消息写入前先把其中的大块
+            base64 媒体数据移到该存储，日志和热窗口中保存只含文件引用的副本
+            （传入的消息不变）
+        codec (str | None, optional): 新建日志时使用的编解码器名；打开已有日志时
+            按文件头中记录的格式选择。不支持 pickle5
+
+    Raises:
+        ValueError: `codec` 为 pickle5，或已有日志使用 pickle 编码
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        hot_window: int = 50,
+        compact_min_bytes: int = 1024 * 1024,
+        fsync: bool = False,
+        blob_store: "BlobStore | None" = None,
+        codec: str | None = None,
+    ) -> None:
+        super().__init__()
+        if codec in _UNSAFE_CODECS:
+            raise ValueError(f"编解码器 {codec!r} 反序列化时可执行任意代码，不能用于持久化记忆")
+        path = Path(path).expanduser()
+        self.log_path = path.with_suffix(".log")
+        self.index_path = path.with_suffix(".idx")
+        self.hot_window = hot_window
+        self.compact_min_bytes = compact_min_bytes
+        self.fsync = fsync
+        self.blob_store = blob_store
+        self.content: list[Msg] = []
+        self._offsets = array("Q")
+        self._id_hashes = array("Q")
+        self._ids: set[int] = set()
+        self._live_bytes = 0
+        self._log_size = 0
+        self._generation = 0
+        self._lock = threading.RLock()
+        self._codec: MsgCodec = get_codec(codec) if codec else default_codec()
+        self._open()
+
+    async def add(
+        self,
+        memories: Msg | list[Msg] | None,
+        allow_duplicates: bool = False,
+    ) -> None:
+        """把消息追加写入日志，并放入热窗口。"""
+        if memories is None:
+            return
+        if isinstance(memories, Msg):
+            memories = [memories]
+        if not isinstance(memories, list):
+            raise TypeError(f"memories 应为 Msg 或 list[Msg]，实际为 {type(memories)}")
+        await self.add_many(memories, allow_duplicates)
+
+    async def add_many(self, msgs: Iterable[Msg], allow_duplicates: bool = False) -> int:
+        """批量追加消息，整批只写一次日志和索引。
+
+        `msgs` 可以是任意可迭代对象（例如广播共享的元组），其中的消息不会被修改。
+        已有的消息按 id 哈希在 O(1) 时间内跳过。
+
+        Args:
+            msgs (Iterable[Msg]): 要加入的消息
+            allow_duplicates (bool, optional): 是否允许加入 id 重复的消息
+
+        Returns:
+            int: 实际写入的消息条数
+        """
+        added = []
+        hashes = []
+        for msg in msgs:
+            if not isinstance(msg, Msg):
+                raise TypeError(f"memories 中的元素应为 Msg，实际为 {type(msg)}")
+            id_hash = _id_hash(msg.id)
+            if not allow_duplicates and id_hash in self._ids:
+                continue
+            # 先登记 id：下面等待期间并发的 add 不会重复写入同一条消息
+            self._ids.add(id_hash)
+            if self.blob_store is not None:
+                msg = await self.blob_store.offload_async(msg)
+            added.append(msg)
+            hashes.append(id_hash)
+        if not added:
+            return 0
+        await asyncio.to_thread(self._add_sync, added, hashes)
+        return len(added)
+
+    def _add_sync(self, added: list[Msg], hashes: list[int]) -> None:
+        records = [(_RECORD_MSG, self._codec.dumps(msg.to_dict())) for msg in added]
+        with self._lock:
+            offsets = self._append(records)
+            self._offsets.extend(offsets)
+            self._id_hashes.extend(hashes)
+            self._live_bytes += sum(
+                _RECORD_HEADER.size + len(payload) for _, payload in records
+            )
+            self._append_index(offsets, hashes)
+
+            self.content.extend(added)
+            if len(self.content) > self.hot_window:
+                del self.content[: len(self.content) - self.hot_window]
+
+    async def get_memory(self, *args: Any, **kwargs: Any) -> list[Msg]:
+        """返回热窗口内的最近消息。
+
+        窗口开头若是工具结果，对应的工具调用已被移出窗口，单独的工具结果
+        会被模型 API 拒绝，因此跳过这些消息。
+        """
+        start = 0
+        while start < len(self.content) and _is_tool_result(self.content[start]):
+            start += 1
+        return self.content[start:] if start else self.content
+
+    async def size(self) -> int:
+        """返回全部有效消息（含未加载的旧消息）的条数。"""
+        return len(self._offsets)
+
+    def read(self, start: int = 0, stop: int | None = None) -> list[Msg]:
+        """按序号从磁盘读取消息，序号范围与 `size()` 一致（0 为最早的消息）。"""
+        with self._lock:
+            return [
+                Msg.from_dict(self._codec.loads(payload))
+                for _, payload in self._read_records(self._offsets[start:stop])
+            ]
+
+    async def delete(self, index: Iterable[int] | int) -> None:
+        """按下标删除热窗口内的消息。"""
+        indices = {index} if isinstance(index, int) else set(index)
+        await asyncio.to_thread(self._delete_sync, indices)
+
+    def _delete_sync(self, indices: set[int]) -> None:
+        with self._lock:
+            invalid = [i for i in indices if not 0 <= i < len(self.content)]
+            if invalid:
+                raise IndexError(
+                    f"下标 {invalid} 超出范围，热窗口共 {len(self.content)} 条消息",
+                )
+            if not indices:
+                return
+
+            base = len(self._offsets) - len(self.content)
+            positions = sorted((base + i for i in indices), reverse=True)
+            # 按偏移量记录删除了哪几条：允许重复 id 时，同 id 的其它消息不受影响
+            deleted = [self._offsets[position] for position in positions]
+            self._append([(_RECORD_DELETE, self._codec.dumps(deleted))])
+            for position in positions:
+                self._live_bytes -= self._record_size(self._offsets[position])
+                self._ids.discard(self._id_hashes[position])
+                del self._offsets[position]
+                del self._id_hashes[position]
+            self.content = [msg for i, msg in enumerate(self.content) if i not in indices]
+            self._fill_hot_window()
+            self._write_index()
+            self._maybe_compact()
+
+    async def retrieve(self, query: str, limit: int = 5) -> list[Msg]:
+        """在全部历史中查找包含 `query` 的消息，从最新往前返回至多 `limit` 条。"""
+        found = []
+        for start in range(len(self._offsets), 0, -self.hot_window):
+            batch = await asyncio.to_thread(self.read, max(0, start - self.hot_window), start)
+            for msg in reversed(batch):
+                if query in (msg.get_text_content() or ""):
+                    found.append(msg)
+                    if len(found) >= limit:
+                        return found
+        return found
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._clear_sync)
+
+    def _clear_sync(self) -> None:
+        with self._lock:
+            self._append([(_RECORD_CLEAR, b"")])
+            self._offsets = array("Q")
+            self._id_hashes = array("Q")
+            self._ids.clear()
+            self._live_bytes = 0
+            self.content = []
+            self._write_index()
+            self._maybe_compact()
+
+    async def compact_async(self) -> None:
+        """在线程池中执行 `compact`。"""
+        await asyncio.to_thread(self.compact)
+
+    def compact(self) -> None:
+        """重写日志，只保留有效消息，并更新索引。"""
+        with self._lock:
+            self._compact()
+
+    def _compact(self) -> None:
+        tmp_path = self.log_path.with_suffix(".log.tmp")
+        new_offsets = array("Q")
+        with open(tmp_path, "wb") as f:
+            f.write(_LOG_HEADER.pack(_MAGIC, _VERSION, self._codec.tag, self._generation + 1))
+            for kind, payload in self._read_records(self._offsets):
+                new_offsets.append(f.tell())
+                f.write(_RECORD_HEADER.pack(len(payload), kind))
+                f.write(payload)
+            log_size = f.tell()
+            f.flush()
+            os.fsync(f.fileno())
+        # 先替换日志再写索引：中途崩溃时索引的代数对不上，下次打开会从新日志重建
+        os.replace(tmp_path, self.log_path)
+        self._generation += 1
+        self._offsets = new_offsets
+        self._log_size = log_size
+        self._live_bytes = log_size - _LOG_HEADER.size
+        self._write_index()
+
+    def state_dict(self) -> dict:
+        return {"path": str(self.log_path.with_suffix("")), "size": len(self._offsets)}
+
+    def load_state_dict(self, state_dict: dict, strict: bool = True) -> None:
+        """切换到 `state_dict` 中记录的日志文件（数据本身已在磁盘上）。"""
+        path = Path(state_dict["path"])
+        if path.with_suffix(".log") != self.log_path:
+            self.log_path = path.with_suffix(".log")
+            self.index_path = path.with_suffix(".idx")
+            self._open()
+
+    def _open(self) -> None:
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.log_path.exists() or self.log_path.stat().st_size < _LOG_HEADER.size:
+            with open(self.log_path, "wb") as f:
+                f.write(_LOG_HEADER.pack(_MAGIC, _VERSION, self._codec.tag, 0))
+            self.index_path.unlink(missing_ok=True)
+
+        with open(self.log_path, "rb") as f:
+            magic, version, codec, generation = _LOG_HEADER.unpack(f.read(_LOG_HEADER.size))
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{self.log_path} 不是有效的记忆日志文件")
+        try:
+            self._codec = get_codec_by_tag(codec)
+        except KeyError as e:
+            raise RuntimeError(f"无法读取 {self.log_path}：{e}") from None
+        if self._codec.name in _UNSAFE_CODECS:
+            raise ValueError(f"{self.log_path} 使用 {self._codec.name} 编码，拒绝反序列化")
+        self._generation = generation
+        self._log_size = self.log_path.stat().st_size
+
+        if not self._load_index():
+            self._rebuild_index()
+        self._ids = set(self._id_hashes)
+        self.content = []
+        self._fill_hot_window()
+
+    def _load_index(self) -> bool:
+        """读取索引；索引缺失、代数不符或末尾有未索引的删除记录时返回 False。"""
+        try:
+            with open(self.index_path, "rb") as f:
+                generation, covered, live_bytes = _INDEX_HEADER.unpack(
+                    f.read(_INDEX_HEADER.size),
+                )
+                entries = array("Q")
+                entries.frombytes(f.read())
+        except (OSError, struct.error, ValueError):
+            return False
+        if generation != self._generation or covered > self._log_size or len(entries) % 2:
+            return False
+        # 上次写完日志但没来得及写索引：补上末尾的新增记录
+        tail = list(self._scan(covered))
+        if any(kind != _RECORD_MSG for _, kind, _ in tail):
+            return False
+        # 追加索引条目后、更新文件头前崩溃时，会多出覆盖范围以外的条目，丢弃它们
+        count = bisect.bisect_left(entries[0::2], covered)
+        self._offsets = entries[0:2 * count:2]
+        self._id_hashes = entries[1:2 * count:2]
+        self._live_bytes = live_bytes
+        for offset, _, payload in tail:
+            self._offsets.append(offset)
+            self._id_hashes.append(_id_hash(self._codec.loads(payload)["id"]))
+            self._live_bytes += _RECORD_HEADER.size + len(payload)
+        if tail:
+            self._write_index()
+        return True
+
+    def _rebuild_index(self) -> None:
+        # 偏移量 -> (id, 记录大小)，偏移量递增即消息顺序。
+        # 以偏移量为键，allow_duplicates 写入的同 id 消息各自保留
+        records: dict[int, tuple[str, int]] = {}
+        for offset, kind, payload in self._scan(_LOG_HEADER.size):
+            if kind == _RECORD_MSG:
+                msg_id = self._codec.loads(payload)["id"]
+                records[offset] = (msg_id, _RECORD_HEADER.size + len(payload))
+            elif kind == _RECORD_DELETE:
+                deleted = self._codec.loads(payload)
+                # 旧版本的删除记录保存的是消息 id
+                deleted_ids = {item for item in deleted if isinstance(item, str)}
+                for item in deleted:
+                    if not isinstance(item, str):
+                        records.pop(item, None)
+                if deleted_ids:
+                    records = {
+                        offset: record for offset, record in records.items()
+                        if record[0] not in deleted_ids
+                    }
+            elif kind == _RECORD_CLEAR:
+                records.clear()
+        self._offsets = array("Q", records)
+        self._id_hashes = array("Q", (_id_hash(msg_id) for msg_id, _ in records.values()))
+        self._live_bytes = sum(size for _, size in records.values())
+        self._write_index()
+
+    def _scan(self, start: int) -> Iterator[tuple[int, int, bytes]]:
+        """从 `start` 开始顺序读取记录；末尾不完整的记录（写入时崩溃）会被截掉。"""
+        with open(self.log_path, "r+b") as f:
+            f.seek(start)
+            offset = start
+            while offset < self._log_size:
+                header = f.read(_RECORD_HEADER.size)
+                if len(header) < _RECORD_HEADER.size:
+                    break
+                length, kind = _RECORD_HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length:
+                    break
+                yield offset, kind, payload
+                offset = f.tell()
+            if offset < self._log_size:
+                f.truncate(offset)
+                self._log_size = offset
+
+    def _read_records(self, offsets: Iterable[int]) -> Iterator[tuple[int, bytes]]:
+        with open(self.log_path, "rb") as f:
+            for offset in offsets:
+                f.seek(offset)
+                length, kind = _RECORD_HEADER.unpack(f.read(_RECORD_HEADER.size))
+                yield kind, f.read(length)
+
+    def _record_size(self, offset: int) -> int:
+        with open(self.log_path, "rb") as f:
+            f.seek(offset)
+            length, _ = _RECORD_HEADER.unpack(f.read(_RECORD_HEADER.size))
+        return _RECORD_HEADER.size + length
+
+    def _append(self, records: list[tuple[int, bytes]]) -> list[int]:
+        """把记录追加到日志末尾，返回各条记录的偏移量。"""
+        offsets = []
+        buffer = bytearray()
+        for kind, payload in records:
+            offsets.append(self._log_size + len(buffer))
+            buffer += _RECORD_HEADER.pack(len(payload), kind)
+            buffer += payload
+        with open(self.log_path, "ab") as f:
+            f.write(buffer)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        self._log_size += len(buffer)
+        return offsets
+
+    def _append_index(self, offsets: list[int], hashes: list[int]) -> None:
+        entries = array("Q")
+        for offset, id_hash in zip(offsets, hashes):
+            entries.append(offset)
+            entries.append(id_hash)
+        with open(self.index_path, "r+b") as f:
+            # 先追加条目再更新文件头，中途崩溃时多出的条目会在下次打开时被识别为无效
+            f.seek(0, os.SEEK_END)
+            f.write(entries.tobytes())
+            f.seek(0)
+            f.write(self._index_header())
+
+    def _write_index(self) -> None:
+        entries = array("Q", bytes(16 * len(self._offsets)))
+        entries[0::2] = self._offsets
+        entries[1::2] = self._id_hashes
+        tmp_path = self.index_path.with_suffix(".idx.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(self._index_header())
+            f.write(entries.tobytes())
+        os.replace(tmp_path, self.index_path)
+
+    def _index_header(self) -> bytes:
+        return _INDEX_HEADER.pack(self._generation, self._log_size, self._live_bytes)
+
+    def _fill_hot_window(self) -> None:
+        """热窗口不足 `hot_window` 条时，从磁盘补入更早的消息。"""
+        missing = min(self.hot_window, len(self._offsets)) - len(self.content)
+        if missing <= 0:
+            return
+        end = len(self._offsets) - len(self.content)
+        self.content = self.read(end - missing, end) + self.content
+
+    def _maybe_compact(self) -> None:
+        dead = self._log_size - _LOG_HEADER.size - self._live_bytes
+        if dead >= self.compact_min_bytes and dead > self._live_bytes:
+            self._compact()
@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""按 token 预算保留最近对话的滑动窗口记忆。"""
+import json
+import re
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Iterable
+
+from agentscope.formatter import FormatterBase
+from agentscope.memory import MemoryBase
+from agentscope.message import Msg
+from agentscope.model import ChatModelBase
+
+if TYPE_CHECKING:
+    from message import BlobStore
+
+_CJK_PATTERN = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯＀-￯]")
+# 图片、音频、视频等多模态块按固定开销估算
+_MEDIA_BLOCK_TOKENS = 256
+
+TokenCounter = Callable[[Msg], int]
+Summarizer = Callable[[list[Msg]], Awaitable[Msg | None]]
+
+
+def estimate_tokens(msg: Msg) -> int:
+    """粗略估算一条消息占用的 token 数。
+
+    不依赖任何 tokenizer：中日韩字符按 1 个 token 计，其余字符约 4 个算 1 个
+    token，工具调用按参数 JSON 的长度计，多模态块按固定开销计。对于
+    qwen 系列模型，误差通常在 20% 以内，足以用来控制上下文长度。
+    """
+    content = msg.content
+    if isinstance(content, str):
+        return _estimate_text(content) + 4
+
+    total = 4
+    for block in content:
+        block_type = block.get("type")
+        if block_type == "text":
+            total += _estimate_text(block.get("text", ""))
+        elif block_type == "thinking":
+            total += _estimate_text(block.get("thinking", ""))
+        elif block_type == "tool_use":
+            total += _estimate_text(json.dumps(block.get("input", {}), ensure_ascii=False))
+        elif block_type == "tool_result":
+            output = block.get("output", "")
+            if isinstance(output, str):
+                total += _estimate_text(output)
+            else:
+                total += sum(
+                    _estimate_text(item.get("text", ""))
+                    if item.get("type") == "text" else _MEDIA_BLOCK_TOKENS
+                    for item in output
+                )
+        else:
+            total += _MEDIA_BLOCK_TOKENS
+    return total
+
+
+def _estimate_text(text: str) -> int:
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def make_model_summarizer(
+    model: ChatModelBase,
+    formatter: FormatterBase,
+    name: str = "summary",
+) -> Summarizer:
+    """用聊天模型把被移出窗口的旧消息压缩成一条摘要消息。
+
+    Args:
+        model (ChatModelBase): 用于生成摘要的模型，需为非流式
+        formatter (FormatterBase): 与模型配套的 formatter
+        name (str, optional): 摘要消息的发送者名称
+
+    Returns:
+        Summarizer: 可传给 `TokenWindowMemory(summarizer=...)` 的异步函数
+    """
+
+    async def summarize(msgs: list[Msg]) -> Msg | None:
+        prompt = await formatter.format(
+            [
+                Msg(
+                    "system",
+                    "请把下面的对话压缩成一段简洁的摘要，保留人物、事实、结论和未完成的任务。",
+                    "system",
+                ),
+                *msgs,
+            ],
+        )
+        response = await model(prompt)
+        text = "".join(
+            block.get("text", "") for block in response.content if block.get("type") == "text"
+        )
+        if not text:
+            return None
+        return Msg(name=name, content=f"[之前对话的摘要] {text}", role="system")
+
+    return summarize
+
+
+class TokenWindowMemory(MemoryBase):
+    """按 token 预算保留最近消息的记忆，可直接替换 `InMemoryMemory`。
+
+    每条消息加入时只计算一次 token 数并累加到 `total_tokens`，之后每轮
+    都不再重新统计。总量超过 `max_tokens` 时从最早的消息开始移出窗口：
+
+    - 未配置 `summarizer` 时直接丢弃
+    - 配置了 `summarizer` 时，把移出的消息（连同上一次的摘要）交给它
+      压缩成一条摘要消息，放在窗口最前面
+
+    摘要最多占用 `max_summary_tokens`，超出时截断；移出消息时预先为摘要
+    留出这部分预算，因此每次裁剪只需调用一次 `summarizer`。最新的
+    `min_messages` 条消息总会保留，即使它们本身已超出预算。
+
+    Args:
+        max_tokens (int, optional): 窗口的 token 预算
+        token_counter (TokenCounter | None, optional): 单条消息的 token 计数函数，
+            默认使用 `estimate_tokens`
+        summarizer (Summarizer | None, optional): 把旧消息压缩为摘要的异步函数
+        min_messages (int, optional): 至少保留的最新消息条数
+        max_summary_tokens (int | None, optional): 摘要的 token 上限，
+            默认为 `max_tokens` 的四分之一
+        blob_store (BlobStore | None, optional): 配置后，消息加入前先把其中的大块
+            base64 媒体数据移到该存储，记忆中保存只含文件引用的副本（传入的消息不变）
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 4000,
+        token_counter: TokenCounter | None = None,
+        summarizer: Summarizer | None = None,
+        min_messages: int = 2,
+        max_summary_tokens: int | None = None,
+        blob_store: "BlobStore | None" = None,
+    ) -> None:
+        super().__init__()
+        if max_summary_tokens is None:
+            max_summary_tokens = max_tokens // 4
+        if not 0 < max_summary_tokens < max_tokens:
+            raise ValueError(
+                f"max_summary_tokens 应在 (0, {max_tokens}) 之间，实际为 {max_summary_tokens}"
+            )
+        self.max_tokens = max_tokens
+        self.max_summary_tokens = max_summary_tokens
+        self.token_counter = token_counter or estimate_tokens
+        self.summarizer = summarizer
+        self.min_messages = min_messages
+        self.blob_store = blob_store
+        self.content: list[Msg] = []
+        self.summary: Msg | None = None
+        self._token_counts: list[int] = []
+        self._summary_tokens = 0
+        self._ids: set[str] = set()
+        self.total_tokens = 0
+
+    async def add(
+        self,
+        memories: Msg | list[Msg] | None,
+        allow_duplicates: bool = False,
+    ) -> None:
+        """加入新消息，必要时把最早的消息移出窗口。"""
+        if memories is None:
+            return
+        if isinstance(memories, Msg):
+            memories = [memories]
+        if not isinstance(memories, list):
+            raise TypeError(f"memories 应为 Msg 或 list[Msg]，实际为 {type(memories)}")
+        await self.add_many(memories, allow_duplicates)
+
+    async def add_many(self, msgs: Iterable[Msg], allow_duplicates: bool = False) -> int:
+        """批量加入消息，整批只做一次窗口裁剪。
+
+        与 `add` 不同，`msgs` 可以是任意可迭代对象（例如广播共享的元组），
+        其中的消息不会被修改。已在窗口中的消息按 id 在 O(1) 时间内跳过。
+
+        Args:
+            msgs (Iterable[Msg]): 要加入的消息
+            allow_duplicates (bool, optional): 是否允许加入 id 重复的消息
+
+        Returns:
+            int: 实际加入的消息条数
+        """
+        added = 0
+        for msg in msgs:
+            if not isinstance(msg, Msg):
+                raise TypeError(f"memories 中的元素应为 Msg，实际为 {type(msg)}")
+            if not allow_duplicates and msg.id in self._ids:
+                continue
+            if self.blob_store is not None:
+                msg = await self.blob_store.offload_async(msg)
+            tokens = self.token_counter(msg)
+            self.content.append(msg)
+            self._token_counts.append(tokens)
+            self._ids.add(msg.id)
+            self.total_tokens += tokens
+            added += 1
+        if added:
+            await self._enforce_budget()
+        return added
+
+    async def get_memory(self, *args: Any, **kwargs: Any) -> list[Msg]:
+        """返回窗口内的消息，有摘要时摘要排在最前面。"""
+        if self.total_tokens > self.max_tokens:
+            # load_state_dict 是同步方法，载入后的裁剪推迟到这里
+            await self._enforce_budget()
+        if self.summary is None:
+            return self.content
+        return [self.summary, *self.content]
+
+    async def size(self) -> int:
+        return len(self.content) + (self.summary is not None)
+
+    async def delete(self, index: Iterable[int] | int) -> None:
+        """按下标删除窗口内的消息（不含摘要）。"""
+        indices = {index} if isinstance(index, int) else set(index)
+        invalid = [i for i in indices if not 0 <= i < len(self.content)]
+        if invalid:
+            raise IndexError(f"下标 {invalid} 超出范围，当前共 {len(self.content)} 条消息")
+        kept = [
+            (msg, tokens)
+            for i, (msg, tokens) in enumerate(zip(self.content, self._token_counts))
+            if i not in indices
+        ]
+        self._reset([msg for msg, _ in kept], [tokens for _, tokens in kept])
+
+    async def retrieve(self, *args: Any, **kwargs: Any) -> list[Msg]:
+        """不做相关性检索，直接返回窗口内的历史（与 `get_memory` 相同）。"""
+        return await self.get_memory()
+
+    async def clear(self) -> None:
+        self.summary = None
+        self._summary_tokens = 0
+        self._reset([], [])
+
+    def state_dict(self) -> dict:
+        return {
+            "content": [msg.to_dict() for msg in self.content],
+            "summary": self.summary.to_dict() if self.summary is not None else None,
+        }
+
+    def load_state_dict(self, state_dict: dict, strict: bool = True) -> None:
+        summary = state_dict.get("summary")
+        self.summary, self._summary_tokens = self._cap_summary(
+            Msg.from_dict(summary) if summary else None,
+        )
+        content = [Msg.from_dict(data) for data in state_dict.get("content", [])]
+        self._reset(content, [self.token_counter(msg) for msg in content])
+
+    def _reset(self, content: list[Msg], token_counts: list[int]) -> None:
+        self.content = content
+        self._token_counts = token_counts
+        self._ids = {msg.id for msg in content}
+        self.total_tokens = sum(token_counts) + self._summary_tokens
+
+    async def _enforce_budget(self) -> None:
+        if self.total_tokens <= self.max_tokens:
+            return
+        # 有摘要器时为新摘要预留 max_summary_tokens，一次移出足够多的消息
+        if self.summarizer is not None:
+            content_budget = self.max_tokens - self.max_summary_tokens
+        else:
+            content_budget = self.max_tokens - self._summary_tokens
+        # 一次算出需要移出多少条，再整体切片，避免逐条 pop(0)
+        max_evict = max(0, len(self.content) - self.min_messages)
+        overflow = self.total_tokens - self._summary_tokens - content_budget
+        evict = 0
+        freed = 0
+        while evict < max_evict and freed < overflow:
+            freed += self._token_counts[evict]
+            evict += 1
+        if evict == 0:
+            return
+
+        evicted = self.content[:evict]
+        self.content = self.content[evict:]
+        self._token_counts = self._token_counts[evict:]
+        self._ids.difference_update(msg.id for msg in evicted)
+        self.total_tokens -= freed
+
+        if self.summarizer is None:
+            return
+        to_summarize = evicted if self.summary is None else [self.summary, *evicted]
+        summary, summary_tokens = self._cap_summary(await self.summarizer(to_summarize))
+        self.total_tokens += summary_tokens - self._summary_tokens
+        self.summary = summary
+        self._summary_tokens = summary_tokens
+
+    def _cap_summary(self, summary: Msg | None) -> tuple[Msg | None, int]:
+        """把摘要截断到 `max_summary_tokens` 以内，返回 (摘要, token 数)。"""
+        if summary is None:
+            return None, 0
+        tokens = self.token_counter(summary)
+        if tokens <= self.max_summary_tokens:
+            return summary, tokens
+        text = summary.get_text_content() or ""
+
+        def truncated(length: int) -> Msg:
+            return Msg(
+                name=summary.name,
+                content=text[:length] + "…",
+                role=summary.role,
+                metadata=summary.metadata,
+            )
+
+        # 二分查找能放进上限的最长前缀
+        low, high = 0, len(text)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.token_counter(truncated(middle)) <= self.max_summary_tokens:
+                low = middle
+            else:
+                high = middle - 1
+        capped = truncated(low)
+        return capped, self.token_counter(capped)
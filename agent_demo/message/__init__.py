@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""Message utilities for agent_demo."""
+from .blob_store import BlobStore, get_default_blob_store
+from .codecs import (
+    MsgCodec,
+    available_codecs,
+    default_codec,
+    get_codec,
+    get_codec_by_tag,
+    register_codec,
+)
+
+__all__ = [
+    "BlobStore",
+    "MsgCodec",
+    "available_codecs",
+    "default_codec",
+    "get_codec",
+    "get_codec_by_tag",
+    "get_default_blob_store",
+    "register_codec",
+]
@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""多模态数据的内容寻址存储：把消息中的大块 base64 数据移到磁盘。"""
+import asyncio
+import base64
+import copy
+import hashlib
+import mimetypes
+import mmap
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Iterable
+
+from agentscope.message import Msg
+
+DEFAULT_BLOB_DIR = Path(
+    os.environ.get("AGENT_DEMO_BLOB_DIR", Path.home() / ".cache" / "agent_demo" / "blobs"),
+)
+DEFAULT_MIN_BYTES = 4 * 1024
+
+_MEDIA_TYPES = ("image", "audio", "video")
+# mimetypes 对部分常见类型给出的扩展名不理想（如 .jpe），这里固定下来
+_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "audio/mpeg": ".mp3",
+    "audio/wav": ".wav",
+    "audio/x-wav": ".wav",
+    "video/mp4": ".mp4",
+}
+
+
+class BlobStore:
+    """按内容哈希保存图片、音频、视频数据的目录。
+
+    `offload` 把消息中解码后不小于 `min_bytes` 的 base64 媒体块写成
+    `<root>/<sha256 前两位>/<sha256><扩展名>` 文件，块里只留下指向该文件的
+    URLSource。相同内容只保存一份，多条消息、多个智能体引用同一张图片
+    时不会重复占用磁盘和内存。文件一经写入不再修改，可以安全地被多个
+    进程同时读取。
+
+    AgentScope 的 formatter 遇到本地路径时会自行读取文件，因此替换后的
+    消息可以直接交给模型；需要内联数据的场景（例如发给不能访问本机文件的
+    远程服务）用 `restore` 还原，只读访问用 `open` 通过 mmap 零拷贝读取。
+
+    存储不跟踪引用关系，不再被任何消息引用的文件由 `sweep` 清理。
+
+    Args:
+        root (str | os.PathLike, optional): 存储目录
+        min_bytes (int, optional): 小于此大小的数据保留在消息中
+    """
+
+    def __init__(
+        self,
+        root: str | os.PathLike = DEFAULT_BLOB_DIR,
+        min_bytes: int = DEFAULT_MIN_BYTES,
+    ) -> None:
+        self.root = Path(root).expanduser().resolve()
+        self.min_bytes = min_bytes
+
+    def put(self, data: bytes, media_type: str | None = None) -> Path:
+        """保存数据并返回其路径；相同内容已存在时直接返回已有文件。"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.root / digest[:2] / f"{digest}{_extension(media_type)}"
+        if path.exists():
+            return path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 先写临时文件再原子替换，并发写入同一内容时也不会读到半个文件
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return path
+
+    def offload(self, msg: Msg) -> Msg:
+        """把消息中的大块 base64 媒体数据移到存储目录。
+
+        传入的消息不会被修改：它可能同时被调用方和其他智能体持有（例如
+        广播共享的消息）。
+
+        Returns:
+            Msg: 有数据被替换时返回 id 相同、content 为新列表的浅拷贝，
+                否则返回传入的消息本身
+        """
+        if isinstance(msg.content, str):
+            return msg
+        content = self._offload_blocks(msg.content)
+        if content is msg.content:
+            return msg
+        offloaded = copy.copy(msg)
+        offloaded.content = content
+        return offloaded
+
+    async def offload_async(self, msg: Msg) -> Msg:
+        """`offload` 的异步版本，解码、哈希和写文件在工作线程中进行。
+
+        没有达到 `min_bytes` 的媒体块时直接返回，不切换线程。
+        """
+        if isinstance(msg.content, str) or not self._has_large_blocks(msg.content):
+            return msg
+        return await asyncio.to_thread(self.offload, msg)
+
+    def restore(self, msg: Msg) -> Msg:
+        """返回媒体数据重新内联为 base64 的新消息（原消息不变）。"""
+        if isinstance(msg.content, str):
+            return msg
+        content = self._restore_blocks(msg.content)
+        if content is msg.content:
+            return msg
+        restored = Msg(
+            name=msg.name,
+            content=content,
+            role=msg.role,
+            metadata=msg.metadata,
+            timestamp=msg.timestamp,
+        )
+        restored.id = msg.id
+        return restored
+
+    def contains(self, path: str | os.PathLike) -> bool:
+        """判断路径是否位于本存储目录中。"""
+        return Path(path).resolve().is_relative_to(self.root)
+
+    def open(self, path: str | os.PathLike) -> memoryview:
+        """以只读 memoryview 的形式映射一个已保存的文件。"""
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return memoryview(b"")
+            # 关闭文件后映射仍然有效，由 memoryview 持有映射对象
+            return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def referenced_paths(self, msgs: Iterable[Msg]) -> set[Path]:
+        """收集消息中引用的、位于本存储目录中的文件路径。"""
+        paths: set[Path] = set()
+        for msg in msgs:
+            if not isinstance(msg.content, str):
+                self._collect_paths(msg.content, paths)
+        return paths
+
+    def sweep(
+        self,
+        referenced: Iterable[str | os.PathLike],
+        min_age: float = 24 * 3600,
+    ) -> int:
+        """删除不在 `referenced` 中的文件，返回释放的字节数。
+
+        `referenced` 需包含所有仍在使用本存储的记忆引用的文件（可用
+        `referenced_paths` 收集）。最近 `min_age` 秒内写入的文件即使未被
+        引用也保留，它们可能属于刚写入、尚未登记的消息，或其他进程中
+        仍在运行的智能体。
+
+        Args:
+            referenced (Iterable[str | os.PathLike]): 仍被引用的文件
+            min_age (float, optional): 未被引用的文件至少存在多久才删除（秒）
+
+        Returns:
+            int: 删除的文件总大小
+        """
+        if not self.root.exists():
+            return 0
+        keep = {Path(path).resolve() for path in referenced}
+        deadline = time.time() - min_age
+        freed = 0
+        for path in self.root.glob("*/*"):
+            if path in keep or path.suffix == ".part":
+                continue
+            try:
+                stat = path.stat()
+                if stat.st_mtime > deadline:
+                    continue
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            freed += stat.st_size
+        return freed
+
+    def total_bytes(self) -> int:
+        """存储目录中全部文件的总大小。"""
+        if not self.root.exists():
+            return 0
+        return sum(path.stat().st_size for path in self.root.glob("*/*") if path.is_file())
+
+    def _offload_blocks(self, blocks: list[dict]) -> list[dict]:
+        """返回替换后的块列表；没有任何替换时返回原列表对象。"""
+        result = []
+        changed = False
+        for block in blocks:
+            new_block = self._offload_block(block)
+            changed = changed or new_block is not block
+            result.append(new_block)
+        return result if changed else blocks
+
+    def _offload_block(self, block: dict) -> dict:
+        block_type = block.get("type")
+        if block_type == "tool_result" and isinstance(block.get("output"), list):
+            output = self._offload_blocks(block["output"])
+            return block if output is block["output"] else {**block, "output": output}
+        if block_type not in _MEDIA_TYPES:
+            return block
+        source = block.get("source", {})
+        # base64 文本长度约为原始数据的 4/3，先用长度粗筛，避免解码小数据
+        if source.get("type") != "base64" or len(source.get("data", "")) * 3 // 4 < self.min_bytes:
+            return block
+        data = _b64decode(source["data"])
+        if len(data) < self.min_bytes:
+            return block
+        path = self.put(data, source.get("media_type"))
+        return {**block, "source": {"type": "url", "url": str(path)}}
+
+    def _has_large_blocks(self, blocks: list[dict]) -> bool:
+        for block in blocks:
+            block_type = block.get("type")
+            if block_type == "tool_result" and isinstance(block.get("output"), list):
+                if self._has_large_blocks(block["output"]):
+                    return True
+            elif block_type in _MEDIA_TYPES:
+                source = block.get("source", {})
+                if (
+                    source.get("type") == "base64"
+                    and len(source.get("data", "")) * 3 // 4 >= self.min_bytes
+                ):
+                    return True
+        return False
+
+    def _collect_paths(self, blocks: list[dict], paths: set[Path]) -> None:
+        for block in blocks:
+            block_type = block.get("type")
+            if block_type == "tool_result" and isinstance(block.get("output"), list):
+                self._collect_paths(block["output"], paths)
+            elif block_type in _MEDIA_TYPES:
+                source = block.get("source", {})
+                if source.get("type") == "url" and self.contains(source["url"]):
+                    paths.add(Path(source["url"]).resolve())
+
+    def _restore_blocks(self, blocks: list[dict]) -> list[dict]:
+        result = []
+        changed = False
+        for block in blocks:
+            new_block = self._restore_block(block)
+            changed = changed or new_block is not block
+            result.append(new_block)
+        return result if changed else blocks
+
+    def _restore_block(self, block: dict) -> dict:
+        block_type = block.get("type")
+        if block_type == "tool_result" and isinstance(block.get("output"), list):
+            output = self._restore_blocks(block["output"])
+            return block if output is block["output"] else {**block, "output": output}
+        if block_type not in _MEDIA_TYPES:
+            return block
+        source = block.get("source", {})
+        if source.get("type") != "url" or not self.contains(source["url"]):
+            return block
+        media_type = mimetypes.guess_type(source["url"])[0] or "application/octet-stream"
+        return {
+            **block,
+            "source": {
+                "type": "base64",
+                "media_type": media_type,
+                "data": base64.b64encode(self.open(source["url"])).decode("ascii"),
+            },
+        }
+
+
+def _extension(media_type: str | None) -> str:
+    if not media_type:
+        return ""
+    return _EXTENSIONS.get(media_type) or mimetypes.guess_extension(media_type) or ""
+
+
+def _b64decode(data: str) -> bytes:
+    # 兼容 RFC 2397 形式的 "data:<media_type>;base64,<data>"
+    if data.startswith("data:"):
+        data = data.partition(",")[2]
+    return base64.b64decode(data)
+
+
+_default_store: BlobStore | None = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_blob_store() -> BlobStore:
+    """获取进程内共享的默认存储（目录可通过环境变量 AGENT_DEMO_BLOB_DIR 指定）。"""
+    global _default_store
+    if _default_store is None:
+        with _default_store_lock:
+            if _default_store is None:
+                _default_store = BlobStore()
+    return _default_store
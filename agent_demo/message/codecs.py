@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""可插拔的 Msg 编解码器：json、orjson、msgpack 和 pickle 协议 5。"""
+import base64
+import binascii
+import json
+import pickle
+import struct
+import threading
+from typing import Any
+
+from agentscope.message import Msg
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 可选依赖
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - 可选依赖
+    msgpack = None
+
+_MEDIA_TYPES = ("image", "audio", "video")
+
+
+class MsgCodec:
+    """Msg 编解码器的基类。
+
+    子类只需实现 `dumps` / `loads`（普通的 dict、list、str 等数据与字节之间的
+    转换），`encode` / `decode` 默认基于 `Msg.to_dict` / `Msg.from_dict` 实现。
+
+    Attributes:
+        name (str): 注册名
+        tag (bytes): 单字节标识，写入持久化文件头；输出格式兼容的编解码器
+            （如 json 与 orjson）使用相同的 tag，可以互相读取对方写入的数据
+    """
+
+    name: str = ""
+    tag: bytes = b""
+
+    def dumps(self, obj: Any) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, data: bytes | memoryview) -> Any:
+        raise NotImplementedError
+
+    def encode(self, msg: Msg) -> bytes:
+        return self.dumps(msg.to_dict())
+
+    def decode(self, data: bytes | memoryview) -> Msg:
+        return Msg.from_dict(self.loads(data))
+
+
+class JsonCodec(MsgCodec):
+    """标准库 json，无额外依赖。"""
+
+    name = "json"
+    tag = b"j"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, data: bytes | memoryview) -> Any:
+        return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+
+
+class OrjsonCodec(MsgCodec):
+    """orjson：输出与 `JsonCodec` 兼容的 JSON，速度快数倍。"""
+
+    name = "orjson"
+    tag = b"j"
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    def loads(self, data: bytes | memoryview) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackCodec(MsgCodec):
+    """msgpack：二进制编码，体积比 JSON 小，解析更快。"""
+
+    name = "msgpack"
+    tag = b"m"
+
+    def dumps(self, obj: Any) -> bytes:
+        return msgpack.packb(obj, use_bin_type=True)
+
+    def loads(self, data: bytes | memoryview) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+
+class Pickle5Codec(MsgCodec):
+    """pickle 协议 5，媒体数据以带外缓冲区（out-of-band buffer）传输。
+
+    编码时把 base64 媒体数据解码为原始字节，作为带外缓冲区放在 pickle 数据
+    之后，不进入 pickle 流本身，体积比 base64 小约 25%。`encode_frames`
+    返回分段的 buffer 列表，可以直接交给 `socket.sendmsg`、`writelines`
+    等分段写接口，避免拼接时再复制一次媒体数据；解码时直接从输入的
+    memoryview 切片，不复制缓冲区。
+
+    pickle 反序列化可以执行任意代码，只能用于可信的数据（例如本进程写入的
+    数据或同一台机器上的进程间通信），不要用于持久化或网络传输。
+
+    帧格式：`<I 缓冲区数><Q pickle 长度><Q 各缓冲区长度...>` + pickle + 缓冲区。
+    """
+
+    name = "pickle5"
+    tag = b"p"
+
+    def dumps(self, obj: Any) -> bytes:
+        return pickle.dumps(obj, protocol=5)
+
+    def loads(self, data: bytes | memoryview) -> Any:
+        return pickle.loads(data)
+
+    def encode(self, msg: Msg) -> bytes:
+        return b"".join(self.encode_frames(msg))
+
+    def encode_frames(self, msg: Msg) -> list[bytes | memoryview]:
+        """编码为分段的 buffer 列表：帧头、pickle 数据、各个带外缓冲区。"""
+        data = msg.to_dict()
+        data["content"] = _media_to_buffers(data["content"])
+        buffers: list[pickle.PickleBuffer] = []
+        payload = pickle.dumps(data, protocol=5, buffer_callback=buffers.append)
+        raws = [buffer.raw() for buffer in buffers]
+        header = struct.pack(
+            f"<IQ{len(raws)}Q",
+            len(raws),
+            len(payload),
+            *(raw.nbytes for raw in raws),
+        )
+        return [header, payload, *raws]
+
+    def decode(self, data: bytes | memoryview) -> Msg:
+        view = memoryview(data)
+        count, payload_size = struct.unpack_from("<IQ", view)
+        sizes = struct.unpack_from(f"<{count}Q", view, 12)
+        offset = 12 + 8 * count
+        payload = view[offset:offset + payload_size]
+        offset += payload_size
+        buffers = []
+        for size in sizes:
+            buffers.append(view[offset:offset + size])
+            offset += size
+        obj = pickle.loads(payload, buffers=buffers)
+        obj["content"] = _buffers_to_media(obj["content"])
+        return Msg.from_dict(obj)
+
+
+def _media_to_buffers(content: Any) -> Any:
+    """把媒体块中的 base64 数据换成原始字节的 PickleBuffer（返回新的列表，不修改原数据）。"""
+    if isinstance(content, str):
+        return content
+    result = []
+    for block in content:
+        block_type = block.get("type")
+        if block_type == "tool_result" and isinstance(block.get("output"), list):
+            block = {**block, "output": _media_to_buffers(block["output"])}
+        elif block_type in _MEDIA_TYPES and block.get("source", {}).get("type") == "base64":
+            raw = _strict_b64decode(block["source"]["data"])
+            if raw is not None:
+                block = {**block, "source": {**block["source"], "data": pickle.PickleBuffer(raw)}}
+        result.append(block)
+    return result
+
+
+def _buffers_to_media(content: Any) -> Any:
+    if isinstance(content, str):
+        return content
+    for block in content:
+        if block.get("type") == "tool_result" and isinstance(block.get("output"), list):
+            _buffers_to_media(block["output"])
+        source = block.get("source")
+        if isinstance(source, dict) and not isinstance(source.get("data", ""), str):
+            source["data"] = base64.b64encode(source["data"]).decode("ascii")
+    return content
+
+
+def _strict_b64decode(data: str) -> bytes | None:
+    """解码规范的 base64 字符串；无法原样还原的数据（含换行、非规范填充等）返回 None。"""
+    try:
+        raw = base64.b64decode(data, validate=True)
+    except (binascii.Error, ValueError):
+        return None
+    if not raw:
+        return None
+    # 只需核对最后一组：其余各组的编码是唯一的
+    tail = 3 - data[-4:].count("=")
+    if base64.b64encode(raw[-tail:]).decode("ascii") != data[-4:]:
+        return None
+    return raw
+
+
+_codecs: dict[str, MsgCodec] = {}
+_codecs_lock = threading.Lock()
+
+
+def register_codec(codec: MsgCodec) -> None:
+    """注册一个编解码器，之后可以通过 `get_codec(codec.name)` 获取。"""
+    with _codecs_lock:
+        _codecs[codec.name] = codec
+
+
+def get_codec(name: str) -> MsgCodec:
+    """按名字获取编解码器。
+
+    Raises:
+        KeyError: 没有注册该名字（例如对应的可选依赖未安装）
+    """
+    try:
+        return _codecs[name]
+    except KeyError:
+        raise KeyError(
+            f"未注册的编解码器 {name!r}，可用的有 {available_codecs()}",
+        ) from None
+
+
+def get_codec_by_tag(tag: bytes) -> MsgCodec:
+    """按单字节 tag 获取一个能解析该格式的编解码器（优先选择更快的实现）。"""
+    for name in _PREFERENCE:
+        codec = _codecs.get(name)
+        if codec is not None and codec.tag == tag:
+            return codec
+    for codec in _codecs.values():
+        if codec.tag == tag:
+            return codec
+    raise KeyError(f"没有能解析 tag {tag!r} 的编解码器，可能需要安装 msgpack 或 orjson")
+
+
+def available_codecs() -> list[str]:
+    return list(_codecs)
+
+
+def default_codec() -> MsgCodec:
+    """可用于持久化的最快编解码器：msgpack > orjson > json（不含 pickle）。"""
+    return get_codec_by_tag(b"m") if "msgpack" in _codecs else get_codec_by_tag(b"j")
+
+
+_PREFERENCE = ("msgpack", "orjson", "json")
+
+register_codec(JsonCodec())
+register_codec(Pickle5Codec())
+if orjson is not None:
+    register_codec(OrjsonCodec())
+if msgpack is not None:
+    register_codec(MsgpackCodec())
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""Model wrappers for agent_demo.
+
+子模块在首次访问其中的名字时才导入，见 `lazy_import.attach`：`metrics` 和
+`embedding` 不依赖 agentscope，只用它们时不必付出导入 agentscope 的代价。
+"""
+from typing import TYPE_CHECKING
+
+from lazy_import import attach
+
+if TYPE_CHECKING:
+    from .cached_model import DEFAULT_CACHE_PATH, CachedChatModel
+    from .embedding import HashingEmbedder, cosine_similarity
+    from .metrics import ReplyMetrics, summarize_metrics
+    from .replay import CassetteMissError, ReplayChatModel
+
+__all__ = [
+    "CachedChatModel",
+    "CassetteMissError",
+    "DEFAULT_CACHE_PATH",
+    "HashingEmbedder",
+    "ReplayChatModel",
+    "ReplyMetrics",
+    "cosine_similarity",
+    "summarize_metrics",
+]
+
+__getattr__, __dir__ = attach(
+    __name__,
+    {
+        "cached_model": ["DEFAULT_CACHE_PATH", "CachedChatModel"],
+        "embedding": ["HashingEmbedder", "cosine_similarity"],
+        "metrics": ["ReplyMetrics", "summarize_metrics"],
+        "replay": ["CassetteMissError", "ReplayChatModel"],
+    },
+)
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""模型包装器共用的请求键和响应辅助函数。"""
+import hashlib
+import json
+from typing import Any, AsyncGenerator
+
+from agentscope.model import ChatResponse
+
+__all__ = ["request_key", "single_chunk"]
+
+
+def request_key(model_name: str, messages: list[dict], kwargs: dict[str, Any]) -> str:
+    """请求的 sha256 键：(模型名, 全部消息, 其他参数) 完全相同时键相同。
+
+    `CachedChatModel` 的缓存键和 `ReplayChatModel` 的 cassette 匹配都使用它，
+    缓存文件与 cassette 中的键可以互相对照。
+    """
+    raw = json.dumps(
+        {"model": model_name, "messages": messages, "kwargs": kwargs},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+async def single_chunk(response: ChatResponse) -> AsyncGenerator[ChatResponse, None]:
+    """把一个完整响应包装成只产出一块的流式响应。"""
+    yield response
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""集中处理不同 AgentScope 版本之间的差异，以及它未公开导出的类型。"""
+from typing import Any
+
+from agentscope.model import ChatResponse
+
+try:
+    from agentscope.model import ChatUsage
+except ImportError:
+    # agentscope 1.0.x 没有在 agentscope.model 中导出 ChatUsage，只能从私有模块导入；
+    # 集中在这里，升级后若公开导出，只需改动这一处
+    from agentscope.model._model_usage import ChatUsage
+
+__all__ = ["ChatUsage", "make_chat_response", "response_metadata"]
+
+
+def response_metadata(response: ChatResponse) -> Any:
+    """读取响应的 metadata，早期版本的 ChatResponse 没有这个字段，返回 None。"""
+    return response.get("metadata")
+
+
+def make_chat_response(
+    content: list[dict],
+    usage: "ChatUsage | None",
+    metadata: Any = None,
+) -> ChatResponse:
+    """构建 ChatResponse，metadata 为 None 时不传入（兼容没有该字段的版本）。"""
+    if metadata is None:
+        return ChatResponse(content=content, usage=usage)
+    return ChatResponse(content=content, usage=usage, metadata=metadata)
@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+"""带响应缓存的聊天模型包装器：精确匹配 + 可选的语义相似匹配。"""
+import asyncio
+import base64
+import copy
+import json
+import math
+import operator
+import os
+import tempfile
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, AsyncGenerator, Callable, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from agentscope.model import ChatModelBase, ChatResponse
+
+from ._common import request_key, single_chunk
+from ._compat import ChatUsage, make_chat_response, response_metadata
+
+Embedder = Callable[[str], list[float]]
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "agent_demo" / "llm_cache.jsonl"
+
+
+class CachedChatModel(ChatModelBase):
+    """在聊天模型前面加一层响应缓存，可直接替换被包装的模型。
+
+    缓存分两层：
+
+    - 精确层：以 (模型名, 全部消息, 工具, tool_choice, 其他参数) 的 sha256
+      为键，完全相同的请求直接返回上次的响应
+    - 语义层（同时配置 `embedder` 和 `similarity_threshold` 时启用）：上下文
+      （除最后一条消息外的全部参数）相同、且最后一条用户消息的向量与某条
+      已缓存问题的余弦相似度不低于 `similarity_threshold` 时，复用那条问题
+      的响应。只有纯文本回复（不含工具调用）才会进入语义层
+
+    语义层默认关闭：阈值过低时会把另一个问题的回答返回给用户（例如「今天」
+    与「明天」只差一个字），只应配合真正的语义向量模型、在自己的数据上验证
+    过阈值后再开启。`HashingEmbedder` 只比较字面，不能区分这类问题。
+
+    条目超过 `ttl` 秒后失效，总数超过 `max_entries` 时淘汰最久未使用的条目。
+    配置 `persist_path` 时缓存会在启动时从磁盘加载，之后每条新响应以一行
+    JSON 追加到文件末尾（在线程池中写入，不阻塞事件循环）。多个实例可以
+    共用同一个文件，各自追加、互不覆盖；文件行数超过 `max_entries` 的两倍
+    时按文件中的最新内容压缩重写。追加和压缩都持有 `<persist_path>.lock`
+    上的文件锁（fcntl），压缩期间其他进程追加的行不会丢失。
+
+    被包装模型为流式时，未命中的请求照常逐块转发，结束后缓存最后一块
+    （AgentScope 的流式响应是累积的，最后一块即完整回复）；命中时只产出一块。
+
+    Args:
+        model (ChatModelBase): 被包装的模型，例如 `DashScopeChatModel`
+        ttl (float | None, optional): 条目有效期（秒），None 表示永不过期
+        max_entries (int, optional): 最多缓存的响应条数
+        embedder (Embedder | None, optional): 文本向量化函数，None 时只用精确层
+        similarity_threshold (float | None, optional): 语义命中的最低余弦相似度，
+            配置 `embedder` 时必须显式指定
+        persist_path (str | os.PathLike | None, optional): 持久化文件路径
+    """
+
+    def __init__(
+        self,
+        model: ChatModelBase,
+        ttl: float | None = 24 * 3600,
+        max_entries: int = 1000,
+        embedder: Embedder | None = None,
+        similarity_threshold: float | None = None,
+        persist_path: str | os.PathLike | None = None,
+    ) -> None:
+        if embedder is not None and similarity_threshold is None:
+            raise ValueError("启用语义层时必须指定在自己的数据上验证过的 similarity_threshold")
+        super().__init__(model.model_name, model.stream)
+        self.model = model
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold
+        self.persist_path = Path(persist_path) if persist_path is not None else None
+        # key -> {"created_at", "content", "usage", "metadata", "context_key", "vector"}
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        # context_key -> {key: 归一化后的向量}，语义查找只扫描同一上下文下的条目
+        self._by_context: dict[str, dict[str, list[float]]] = {}
+        self._file_lines = 0
+        self._file_lock = threading.Lock()
+        self.hits = {"exact": 0, "semantic": 0}
+        self.misses = 0
+        if self.persist_path is not None:
+            self._load()
+
+    async def __call__(
+        self,
+        messages: list[dict],
+        **kwargs: Any,
+    ) -> ChatResponse | AsyncGenerator[ChatResponse, None]:
+        start = time.perf_counter()
+        exact_key = request_key(self.model_name, messages, kwargs)
+        entry = self._lookup_exact(exact_key)
+        kind = "exact"
+        context_key, vector = None, None
+        if entry is None and self.embedder is not None:
+            query = _last_user_text(messages)
+            if query:
+                context_key = request_key(self.model_name, messages[:-1], kwargs)
+                # 只向量化一次，未命中时同一个向量随响应一起缓存
+                vector = _normalize(self.embedder(query))
+                entry = self._lookup_semantic(context_key, vector)
+                kind = "semantic"
+        if entry is not None:
+            self.hits[kind] += 1
+            response = self._to_response(entry, time.perf_counter() - start)
+            return single_chunk(response) if self.stream else response
+
+        self.misses += 1
+        result = await self.model(messages, **kwargs)
+        if not self.stream:
+            await self._store(exact_key, context_key, vector, result)
+            return result
+        return self._stream_and_store(result, exact_key, context_key, vector)
+
+    def clear(self) -> None:
+        """清空缓存（包括磁盘上的持久化文件）。"""
+        self._entries.clear()
+        self._by_context.clear()
+        if self.persist_path is not None:
+            with self._file_lock, self._process_lock():
+                self.persist_path.unlink(missing_ok=True)
+                self._file_lines = 0
+
+    async def _stream_and_store(
+        self,
+        chunks: AsyncGenerator[ChatResponse, None],
+        exact_key: str,
+        context_key: str | None,
+        vector: list[float] | None,
+    ) -> AsyncGenerator[ChatResponse, None]:
+        last = None
+        async for chunk in chunks:
+            last = chunk
+            yield chunk
+        if last is not None:
+            await self._store(exact_key, context_key, vector, last)
+
+    def _lookup_exact(self, key: str) -> dict[str, Any] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self._expired(entry):
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _lookup_semantic(self, context_key: str, vector: list[float]) -> dict[str, Any] | None:
+        best_key, best_score = None, self.similarity_threshold
+        expired = []
+        # 向量都已归一化，点积即余弦相似度
+        for key, candidate in self._by_context.get(context_key, {}).items():
+            if self._expired(self._entries[key]):
+                expired.append(key)
+                continue
+            score = sum(map(operator.mul, vector, candidate))
+            if score >= best_score:
+                best_key, best_score = key, score
+        for key in expired:
+            self._remove(key)
+        if best_key is None:
+            return None
+        self._entries.move_to_end(best_key)
+        return self._entries[best_key]
+
+    async def _store(
+        self,
+        exact_key: str,
+        context_key: str | None,
+        vector: list[float] | None,
+        response: ChatResponse,
+    ) -> None:
+        content = list(response.content)
+        # 工具调用依赖问题的具体措辞，只允许精确命中
+        if any(block.get("type") == "tool_use" for block in content):
+            context_key, vector = None, None
+        usage = response.usage
+        entry = {
+            "created_at": time.time(),
+            "content": copy.deepcopy(content),
+            "usage": (
+                {"input_tokens": usage.input_tokens, "output_tokens": usage.output_tokens}
+                if usage is not None else None
+            ),
+            "metadata": copy.deepcopy(response_metadata(response)),
+            "context_key": context_key,
+            "vector": vector,
+        }
+        self._insert(exact_key, entry)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+        if self.persist_path is not None:
+            await asyncio.to_thread(self._append, exact_key, entry)
+
+    def _insert(self, key: str, entry: dict[str, Any]) -> None:
+        self._remove(key)
+        self._entries[key] = entry
+        if entry["vector"] is not None:
+            self._by_context.setdefault(entry["context_key"], {})[key] = entry["vector"]
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None or entry["vector"] is None:
+            return
+        vectors = self._by_context.get(entry["context_key"])
+        if vectors is not None:
+            vectors.pop(key, None)
+            if not vectors:
+                del self._by_context[entry["context_key"]]
+
+    def _expired(self, entry: dict[str, Any]) -> bool:
+        return self.ttl is not None and time.time() - entry["created_at"] > self.ttl
+
+    @staticmethod
+    def _to_response(entry: dict[str, Any], elapsed: float) -> ChatResponse:
+        usage = entry["usage"]
+        return make_chat_response(
+            content=copy.deepcopy(entry["content"]),
+            usage=ChatUsage(
+                input_tokens=usage["input_tokens"],
+                output_tokens=usage["output_tokens"],
+                time=elapsed,
+            ) if usage is not None else None,
+            metadata=copy.deepcopy(entry["metadata"]),
+        )
+
+    def _load(self) -> None:
+        for key, entry in self._read_file():
+            if not self._expired(entry):
+                self._insert(key, entry)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _read_file(self) -> list[tuple[str, dict[str, Any]]]:
+        """按文件顺序读出全部条目，同一个键以最后一行为准。"""
+        records = []
+        try:
+            with open(self.persist_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 写到一半的行（例如进程被杀）直接跳过，不影响模型调用
+                        continue
+                    records.append((record.pop("key"), _decode_entry(record)))
+        except OSError:
+            return []
+        self._file_lines = len(records)
+        return records
+
+    def _append(self, key: str, entry: dict[str, Any]) -> None:
+        line = json.dumps({"key": key, **_encode_entry(entry)}, ensure_ascii=False) + "\n"
+        with self._file_lock:
+            self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+            with self._process_lock():
+                # 整行一次写入，多个进程同时追加时各行不会交错
+                with open(self.persist_path, "a", encoding="utf-8") as f:
+                    f.write(line)
+                self._file_lines += 1
+                if self._file_lines > 2 * self.max_entries:
+                    self._compact()
+
+    @contextmanager
+    def _process_lock(self) -> Iterator[None]:
+        """跨进程的文件锁；没有 fcntl 的平台上不加锁。"""
+        if fcntl is None:
+            yield
+            return
+        lock_path = self.persist_path.with_name(self.persist_path.name + ".lock")
+        with open(lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _compact(self) -> None:
+        """按文件中的最新内容重写，保留其他实例追加的条目。
+
+        需持有 `_file_lock` 和 `_process_lock`：读取文件和替换文件之间，
+        其他进程的追加会等待锁释放，不会写进即将被替换掉的旧文件。
+        """
+        latest: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        for key, entry in self._read_file():
+            if not self._expired(entry):
+                latest.pop(key, None)
+                latest[key] = entry
+        records = list(latest.items())[-self.max_entries:]
+        fd, tmp_path = tempfile.mkstemp(dir=self.persist_path.parent, suffix=".part")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                for key, entry in records:
+                    f.write(json.dumps({"key": key, **_encode_entry(entry)}, ensure_ascii=False))
+                    f.write("\n")
+            os.replace(tmp_path, self.persist_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self._file_lines = len(records)
+
+
+def _encode_entry(entry: dict[str, Any]) -> dict[str, Any]:
+    """向量以 float32 的 base64 保存，比 JSON 浮点数组小约四倍。"""
+    vector = entry["vector"]
+    if vector is None:
+        return entry
+    return {**entry, "vector": base64.b64encode(array("f", vector).tobytes()).decode("ascii")}
+
+
+def _decode_entry(record: dict[str, Any]) -> dict[str, Any]:
+    vector = record.get("vector")
+    if isinstance(vector, str):
+        record["vector"] = array("f", base64.b64decode(vector)).tolist()
+    return record
+
+
+def _normalize(vector: list[float]) -> list[float]:
+    norm = math.sqrt(sum(v * v for v in vector))
+    return [v / norm for v in vector] if norm else list(vector)
+
+
+def _last_user_text(messages: list[dict]) -> str | None:
+    """取最后一条消息的文本；它不是用户消息时返回 None（不走语义层）。"""
+    if not messages or messages[-1].get("role") != "user":
+        return None
+    content = messages[-1].get("content")
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            part.get("text", "") for part in content if isinstance(part, dict)
+        ) or None
+    return None
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""不依赖任何模型的本地文本向量化，用于语义缓存的近似匹配。"""
+import hashlib
+import math
+import re
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+|[^\sa-z0-9]", re.IGNORECASE)
+_PUNCTUATION = set("，。！？、；：,.!?;:\"'“”‘’（）()[]【】<>《》-—…~·")
+
+
+class HashingEmbedder:
+    """基于特征哈希的词袋向量。
+
+    英文按单词、中日韩文字按单字切分，再加上相邻两项组成的 bigram，
+    每个特征哈希到 `dim` 维中的一维并累加，最后做 L2 归一化，两个向量的
+    点积即余弦相似度。它只能识别字面上相近的问题（多一个语气词、换个
+    标点、调换少量词序），不理解同义改写，也分不清只差一两个字但含义
+    不同的问题（「今天」与「明天」、「删除」与「不要删除」的相似度都在
+    0.85 以上）。只适合离线测试，不要用它开启 `CachedChatModel` 的语义层。
+
+    Args:
+        dim (int, optional): 向量维度
+    """
+
+    def __init__(self, dim: int = 512) -> None:
+        self.dim = dim
+
+    def __call__(self, text: str) -> list[float]:
+        tokens = [
+            token.lower()
+            for token in _WORD_PATTERN.findall(text)
+            if token not in _PUNCTUATION
+        ]
+        features = tokens + [f"{a}\x00{b}" for a, b in zip(tokens, tokens[1:])]
+        vector = [0.0] * self.dim
+        for feature in features:
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            sign = 1.0 if value & 1 else -1.0
+            vector[(value >> 1) % self.dim] += sign
+        norm = math.sqrt(sum(v * v for v in vector))
+        if norm == 0:
+            return vector
+        return [v / norm for v in vector]
+
+
+def cosine_similarity(a: list[float], b: list[float]) -> float:
+    """两个向量的余弦相似度。"""
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
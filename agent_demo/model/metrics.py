@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""单次回复的耗时指标：首 token 时间、总耗时和生成速度。"""
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Iterable
+
+
+@dataclass
+class ReplyMetrics:
+    """一次模型回复的耗时指标。
+
+    非流式调用拿不到中间结果，首 token 时间即总耗时。
+
+    Attributes:
+        stream (bool): 是否为流式调用
+        ttft (float | None): 从发起请求到收到第一块内容的耗时（秒），未完成时为 None
+        latency (float | None): 从发起请求到收到完整回复的耗时（秒），未完成时为 None
+        output_tokens (int): 回复的 token 数，优先取模型返回的用量
+        chunks (int): 收到的响应块数
+    """
+
+    stream: bool
+    ttft: float | None = None
+    latency: float | None = None
+    output_tokens: int = 0
+    chunks: int = 0
+    _start: float = field(default_factory=time.perf_counter, repr=False)
+
+    @property
+    def tokens_per_second(self) -> float | None:
+        """整体生成速度：回复 token 数 / 总耗时。"""
+        if not self.latency:
+            return None
+        return self.output_tokens / self.latency
+
+    def on_chunk(self) -> None:
+        """收到一块响应时调用。"""
+        if self.ttft is None:
+            self.ttft = time.perf_counter() - self._start
+        self.chunks += 1
+
+    def finish(self, output_tokens: int) -> None:
+        """回复完成时调用。"""
+        self.latency = time.perf_counter() - self._start
+        if self.ttft is None:
+            self.ttft = self.latency
+        self.output_tokens = output_tokens
+
+    def to_dict(self) -> dict:
+        return {
+            "stream": self.stream,
+            "ttft": self.ttft,
+            "latency": self.latency,
+            "output_tokens": self.output_tokens,
+            "tokens_per_second": self.tokens_per_second,
+            "chunks": self.chunks,
+        }
+
+
+def summarize_metrics(metrics: Iterable[ReplyMetrics]) -> dict[str, float]:
+    """汇总多次回复的指标（p50/p95 首 token 时间、总耗时及平均生成速度）。"""
+    done = [m for m in metrics if m.latency is not None]
+    if not done:
+        return {}
+    ttfts = [m.ttft for m in done]
+    latencies = [m.latency for m in done]
+    speeds = [m.tokens_per_second for m in done if m.tokens_per_second is not None]
+    return {
+        "count": len(done),
+        "ttft_p50": _percentile(ttfts, 50),
+        "ttft_p95": _percentile(ttfts, 95),
+        "latency_p50": _percentile(latencies, 50),
+        "latency_p95": _percentile(latencies, 95),
+        "tokens_per_second": statistics.fmean(speeds) if speeds else 0.0,
+    }
+
+
+def _percentile(values: list[float], q: int) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
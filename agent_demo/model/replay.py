@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+"""录制 / 回放模型响应的聊天模型，用于离线、可复现地运行和压测智能体。"""
+import asyncio
+import copy
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, AsyncGenerator, Literal
+
+from agentscope.model import ChatModelBase, ChatResponse
+
+from ._common import request_key, single_chunk
+from ._compat import ChatUsage, make_chat_response, response_metadata
+
+CASSETTE_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+ReplayMode = Literal["replay", "record", "auto"]
+
+
+class CassetteMissError(LookupError):
+    """回放模式下找不到可用的录制响应。"""
+
+
+class ReplayChatModel(ChatModelBase):
+    """录制真实模型的响应到 cassette 文件，之后不联网按原样回放。
+
+    三种模式：
+
+    - `record`：每次请求都调用被包装的模型，把请求、响应和实测耗时追加到
+      cassette（每次录制后立即保存）
+    - `replay`：只从 cassette 回放，不需要被包装的模型，也不需要网络
+    - `auto`：cassette 中有匹配的录制就回放，没有时调用模型并录制
+
+    回放时先按请求内容（与 `CachedChatModel` 相同的 sha256 键）匹配，同一个
+    请求录制过多次时按录制顺序依次回放。`replay` 模式下没有完全匹配的请求
+    时默认抛出 `CassetteMissError`；请求中带有每次都不同的内容（例如工具
+    输出里的时间戳）时，可以传入 `strict=False` 退回按录制顺序取下一条未用过
+    的响应，适合脚本化的压测，每次退回都会记录一条警告日志。
+
+    回放时按录制的首块耗时（ttft）和总耗时模拟延迟，`time_scale` 缩放全部
+    延迟（0 表示不等待，用于测量编排本身的开销）；也可以用 `ttft`、
+    `tokens_per_second` 指定固定的延迟模型。流式回放把文本和思考内容按
+    `chunk_chars` 个字符切块，与 AgentScope 的流式响应一样逐块累积，
+    工具调用只出现在最后一块中。
+
+    Args:
+        cassette_path (str | os.PathLike): cassette 文件路径（JSON）
+        model (ChatModelBase | None, optional): 被包装的真实模型，`record` / `auto` 模式必需
+        mode (ReplayMode, optional): `replay`、`record` 或 `auto`
+        stream (bool | None, optional): 是否流式输出，默认与被包装模型一致，没有模型时为 True
+        strict (bool, optional): 回放时是否要求请求完全匹配，为 False 时未匹配的
+            请求按录制顺序回放
+        time_scale (float, optional): 录制耗时的缩放倍数
+        ttft (float | None, optional): 固定的首块耗时（秒），None 时使用录制值
+        tokens_per_second (float | None, optional): 固定的生成速度，None 时使用录制的生成耗时
+        chunk_chars (int, optional): 流式回放时每块新增的字符数
+    """
+
+    def __init__(
+        self,
+        cassette_path: str | os.PathLike,
+        model: ChatModelBase | None = None,
+        mode: ReplayMode = "replay",
+        stream: bool | None = None,
+        strict: bool = True,
+        time_scale: float = 1.0,
+        ttft: float | None = None,
+        tokens_per_second: float | None = None,
+        chunk_chars: int = 16,
+    ) -> None:
+        if mode not in ("replay", "record", "auto"):
+            raise ValueError(f"未知的模式 {mode!r}，可选 replay / record / auto")
+        if mode != "replay" and model is None:
+            raise ValueError(f"{mode} 模式需要传入被包装的模型")
+        self.cassette_path = Path(cassette_path).expanduser()
+        self.model = model
+        self.mode = mode
+        self.strict = strict
+        self.time_scale = time_scale
+        self.ttft = ttft
+        self.tokens_per_second = tokens_per_second
+        self.chunk_chars = max(1, chunk_chars)
+        self.interactions: list[dict[str, Any]] = []
+        model_name = self._load()
+        if model is not None:
+            model_name = model.model_name
+        if stream is None:
+            stream = model.stream if model is not None else True
+        super().__init__(model_name or "replay", stream)
+        self._used: set[int] = set()
+        self._by_key: dict[str, list[int]] = {}
+        for i, interaction in enumerate(self.interactions):
+            self._by_key.setdefault(interaction["key"], []).append(i)
+        self.replayed = 0
+        self.recorded = 0
+
+    async def __call__(
+        self,
+        messages: list[dict],
+        **kwargs: Any,
+    ) -> ChatResponse | AsyncGenerator[ChatResponse, None]:
+        key = request_key(self.model_name, messages, kwargs)
+        if self.mode != "record":
+            index = self._find(key)
+            if index is not None:
+                self._used.add(index)
+                self.replayed += 1
+                interaction = self.interactions[index]
+                if self.stream:
+                    return self._replay_stream(interaction)
+                return await self._replay(interaction)
+            if self.mode == "replay":
+                raise CassetteMissError(
+                    f"{self.cassette_path} 中没有与请求匹配的录制"
+                    f"（共 {len(self.interactions)} 条，已回放 {len(self._used)} 条）",
+                )
+        return await self._record(key, messages, kwargs)
+
+    def rewind(self) -> None:
+        """重置回放进度，从第一条录制重新开始。"""
+        self._used.clear()
+        self.replayed = 0
+
+    def _find(self, key: str) -> int | None:
+        for index in self._by_key.get(key, ()):
+            if index not in self._used:
+                return index
+        # auto 模式下未匹配的请求要交给模型录制，不按顺序退回
+        if self.strict or self.mode != "replay":
+            return None
+        for index in range(len(self.interactions)):
+            if index not in self._used:
+                logger.warning(
+                    "%s 中没有与请求匹配的录制，按录制顺序回放第 %d 条",
+                    self.cassette_path,
+                    index,
+                )
+                return index
+        return None
+
+    async def _replay(self, interaction: dict[str, Any]) -> ChatResponse:
+        ttft, generation = self._delays(interaction)
+        await _sleep(ttft + generation)
+        return _to_response(interaction, interaction["response"]["content"], ttft + generation)
+
+    async def _replay_stream(
+        self,
+        interaction: dict[str, Any],
+    ) -> AsyncGenerator[ChatResponse, None]:
+        ttft, generation = self._delays(interaction)
+        prefixes = _chunk_content(interaction["response"]["content"], self.chunk_chars)
+        await _sleep(ttft)
+        elapsed = ttft
+        for i, content in enumerate(prefixes):
+            if i:
+                step = generation / (len(prefixes) - 1)
+                await _sleep(step)
+                elapsed += step
+            yield _to_response(interaction, content, elapsed, (i + 1) / len(prefixes))
+
+    def _delays(self, interaction: dict[str, Any]) -> tuple[float, float]:
+        """返回 (首块耗时, 之后的生成耗时)。"""
+        recorded_ttft = interaction.get("ttft") or 0.0
+        recorded_latency = interaction.get("latency") or recorded_ttft
+        ttft = self.ttft if self.ttft is not None else recorded_ttft * self.time_scale
+        usage = interaction["response"]["usage"]
+        if self.tokens_per_second and usage is not None:
+            generation = usage["output_tokens"] / self.tokens_per_second
+        else:
+            generation = max(0.0, recorded_latency - recorded_ttft) * self.time_scale
+        return ttft, generation
+
+    async def _record(
+        self,
+        key: str,
+        messages: list[dict],
+        kwargs: dict[str, Any],
+    ) -> ChatResponse | AsyncGenerator[ChatResponse, None]:
+        start = time.perf_counter()
+        result = await self.model(messages, **kwargs)
+        request = {"messages": messages, "kwargs": kwargs}
+        if not self.model.stream:
+            elapsed = time.perf_counter() - start
+            self._append(key, request, result, elapsed, elapsed)
+            return single_chunk(result) if self.stream else result
+        chunks = self._record_stream(result, key, request, start)
+        if self.stream:
+            return chunks
+        last = None
+        async for last in chunks:
+            pass
+        return last
+
+    async def _record_stream(
+        self,
+        chunks: AsyncGenerator[ChatResponse, None],
+        key: str,
+        request: dict[str, Any],
+        start: float,
+    ) -> AsyncGenerator[ChatResponse, None]:
+        last = None
+        ttft = None
+        async for chunk in chunks:
+            if ttft is None:
+                ttft = time.perf_counter() - start
+            last = chunk
+            yield chunk
+        if last is not None:
+            self._append(key, request, last, ttft, time.perf_counter() - start)
+
+    def _append(
+        self,
+        key: str,
+        request: dict[str, Any],
+        response: ChatResponse,
+        ttft: float,
+        latency: float,
+    ) -> None:
+        usage = response.usage
+        self.interactions.append(
+            {
+                "key": key,
+                "request": json.loads(json.dumps(request, ensure_ascii=False, default=str)),
+                "response": {
+                    "content": copy.deepcopy(list(response.content)),
+                    "usage": (
+                        {"input_tokens": usage.input_tokens, "output_tokens": usage.output_tokens}
+                        if usage is not None else None
+                    ),
+                    "metadata": copy.deepcopy(response_metadata(response)),
+                },
+                "ttft": ttft,
+                "latency": latency,
+            },
+        )
+        index = len(self.interactions) - 1
+        self._by_key.setdefault(key, []).append(index)
+        # 刚录制的响应不再参与本次运行的回放
+        self._used.add(index)
+        self.recorded += 1
+        self._save()
+
+    def _load(self) -> str | None:
+        if not self.cassette_path.is_file():
+            if self.mode == "replay":
+                raise FileNotFoundError(f"cassette 文件不存在：{self.cassette_path}")
+            return None
+        data = json.loads(self.cassette_path.read_text(encoding="utf-8"))
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"不支持的 cassette 版本：{data.get('version')}")
+        self.interactions = data["interactions"]
+        return data.get("model_name")
+
+    def _save(self) -> None:
+        self.cassette_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cassette_path.parent, suffix=".part")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "version": CASSETTE_VERSION,
+                        "model_name": self.model_name,
+                        "interactions": self.interactions,
+                    },
+                    f,
+                    ensure_ascii=False,
+                    indent=1,
+                )
+            os.replace(tmp_path, self.cassette_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+
+def _chunk_content(content: list[dict], chunk_chars: int) -> list[list[dict]]:
+    """把完整回复拆成逐步累积的若干块，工具调用只放在最后一块。
+
+    返回的块与 `content` 共享未切分的 block，使用前需要复制（见 `_to_response`）。
+    """
+    streamed = [
+        (i, "text" if block.get("type") == "text" else "thinking")
+        for i, block in enumerate(content)
+        if block.get("type") in ("text", "thinking")
+    ]
+    prefixes = []
+    for position, (index, attr) in enumerate(streamed):
+        text = content[index].get(attr, "")
+        for end in range(chunk_chars, len(text), chunk_chars):
+            prefix = [content[i] for i, _ in streamed[:position]]
+            prefix.append({**content[index], attr: text[:end]})
+            prefixes.append(prefix)
+    prefixes.append(content)
+    return prefixes
+
+
+def _to_response(
+    interaction: dict[str, Any],
+    content: list[dict],
+    elapsed: float,
+    fraction: float = 1.0,
+) -> ChatResponse:
+    usage = interaction["response"]["usage"]
+    return make_chat_response(
+        content=copy.deepcopy(content),
+        usage=ChatUsage(
+            input_tokens=usage["input_tokens"],
+            output_tokens=round(usage["output_tokens"] * fraction),
+            time=elapsed,
+        ) if usage is not None else None,
+        metadata=copy.deepcopy(interaction["response"]["metadata"]),
+    )
+
+
+async def _sleep(seconds: float) -> None:
+    if seconds > 0:
+        await asyncio.sleep(seconds)
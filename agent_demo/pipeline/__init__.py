@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""Multi-agent pipelines for agent_demo."""
+from .broadcast import BroadcastHub
+from .fanout import FanoutResult, FanoutRunner
+
+__all__ = ["BroadcastHub", "FanoutResult", "FanoutRunner"]
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""按批次广播消息的 MsgHub：每轮只向每个订阅者投递一次共享的消息批次。"""
+import asyncio
+from typing import Any, Sequence
+
+from agentscope.agent import AgentBase
+from agentscope.message import Msg
+
+
+class _HubInbox:
+    """注册为各参与者的唯一订阅者，把回复暂存到 hub 的待广播队列。"""
+
+    def __init__(self, hub: "BroadcastHub") -> None:
+        self._hub = hub
+
+    async def observe(self, msg: Msg | list[Msg] | None) -> None:
+        self._hub.publish(msg)
+
+
+class BroadcastHub:
+    """与 agentscope 的 `MsgHub` 用法相同，但按批次广播消息。
+
+    `MsgHub` 中每条回复都要逐个 await 每个订阅者的 `observe`，订阅者再逐条
+    写入记忆：N 个智能体一轮各回复一次，就是 N×(N-1) 次协程调用和记忆写入。
+    本类把各参与者的订阅者换成 hub 自己，回复先暂存起来，`flush` 时打包成
+    一个不可变的元组，并发地交给每个参与者的 `observe` 一次，每轮只有 N 次
+    调用；订阅者的记忆若实现了 `add_many`（如 `TokenWindowMemory`、
+    `PersistentMemory`），整批只需一次写入。
+
+    所有订阅者共享同一个批次和其中的 `Msg` 对象，不做复制，订阅者不应修改
+    收到的消息。发送者自己也会收到包含自身回复的批次，记忆按 id 去重后
+    跳过，效果与 `MsgHub` 不广播给发送者相同。
+
+    与 `MsgHub` 的区别在于回复要等到 `flush` 才送达：同一轮中后发言的
+    智能体看不到先发言者的回复。需要逐条可见时，在每次回复后调用 `flush`。
+
+    Args:
+        participants (Sequence[AgentBase]): 参与广播的智能体
+        announcement (Msg | list[Msg] | None, optional): 进入 hub 时广播给所有参与者的消息
+    """
+
+    def __init__(
+        self,
+        participants: Sequence[AgentBase],
+        announcement: Msg | list[Msg] | None = None,
+    ) -> None:
+        self.participants = list(participants)
+        self.announcement = announcement
+        self._inbox = _HubInbox(self)
+        self._pending: list[Msg] = []
+
+    async def __aenter__(self) -> "BroadcastHub":
+        for agent in self.participants:
+            agent.reset_subscribers([self._inbox])
+        if self.announcement is not None:
+            await self.broadcast(self.announcement)
+        return self
+
+    async def __aexit__(self, *args: Any, **kwargs: Any) -> None:
+        try:
+            await self.flush()
+        finally:
+            for agent in self.participants:
+                agent.reset_subscribers([])
+
+    def add(self, new_participant: AgentBase | list[AgentBase]) -> None:
+        """加入新的参与者，从下一次 `flush` 开始接收广播。"""
+        if isinstance(new_participant, AgentBase):
+            new_participant = [new_participant]
+        for agent in new_participant:
+            if agent not in self.participants:
+                self.participants.append(agent)
+                agent.reset_subscribers([self._inbox])
+
+    def delete(self, participant: AgentBase | list[AgentBase]) -> None:
+        """移除参与者，它之后的回复不再广播，也不再接收广播。"""
+        if isinstance(participant, AgentBase):
+            participant = [participant]
+        for agent in participant:
+            if agent in self.participants:
+                agent.reset_subscribers([])
+                self.participants.remove(agent)
+
+    def publish(self, msg: Msg | list[Msg] | None) -> None:
+        """把消息放入待广播队列，下一次 `flush` 时送达。"""
+        if msg is None:
+            return
+        if isinstance(msg, Msg):
+            self._pending.append(msg)
+        else:
+            self._pending.extend(msg)
+
+    async def flush(self) -> tuple[Msg, ...]:
+        """把待广播的消息打包成一个批次，并发投递给所有参与者。
+
+        Returns:
+            tuple[Msg, ...]: 本次投递的批次，没有待广播的消息时为空元组
+        """
+        if not self._pending:
+            return ()
+        batch = tuple(self._pending)
+        self._pending.clear()
+        await self._deliver(batch)
+        return batch
+
+    async def broadcast(self, msg: Msg | list[Msg]) -> None:
+        """立即广播消息（连同之前暂存的回复）给所有参与者。"""
+        self.publish(msg)
+        await self.flush()
+
+    async def _deliver(self, batch: tuple[Msg, ...]) -> None:
+        # observe 的签名只接受 Msg 或 list[Msg]：声明了 accepts_msg_batch 的智能体
+        # （如 MyAgent）直接接收共享的元组，其余的各自得到一份列表
+        await asyncio.gather(
+            *(
+                agent.observe(batch if getattr(agent, "accepts_msg_batch", False) else list(batch))
+                for agent in self.participants
+            ),
+        )
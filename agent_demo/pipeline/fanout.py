@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""把一批互不相关的输入消息并发分发给一组智能体。"""
+import asyncio
+import contextlib
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, Sequence
+
+from agentscope.agent import AgentBase
+from agentscope.message import Msg
+
+
+@dataclass
+class FanoutResult:
+    """一条输入消息的处理结果。
+
+    Attributes:
+        index (int): 输入消息在批次中的位置
+        msg (Msg): 输入消息
+        reply (Msg | None): 智能体的回复，失败或超时时为 None
+        error (BaseException | None): 处理失败时的异常，超时为 `asyncio.TimeoutError`
+        latency (float): 从智能体开始处理到结束的耗时（秒），不含排队时间
+        agent_name (str): 处理该消息的智能体名称
+    """
+
+    index: int
+    msg: Msg
+    reply: Msg | None
+    error: BaseException | None
+    latency: float
+    agent_name: str
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class FanoutRunner:
+    """用一组智能体并发处理一批互不相关的消息，按输入顺序返回结果。
+
+    智能体带有记忆等状态，同一时刻只能处理一条消息，因此每个智能体
+    同时只会被分配一个任务：空闲的智能体放在队列里，任务开始时取出、
+    结束后归还，并发度即智能体数量。整批耗时约等于最慢的一组任务，
+    而不是所有任务耗时之和。
+
+    单个任务失败或超时不会影响其他任务，异常记录在对应的
+    `FanoutResult.error` 中。超时的任务会被取消，智能体按自己的
+    `handle_interrupt` 逻辑收尾后再回到队列。
+
+    Args:
+        agents (Sequence[AgentBase] | Callable[[], AgentBase]):
+            智能体列表，或创建智能体的工厂函数（按需最多创建 `pool_size` 个）
+        pool_size (int, optional): 使用工厂函数时智能体的最大数量
+        timeout (float | None, optional): 单个任务的超时时间（秒），None 表示不限
+        clear_memory (bool, optional): 每个任务开始前是否清空智能体的记忆，
+            保证结果不受之前分配给同一智能体的任务影响
+    """
+
+    def __init__(
+        self,
+        agents: Sequence[AgentBase] | Callable[[], AgentBase],
+        pool_size: int = 4,
+        timeout: float | None = None,
+        clear_memory: bool = True,
+    ) -> None:
+        if isinstance(agents, Sequence):
+            if not agents:
+                raise ValueError("FanoutRunner 至少需要一个智能体")
+            self.agents = list(agents)
+            self.factory = None
+        else:
+            self.agents = []
+            self.factory = agents
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.clear_memory = clear_memory
+
+    async def run(self, msgs: Iterable[Msg]) -> list[FanoutResult]:
+        """并发处理一批消息。
+
+        Args:
+            msgs (Iterable[Msg]): 互不相关的输入消息
+
+        Returns:
+            list[FanoutResult]: 与输入顺序一致的结果列表
+        """
+        msgs = list(msgs)
+        if self.factory is not None:
+            while len(self.agents) < min(self.pool_size, len(msgs)):
+                self.agents.append(self.factory())
+
+        idle: asyncio.Queue[AgentBase] = asyncio.Queue()
+        for agent in self.agents:
+            idle.put_nowait(agent)
+        return list(
+            await asyncio.gather(
+                *(self._run_one(index, msg, idle) for index, msg in enumerate(msgs)),
+            ),
+        )
+
+    async def _run_one(
+        self,
+        index: int,
+        msg: Msg,
+        idle: asyncio.Queue[AgentBase],
+    ) -> FanoutResult:
+        agent = await idle.get()
+        start = time.perf_counter()
+        reply, error = None, None
+        try:
+            if self.clear_memory and getattr(agent, "memory", None) is not None:
+                await agent.memory.clear()
+            reply = await self._call_with_timeout(agent, msg)
+        except Exception as e:
+            error = e
+        finally:
+            idle.put_nowait(agent)
+        return FanoutResult(
+            index=index,
+            msg=msg,
+            reply=reply,
+            error=error,
+            latency=time.perf_counter() - start,
+            agent_name=getattr(agent, "name", type(agent).__name__),
+        )
+
+    async def _call_with_timeout(self, agent: AgentBase, msg: Msg) -> Msg:
+        task = asyncio.create_task(agent(msg))
+        try:
+            done, _ = await asyncio.wait({task}, timeout=self.timeout)
+        except BaseException:
+            # 整批被取消时，把正在执行的任务一起取消
+            task.cancel()
+            raise
+        if task in done:
+            return task.result()
+        task.cancel()
+        # 智能体收到取消后会执行 handle_interrupt，等它收尾完再归还
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        raise asyncio.TimeoutError(
+            f"智能体 {getattr(agent, 'name', agent)} 处理超时（{self.timeout} 秒）",
+        )
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""测试用的本地模型。"""
+from typing import Any, AsyncGenerator
+
+from agentscope.model import ChatModelBase, ChatResponse
+
+
+class FakeChatModel(ChatModelBase):
+    """按顺序返回预设文本的模型，记录收到的每次请求。
+
+    流式时把每条回复按 `chunk_chars` 个字符逐块累积产出，与 AgentScope 的
+    流式响应一致。
+    """
+
+    def __init__(
+        self,
+        replies: list[str] | None = None,
+        stream: bool = False,
+        chunk_chars: int = 4,
+    ) -> None:
+        super().__init__("fake", stream)
+        self.replies = list(replies or ["好的"])
+        self.chunk_chars = chunk_chars
+        self.calls: list[dict[str, Any]] = []
+
+    async def __call__(
+        self,
+        messages: list[dict],
+        **kwargs: Any,
+    ) -> ChatResponse | AsyncGenerator[ChatResponse, None]:
+        self.calls.append({"messages": messages, **kwargs})
+        text = self.replies[min(len(self.calls), len(self.replies)) - 1]
+        if not self.stream:
+            return ChatResponse(content=[{"type": "text", "text": text}])
+        return self._stream(text)
+
+    async def _stream(self, text: str) -> AsyncGenerator[ChatResponse, None]:
+        for end in range(self.chunk_chars, len(text) + self.chunk_chars, self.chunk_chars):
+            yield ChatResponse(content=[{"type": "text", "text": text[:end]}])
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import base64
+import os
+
+import pytest
+from agentscope.message import Msg
+
+from message import BlobStore
+
+
+def _image_msg(data: bytes) -> Msg:
+    return Msg(
+        "user",
+        [
+            {"type": "text", "text": "看看这张图"},
+            {
+                "type": "image",
+                "source": {
+                    "type": "base64",
+                    "media_type": "image/png",
+                    "data": base64.b64encode(data).decode("ascii"),
+                },
+            },
+        ],
+        "user",
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BlobStore(tmp_path / "blobs", min_bytes=64)
+
+
+def test_offload_returns_copy_and_leaves_original(store):
+    msg = _image_msg(os.urandom(1000))
+    original_content = msg.content
+    original_block = dict(msg.content[1])
+
+    offloaded = store.offload(msg)
+
+    assert offloaded is not msg
+    assert offloaded.id == msg.id
+    assert msg.content is original_content
+    assert msg.content[1] == original_block
+    source = offloaded.content[1]["source"]
+    assert source["type"] == "url"
+    assert source["url"].endswith(".png")
+    assert offloaded.content[0] is msg.content[0]
+
+
+def test_restore_round_trip(store):
+    data = os.urandom(1000)
+    msg = _image_msg(data)
+    restored = store.restore(store.offload(msg))
+    assert restored.id == msg.id
+    assert base64.b64decode(restored.content[1]["source"]["data"]) == data
+
+
+def test_small_and_text_messages_are_unchanged(store):
+    small = _image_msg(b"tiny")
+    text = Msg("user", "hello", "user")
+    assert store.offload(small) is small
+    assert store.offload(text) is text
+
+
+def test_same_content_is_stored_once(store):
+    data = os.urandom(1000)
+    first = store.offload(_image_msg(data))
+    second = store.offload(_image_msg(data))
+    assert first.content[1]["source"]["url"] == second.content[1]["source"]["url"]
+    assert store.total_bytes() == 1000
+
+
+def test_offload_nested_tool_result(store):
+    image = _image_msg(os.urandom(1000)).content[1]
+    msg = Msg(
+        "system",
+        [{"type": "tool_result", "id": "1", "name": "tool", "output": [image]}],
+        "system",
+    )
+    offloaded = store.offload(msg)
+    assert offloaded.content[0]["output"][0]["source"]["type"] == "url"
+    assert msg.content[0]["output"][0] is image
+
+
+def test_offload_async(store):
+    msg = _image_msg(os.urandom(1000))
+    offloaded = asyncio.run(store.offload_async(msg))
+    assert offloaded.content[1]["source"]["type"] == "url"
+    assert msg.content[1]["source"]["type"] == "base64"
+    small = _image_msg(b"tiny")
+    assert asyncio.run(store.offload_async(small)) is small
+
+
+def test_sweep_keeps_referenced_and_recent_files(store):
+    kept_msg = store.offload(_image_msg(os.urandom(1000)))
+    orphan = store.put(os.urandom(500), "image/png")
+    recent_orphan = store.put(os.urandom(300), "image/png")
+    for path in store.referenced_paths([kept_msg]) | {orphan}:
+        os.utime(path, (0, 0))
+
+    freed = store.sweep(store.referenced_paths([kept_msg]), min_age=3600)
+
+    assert freed == 500
+    assert not orphan.exists()
+    assert recent_orphan.exists()
+    assert all(path.exists() for path in store.referenced_paths([kept_msg]))
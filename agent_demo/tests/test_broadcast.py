@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import base64
+import copy
+import os
+
+from agentscope.message import Msg
+
+from customeAgent import MyAgent
+from message import BlobStore
+from pipeline import BroadcastHub
+from tests.fakes import FakeChatModel
+
+
+def _image_msg(name: str) -> Msg:
+    return Msg(
+        name,
+        [
+            {
+                "type": "image",
+                "source": {
+                    "type": "base64",
+                    "media_type": "image/png",
+                    "data": base64.b64encode(os.urandom(2000)).decode("ascii"),
+                },
+            },
+        ],
+        "assistant",
+    )
+
+
+def _make_agents(tmp_path, count: int) -> list[MyAgent]:
+    store = BlobStore(tmp_path / "blobs", min_bytes=64)
+    agents = []
+    for _ in range(count):
+        agent = MyAgent(model=FakeChatModel())
+        agent.memory.blob_store = store
+        agent._disable_console_output = True
+        agents.append(agent)
+    return agents
+
+
+def test_broadcast_batch_is_unchanged_after_observe(tmp_path):
+    agents = _make_agents(tmp_path, 3)
+    msgs = [_image_msg("alice"), Msg("bob", "你好", "assistant")]
+    snapshot = copy.deepcopy([msg.to_dict() for msg in msgs])
+
+    async def run() -> tuple[Msg, ...]:
+        async with BroadcastHub(agents) as hub:
+            hub.publish(msgs)
+            return await hub.flush()
+
+    batch = asyncio.run(run())
+
+    assert [msg.to_dict() for msg in batch] == snapshot
+    for agent in agents:
+        stored = agent.memory.content
+        assert [msg.id for msg in stored] == [msg.id for msg in msgs]
+        # 记忆里是移出媒体数据后的副本
+        assert stored[0] is not batch[0]
+        assert stored[0].content[0]["source"]["type"] == "url"
+        assert stored[1] is batch[1]
+
+
+def test_flush_delivers_replies_once_and_dedupes(tmp_path):
+    agents = _make_agents(tmp_path, 3)
+
+    async def run() -> None:
+        async with BroadcastHub(agents) as hub:
+            for agent in agents:
+                await agent(Msg("user", "轮到你了", "user"))
+            assert await hub.flush()
+            # 没有新回复时不再投递
+            assert await hub.flush() == ()
+
+    asyncio.run(run())
+
+    for agent in agents:
+        ids = [msg.id for msg in agent.memory.content]
+        assert len(ids) == len(set(ids))
+        # 自己收到的问题和回复，加上另外两个智能体的回复
+        assert len(ids) == 4
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+
+import pytest
+
+from model import CachedChatModel, cached_model
+from tests.fakes import FakeChatModel
+
+
+def _ask(model, text, history=()):
+    messages = [*history, {"role": "user", "content": text}]
+    return asyncio.run(model(messages))
+
+
+def _text(response):
+    return response.content[0]["text"]
+
+
+async def _collect(stream):
+    return [_text(chunk) async for chunk in stream]
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_exact_hit_skips_model():
+    fake = FakeChatModel(["第一次", "第二次"])
+    model = CachedChatModel(fake)
+
+    assert _text(_ask(model, "你好")) == "第一次"
+    assert _text(_ask(model, "你好")) == "第一次"
+    assert _text(_ask(model, "你好！")) == "第二次"
+    assert len(fake.calls) == 2
+    assert model.hits == {"exact": 1, "semantic": 0}
+    assert model.misses == 2
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cached_model.time, "time", clock)
+    fake = FakeChatModel(["旧回答", "新回答"])
+    model = CachedChatModel(fake, ttl=60)
+
+    _ask(model, "天气如何")
+    clock.now += 59
+    assert _text(_ask(model, "天气如何")) == "旧回答"
+    clock.now += 2
+    assert _text(_ask(model, "天气如何")) == "新回答"
+    assert len(fake.calls) == 2
+
+
+def test_semantic_layer_respects_threshold():
+    vectors = {"北京天气": [1.0, 0.0], "北京的天气": [0.96, 0.28], "上海天气": [0.6, 0.8]}
+    fake = FakeChatModel(["晴", "多云"])
+    model = CachedChatModel(fake, embedder=vectors.__getitem__, similarity_threshold=0.9)
+
+    assert _text(_ask(model, "北京天气")) == "晴"
+    # 相似度 0.96，命中语义层
+    assert _text(_ask(model, "北京的天气")) == "晴"
+    # 相似度 0.6，低于阈值
+    assert _text(_ask(model, "上海天气")) == "多云"
+    assert model.hits == {"exact": 0, "semantic": 1}
+
+
+def test_semantic_layer_requires_same_context():
+    vectors = {"北京天气": [1.0, 0.0]}
+    fake = FakeChatModel(["晴", "雨"])
+    model = CachedChatModel(fake, embedder=vectors.__getitem__, similarity_threshold=0.9)
+    other_history = [{"role": "user", "content": "我在出差"}]
+
+    _ask(model, "北京天气")
+    assert _text(_ask(model, "北京天气", other_history)) == "雨"
+
+
+def test_embedder_requires_threshold():
+    with pytest.raises(ValueError):
+        CachedChatModel(FakeChatModel(), embedder=lambda text: [1.0])
+
+
+def test_persisted_entries_reload(tmp_path):
+    path = tmp_path / "cache.jsonl"
+    _ask(CachedChatModel(FakeChatModel(["记住我"]), persist_path=path), "你好")
+
+    fake = FakeChatModel(["不该被调用"])
+    reloaded = CachedChatModel(fake, persist_path=path)
+
+    assert _text(_ask(reloaded, "你好")) == "记住我"
+    assert fake.calls == []
+
+
+def test_streaming_miss_forwards_chunks_and_hit_replays_final():
+    fake = FakeChatModel(["一二三四五六"], stream=True, chunk_chars=2)
+    model = CachedChatModel(fake)
+    messages = [{"role": "user", "content": "数数"}]
+
+    first = asyncio.run(_collect(asyncio.run(model(messages))))
+    second = asyncio.run(_collect(asyncio.run(model(messages))))
+
+    assert first == ["一二", "一二三四", "一二三四五六"]
+    assert second == ["一二三四五六"]
+    assert len(fake.calls) == 1
+
+
+def test_compaction_holds_file_lock(tmp_path, monkeypatch):
+    fcntl = pytest.importorskip("fcntl")
+    path = tmp_path / "cache.jsonl"
+    ours = CachedChatModel(FakeChatModel(["a", "b", "c"]), max_entries=1, persist_path=path)
+
+    read_file = ours._read_file
+    lock_states = []
+
+    def probe():
+        # 压缩读取文件时，其他进程拿不到同一把锁
+        with open(f"{path}.lock", "a") as other:
+            try:
+                fcntl.flock(other, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_states.append("held")
+            else:
+                fcntl.flock(other, fcntl.LOCK_UN)
+                lock_states.append("free")
+        return read_file()
+
+    monkeypatch.setattr(ours, "_read_file", probe)
+    for text in ("一", "二", "三"):
+        _ask(ours, text)
+
+    assert lock_states == ["held"]
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["content"][0]["text"] for line in lines] == ["c"]
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+import base64
+import os
+
+import pytest
+from agentscope.message import Msg
+
+from message import available_codecs, default_codec, get_codec, get_codec_by_tag
+
+
+def _rich_msg() -> Msg:
+    return Msg(
+        "Friday",
+        [
+            {"type": "text", "text": "看这张图"},
+            {
+                "type": "image",
+                "source": {
+                    "type": "base64",
+                    "media_type": "image/png",
+                    "data": base64.b64encode(os.urandom(3001)).decode("ascii"),
+                },
+            },
+            {
+                "type": "tool_result",
+                "id": "call_1",
+                "name": "snapshot",
+                "output": [
+                    {
+                        "type": "audio",
+                        "source": {
+                            "type": "base64",
+                            "media_type": "audio/wav",
+                            "data": base64.b64encode(b"RIFF" + os.urandom(100)).decode("ascii"),
+                        },
+                    },
+                ],
+            },
+        ],
+        "assistant",
+        metadata={"turn": 3},
+    )
+
+
+@pytest.mark.parametrize("name", available_codecs())
+def test_round_trip_preserves_the_message(name):
+    codec = get_codec(name)
+    msg = _rich_msg()
+
+    decoded = codec.decode(codec.encode(msg))
+
+    assert decoded.to_dict() == msg.to_dict()
+    assert codec.loads(codec.dumps({"a": [1, "二"]})) == {"a": [1, "二"]}
+
+
+def test_pickle5_keeps_media_out_of_band_and_decodes_from_memoryview():
+    codec = get_codec("pickle5")
+    msg = _rich_msg()
+
+    frames = codec.encode_frames(msg)
+    decoded = codec.decode(memoryview(b"".join(frames)))
+
+    assert len(frames) == 4
+    assert frames[2].nbytes == 3001
+    assert decoded.to_dict() == msg.to_dict()
+    # 编码不会改动原消息中的 base64 字符串
+    assert isinstance(msg.content[1]["source"]["data"], str)
+
+
+def test_pickle5_leaves_non_canonical_base64_inline():
+    codec = get_codec("pickle5")
+    data = base64.encodebytes(os.urandom(200)).decode("ascii")
+    msg = Msg(
+        "u",
+        [{"type": "image", "source": {"type": "base64", "media_type": "image/png", "data": data}}],
+        "user",
+    )
+
+    frames = codec.encode_frames(msg)
+
+    assert len(frames) == 2
+    assert codec.decode(b"".join(frames)).content[0]["source"]["data"] == data
+
+
+def test_lookup_by_tag_and_unknown_names():
+    assert get_codec_by_tag(b"j").tag == b"j"
+    assert default_codec().name != "pickle5"
+    with pytest.raises(KeyError):
+        get_codec("yaml")
+    with pytest.raises(KeyError):
+        get_codec_by_tag(b"?")
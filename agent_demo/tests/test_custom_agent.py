@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+import asyncio
+from typing import Any, AsyncGenerator
+
+import pytest
+from agentscope.message import Msg
+from agentscope.model import ChatResponse, DashScopeChatModel
+
+from customeAgent import MyAgent
+from model import CachedChatModel
+from tests.fakes import FakeChatModel
+
+
+class _StallingModel(FakeChatModel):
+    """第一次调用流式产出一块后停住，等待被打断；之后正常回复。"""
+
+    def __init__(self, first: str, replies: list[str]) -> None:
+        super().__init__(replies, stream=True)
+        self.first = first
+        self.started = asyncio.Event()
+
+    async def __call__(
+        self,
+        messages: list[dict],
+        **kwargs: Any,
+    ) -> AsyncGenerator[ChatResponse, None]:
+        if self.calls:
+            return await super().__call__(messages, **kwargs)
+        self.calls.append({"messages": messages, **kwargs})
+        return self._stall()
+
+    async def _stall(self) -> AsyncGenerator[ChatResponse, None]:
+        yield ChatResponse(content=[{"type": "text", "text": self.first}])
+        self.started.set()
+        await asyncio.Event().wait()
+
+
+class _FakeDashScopeModel(DashScopeChatModel):
+    """不联网的 DashScope 模型，请求交给 `FakeChatModel` 处理。"""
+
+    def __init__(self, fake: FakeChatModel) -> None:
+        super().__init__("qwen-max", api_key="test", stream=fake.stream)
+        self.fake = fake
+
+    async def __call__(self, messages: list[dict], **kwargs: Any) -> Any:
+        return await self.fake(messages, **kwargs)
+
+
+class _FailingModel(FakeChatModel):
+    async def __call__(self, messages: list[dict], **kwargs: Any) -> Any:
+        return self._fail()
+
+    async def _fail(self) -> AsyncGenerator[ChatResponse, None]:
+        yield ChatResponse(content=[{"type": "text", "text": "半句"}])
+        raise ConnectionError("stream reset")
+
+
+def _make_agent(model) -> MyAgent:
+    agent = MyAgent(model=model)
+    agent._disable_console_output = True
+    return agent
+
+
+async def _interrupt_first_reply(agent: MyAgent, fake: _StallingModel) -> Msg:
+    task = asyncio.create_task(agent(Msg("user", "讲个故事", "user")))
+    await fake.started.wait()
+    await agent.interrupt()
+    return await task
+
+
+def test_continue_resumes_from_partial_with_dashscope():
+    fake = _StallingModel("从前有座山，", ["山里有座庙。"])
+    agent = _make_agent(CachedChatModel(_FakeDashScopeModel(fake)))
+
+    async def run() -> tuple[Msg, Msg]:
+        interrupted = await _interrupt_first_reply(agent, fake)
+        return interrupted, await agent(Msg("user", "继续", "user"))
+
+    interrupted, reply = asyncio.run(run())
+
+    assert interrupted.metadata["interrupted"] is True
+    assert fake.calls[-1]["messages"][-1] == {
+        "role": "assistant",
+        "content": "从前有座山，",
+        "partial": True,
+    }
+    assert reply.get_text_content() == "从前有座山，山里有座庙。"
+    # 续写完成后，被打断的那一段被完整回复替换
+    assert [m.id for m in agent.memory.content][-1] == reply.id
+    assert interrupted.id not in [m.id for m in agent.memory.content]
+    assert agent._partial_msg is None
+
+
+def test_continue_matches_interrupted_msg_by_id():
+    fake = _StallingModel("从前有座山，", ["山里有座庙。"])
+    agent = _make_agent(_FakeDashScopeModel(fake))
+
+    async def run() -> Msg:
+        await _interrupt_first_reply(agent, fake)
+        # 模拟从持久化记忆重新加载：内容相同、对象不同
+        agent.interrupted_msg = Msg.from_dict(agent.interrupted_msg.to_dict())
+        return await agent(None)
+
+    reply = asyncio.run(run())
+
+    assert fake.calls[-1]["messages"][-1].get("partial") is True
+    assert reply.get_text_content() == "从前有座山，山里有座庙。"
+
+
+def test_continue_without_partial_support_is_a_new_message():
+    fake = _StallingModel("从前有座山，", ["山里有座庙。"])
+    agent = _make_agent(fake)
+
+    async def run() -> Msg:
+        await _interrupt_first_reply(agent, fake)
+        return await agent(Msg("user", "继续", "user"))
+
+    reply = asyncio.run(run())
+
+    messages = fake.calls[-1]["messages"]
+    assert all("partial" not in m for m in messages)
+    assert messages[-1]["role"] == "user"
+    assert reply.get_text_content() == "山里有座庙。"
+
+
+def test_partial_msg_is_cleared_when_the_model_fails():
+    agent = _make_agent(_FailingModel(stream=True))
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(agent(Msg("user", "你好", "user")))
+
+    assert agent._partial_msg is None
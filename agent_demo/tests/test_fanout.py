@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+import asyncio
+from typing import Any
+
+import pytest
+from agentscope.agent import AgentBase
+from agentscope.memory import InMemoryMemory
+from agentscope.message import Msg
+
+from pipeline import FanoutRunner
+
+
+class _DelayAgent(AgentBase):
+    """按消息内容中的秒数等待后回复，内容为 "boom" 时抛出异常。"""
+
+    active = 0
+    peak = 0
+
+    def __init__(self, name: str) -> None:
+        super().__init__()
+        self.name = name
+        self.memory = InMemoryMemory()
+        self.interrupted = 0
+
+    async def reply(self, msg: Msg) -> Msg:
+        await self.memory.add(msg)
+        text = msg.get_text_content()
+        if text == "boom":
+            raise RuntimeError("boom")
+        type(self).active += 1
+        type(self).peak = max(type(self).peak, type(self).active)
+        try:
+            await asyncio.sleep(float(text))
+        finally:
+            type(self).active -= 1
+        return Msg(self.name, f"{text}:{len(await self.memory.get_memory())}", "assistant")
+
+    async def handle_interrupt(self, *args: Any, **kwargs: Any) -> Msg:
+        self.interrupted += 1
+        return Msg(self.name, "interrupted", "assistant")
+
+    async def observe(self, msg: Msg | list[Msg] | None) -> None:
+        pass
+
+
+@pytest.fixture(autouse=True)
+def reset_counters():
+    _DelayAgent.active = _DelayAgent.peak = 0
+
+
+def _msgs(*texts: str) -> list[Msg]:
+    return [Msg("user", text, "user") for text in texts]
+
+
+def test_results_follow_input_order_and_run_concurrently():
+    runner = FanoutRunner([_DelayAgent("a"), _DelayAgent("b")])
+
+    results = asyncio.run(runner.run(_msgs("0.05", "0.01", "0.03", "0")))
+
+    assert [r.index for r in results] == [0, 1, 2, 3]
+    # 每个任务开始前清空记忆，回复中的记忆条数总是 1
+    assert [r.reply.get_text_content() for r in results] == ["0.05:1", "0.01:1", "0.03:1", "0:1"]
+    assert _DelayAgent.peak == 2
+
+
+def test_failures_and_timeouts_do_not_affect_other_tasks():
+    agent = _DelayAgent("a")
+    runner = FanoutRunner([agent], timeout=0.05)
+
+    results = asyncio.run(runner.run(_msgs("boom", "5", "0")))
+
+    assert isinstance(results[0].error, RuntimeError) and results[0].reply is None
+    assert isinstance(results[1].error, asyncio.TimeoutError)
+    assert agent.interrupted == 1
+    assert results[2].ok and results[2].reply.get_text_content() == "0:1"
+
+
+def test_factory_creates_at_most_pool_size_agents():
+    created = []
+
+    def factory() -> _DelayAgent:
+        created.append(_DelayAgent(f"agent-{len(created)}"))
+        return created[-1]
+
+    runner = FanoutRunner(factory, pool_size=3)
+    asyncio.run(runner.run(_msgs("0")))
+    assert len(created) == 1
+
+    results = asyncio.run(runner.run(_msgs(*["0.01"] * 6)))
+    assert len(created) == 3
+    assert {r.agent_name for r in results} == {"agent-0", "agent-1", "agent-2"}
+
+
+def test_cancelling_the_batch_cancels_running_tasks():
+    agent = _DelayAgent("a")
+    runner = FanoutRunner([agent])
+
+    async def run() -> None:
+        batch = asyncio.create_task(runner.run(_msgs("5")))
+        await asyncio.sleep(0.01)
+        batch.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await batch
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+
+    assert agent.interrupted == 1
+
+
+def test_requires_agents():
+    with pytest.raises(ValueError):
+        FanoutRunner([])
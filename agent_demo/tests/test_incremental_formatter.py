@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+import asyncio
+from typing import Any
+
+from agentscope.formatter import DashScopeChatFormatter, FormatterBase
+from agentscope.message import Msg, TextBlock
+
+from formatter import IncrementalFormatter
+
+
+class _CountingFormatter(FormatterBase):
+    def __init__(self) -> None:
+        self.formatted: list[str] = []
+
+    async def format(self, msgs: list[Msg], **kwargs: Any) -> list[dict]:
+        self.formatted.extend(msg.id for msg in msgs)
+        return [{"role": msg.role, "content": msg.get_text_content()} for msg in msgs]
+
+
+def _msg(text: str) -> Msg:
+    return Msg("user", [TextBlock(type="text", text=text)], "user")
+
+
+def test_only_new_messages_are_formatted():
+    inner = _CountingFormatter()
+    formatter = IncrementalFormatter(inner)
+    first, second = _msg("一"), _msg("二")
+
+    asyncio.run(formatter.format([first]))
+    prompt = asyncio.run(formatter.format([first, second]))
+
+    assert inner.formatted == [first.id, second.id]
+    assert prompt == [{"role": "user", "content": "一"}, {"role": "user", "content": "二"}]
+    assert (formatter.hits, formatter.misses) == (1, 2)
+
+
+def test_replaced_or_appended_content_is_reformatted():
+    inner = _CountingFormatter()
+    formatter = IncrementalFormatter(inner)
+    msg = _msg("一")
+    asyncio.run(formatter.format([msg]))
+
+    msg.content.append(TextBlock(type="text", text="二"))
+    assert asyncio.run(formatter.format([msg]))[0]["content"] == "一二"
+
+    msg.content = [TextBlock(type="text", text="三")]
+    assert asyncio.run(formatter.format([msg]))[0]["content"] == "三"
+    assert inner.formatted == [msg.id] * 3
+
+
+def test_in_place_block_edits_are_reformatted():
+    inner = _CountingFormatter()
+    formatter = IncrementalFormatter(inner)
+    msg = _msg("一")
+    asyncio.run(formatter.format([msg]))
+
+    msg.content[0]["text"] = "改"
+    assert asyncio.run(formatter.format([msg]))[0]["content"] == "改"
+    msg.content[0] = TextBlock(type="text", text="再改")
+    assert asyncio.run(formatter.format([msg]))[0]["content"] == "再改"
+    assert asyncio.run(formatter.format([msg]))[0]["content"] == "再改"
+    assert (formatter.hits, formatter.misses) == (1, 3)
+
+
+def test_kwargs_bypass_the_cache():
+    inner = _CountingFormatter()
+    formatter = IncrementalFormatter(inner)
+    msg = _msg("一")
+
+    asyncio.run(formatter.format([msg]))
+    asyncio.run(formatter.format([msg], extra=True))
+
+    assert inner.formatted == [msg.id, msg.id]
+
+
+def test_caller_mutations_do_not_leak_into_the_cache():
+    formatter = IncrementalFormatter(_CountingFormatter())
+    msg = _msg("一")
+
+    prompt = asyncio.run(formatter.format([msg]))
+    prompt[-1]["content"] = "改写"
+    prompt[-1]["partial"] = True
+
+    assert asyncio.run(formatter.format([msg])) == [{"role": "user", "content": "一"}]
+
+
+def test_least_recently_used_entries_are_evicted():
+    inner = _CountingFormatter()
+    formatter = IncrementalFormatter(inner, max_entries=2)
+    a, b, c = _msg("a"), _msg("b"), _msg("c")
+
+    asyncio.run(formatter.format([a, b]))
+    asyncio.run(formatter.format([a, c]))
+    inner.formatted.clear()
+    asyncio.run(formatter.format([a, c, b]))
+
+    # 上一轮 a 刚被用过，淘汰的是 b
+    assert inner.formatted == [b.id]
+
+
+def test_matches_the_wrapped_formatter():
+    msgs = [
+        Msg("system", "你是助手", "system"),
+        Msg("user", "你好", "user"),
+        Msg("Friday", "你好，有什么可以帮你？", "assistant"),
+    ]
+    formatter = IncrementalFormatter(DashScopeChatFormatter())
+    asyncio.run(formatter.format(msgs[:2]))
+
+    assert asyncio.run(formatter.format(msgs)) == asyncio.run(
+        DashScopeChatFormatter().format(msgs),
+    )
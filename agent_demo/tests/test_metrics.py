@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+from agentscope.message import Msg
+
+import customeAgent
+from customeAgent import MyAgent
+from model import ReplyMetrics, summarize_metrics
+from model import metrics as metrics_module
+from tests.fakes import FakeChatModel
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [10.0]
+    monkeypatch.setattr(metrics_module.time, "perf_counter", lambda: now[0])
+    return now
+
+
+def _started(clock: list[float], stream: bool) -> ReplyMetrics:
+    # _start 的默认值在类定义时就绑定了 time.perf_counter，这里显式传入
+    return ReplyMetrics(stream=stream, _start=clock[0])
+
+
+def test_stream_records_first_chunk_and_total_latency(clock):
+    metrics = _started(clock, True)
+    clock[0] += 0.5
+    metrics.on_chunk()
+    clock[0] += 1.5
+    metrics.on_chunk()
+    metrics.finish(output_tokens=40)
+
+    assert metrics.ttft == pytest.approx(0.5)
+    assert metrics.latency == pytest.approx(2.0)
+    assert metrics.chunks == 2
+    assert metrics.tokens_per_second == pytest.approx(20)
+
+
+def test_non_stream_ttft_equals_latency(clock):
+    metrics = _started(clock, False)
+    assert metrics.tokens_per_second is None
+    clock[0] += 1.0
+    metrics.finish(output_tokens=10)
+
+    assert metrics.ttft == metrics.latency == pytest.approx(1.0)
+
+
+def test_summary_skips_unfinished_replies(clock):
+    finished = []
+    for seconds in (1.0, 2.0, 3.0):
+        metrics = _started(clock, False)
+        clock[0] += seconds
+        metrics.finish(output_tokens=int(seconds * 10))
+        finished.append(metrics)
+
+    summary = summarize_metrics([*finished, ReplyMetrics(stream=True)])
+
+    assert summary["count"] == 3
+    assert summary["latency_p50"] == pytest.approx(2.0)
+    assert summary["tokens_per_second"] == pytest.approx(10)
+    assert summarize_metrics([ReplyMetrics(stream=True)]) == {}
+
+
+def test_agent_streams_chunks_and_records_metrics():
+    agent = MyAgent(model=FakeChatModel(["你好，我是 Friday。"], stream=True, chunk_chars=4))
+    agent._disable_console_output = True
+    printed: list[tuple[str, bool]] = []
+
+    async def record_print(msg: Msg, last: bool = True) -> None:
+        printed.append((msg.get_text_content(), last))
+
+    agent.print = record_print
+    reply = asyncio.run(agent(Msg("user", "你好", "user")))
+
+    assert reply.get_text_content() == "你好，我是 Friday。"
+    assert [text for text, last in printed if not last] == [
+        "你好，我", "你好，我是 Fr", "你好，我是 Friday", "你好，我是 Friday。",
+    ]
+    assert printed[-1] == ("你好，我是 Friday。", True)
+    [metrics] = agent.reply_metrics
+    assert metrics.stream and metrics.chunks == 4
+    assert metrics.output_tokens > 0
+
+
+def test_agent_keeps_only_recent_metrics(monkeypatch):
+    monkeypatch.setattr(customeAgent, "MAX_REPLY_METRICS", 2)
+    agent = MyAgent(model=FakeChatModel(["一", "二", "三"]))
+    agent._disable_console_output = True
+
+    async def run() -> None:
+        for text in ("a", "b", "c"):
+            await agent(Msg("user", text, "user"))
+
+    asyncio.run(run())
+
+    assert len(agent.reply_metrics) == 2
+    assert summarize_metrics(agent.reply_metrics)["count"] == 2
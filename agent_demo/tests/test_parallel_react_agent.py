@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+import asyncio
+from typing import Any
+
+from agentscope.formatter import DashScopeChatFormatter
+from agentscope.memory import InMemoryMemory
+from agentscope.message import Msg, TextBlock
+from agentscope.model import ChatModelBase, ChatResponse
+from agentscope.tool import Toolkit, ToolResponse
+
+from agent import ParallelReActAgent
+
+
+async def slow_lookup(city: str) -> ToolResponse:
+    """查询城市人口（较慢）。
+
+    Args:
+        city (str): 城市名
+    """
+    await asyncio.sleep(0.05)
+    return ToolResponse(content=[TextBlock(type="text", text=f"{city}: 慢")])
+
+
+async def fast_lookup(city: str) -> ToolResponse:
+    """查询城市面积（较快）。
+
+    Args:
+        city (str): 城市名
+    """
+    return ToolResponse(content=[TextBlock(type="text", text=f"{city}: 快")])
+
+
+def _tool_use(call_id: str, name: str) -> dict:
+    return {"type": "tool_use", "id": call_id, "name": name, "input": {"city": "东莞"}}
+
+
+class ScriptedToolModel(ChatModelBase):
+    """第一次请求发出两个并行的工具调用，之后按 `final` 回复文本。
+
+    `stall=True` 时第二次请求一直挂起，用于测试打断。
+    """
+
+    def __init__(self, final: str = "查完了", stall: bool = False) -> None:
+        super().__init__("scripted", stream=False)
+        self.final = final
+        self.stall = stall
+        self.prompts: list[list[dict]] = []
+        self.waiting = asyncio.Event()
+
+    async def __call__(self, messages: list[dict], **kwargs: Any) -> ChatResponse:
+        self.prompts.append(messages)
+        if len(self.prompts) == 1:
+            return ChatResponse(
+                content=[_tool_use("call-1", "slow_lookup"), _tool_use("call-2", "fast_lookup")],
+            )
+        if self.stall:
+            self.waiting.set()
+            await asyncio.Event().wait()
+        return ChatResponse(content=[{"type": "text", "text": self.final}])
+
+
+def _make_agent(model: ScriptedToolModel) -> ParallelReActAgent:
+    toolkit = Toolkit()
+    toolkit.register_tool_function(slow_lookup)
+    toolkit.register_tool_function(fast_lookup)
+    agent = ParallelReActAgent(
+        name="jarvis",
+        sys_prompt="你是助手",
+        model=model,
+        formatter=DashScopeChatFormatter(),
+        toolkit=toolkit,
+        memory=InMemoryMemory(),
+    )
+    agent._disable_console_output = True
+    return agent
+
+
+def _result_ids(msgs: list[Msg]) -> list[str]:
+    return [
+        block["id"]
+        for msg in msgs
+        for block in msg.get_content_blocks("tool_result")
+    ]
+
+
+def test_tool_results_follow_call_order():
+    model = ScriptedToolModel()
+    agent = _make_agent(model)
+
+    reply = asyncio.run(agent(Msg("user", "东莞的人口和面积", "user")))
+
+    assert reply.get_text_content() == "查完了"
+    # fast_lookup 先完成，但记忆和第二次提示词里都按调用顺序排列
+    assert _result_ids(agent.memory.content)[:2] == ["call-1", "call-2"]
+    tool_messages = [m for m in model.prompts[1] if m.get("role") == "tool"]
+    assert [m["tool_call_id"] for m in tool_messages] == ["call-1", "call-2"]
+
+
+def test_interrupt_keeps_completed_steps_in_memory():
+    model = ScriptedToolModel(stall=True)
+    agent = _make_agent(model)
+
+    async def run() -> Msg:
+        task = asyncio.create_task(agent(Msg("user", "东莞的人口和面积", "user")))
+        await model.waiting.wait()
+        await agent.interrupt()
+        return await task
+
+    reply = asyncio.run(run())
+
+    assert reply.metadata == {"interrupted": True}
+    stored = agent.memory.content
+    assert stored[0].get_text_content() == "东莞的人口和面积"
+    assert [b["id"] for b in stored[1].get_content_blocks("tool_use")] == ["call-1", "call-2"]
+    assert _result_ids(stored) == ["call-1", "call-2"]
+    assert stored[-1] is reply
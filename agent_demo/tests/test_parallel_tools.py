@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import inspect
+import threading
+import time
+
+import pytest
+from agentscope.message import TextBlock
+from agentscope.tool import Toolkit, ToolResponse
+
+from tools.parallel import run_coroutine_in_thread, run_in_executor
+
+
+def blocking_tool(seconds: float) -> ToolResponse:
+    """阻塞一段时间后返回当前线程 id。
+
+    Args:
+        seconds (float): 阻塞时长
+    """
+    time.sleep(seconds)
+    return ToolResponse(content=[TextBlock(type="text", text=str(threading.get_ident()))])
+
+
+async def sync_io_tool(seconds: float) -> ToolResponse:
+    """函数体内做同步阻塞 IO 的异步工具。
+
+    Args:
+        seconds (float): 阻塞时长
+    """
+    time.sleep(seconds)
+    return ToolResponse(content=[TextBlock(type="text", text=str(threading.get_ident()))])
+
+
+def _thread_of(response: ToolResponse) -> int:
+    return int(response.content[0]["text"])
+
+
+@pytest.mark.parametrize("wrap", [run_in_executor, run_coroutine_in_thread])
+def test_wrapped_tools_run_concurrently_off_the_loop(wrap):
+    tool = blocking_tool if wrap is run_in_executor else sync_io_tool
+    wrapped = wrap(tool)
+
+    async def main():
+        start = time.perf_counter()
+        results = await asyncio.gather(*(wrapped(0.1) for _ in range(4)))
+        return time.perf_counter() - start, results, threading.get_ident()
+
+    elapsed, results, loop_thread = asyncio.run(main())
+
+    assert elapsed < 0.3
+    assert loop_thread not in {_thread_of(r) for r in results}
+
+
+@pytest.mark.parametrize("wrap", [run_in_executor, run_coroutine_in_thread])
+def test_wrapped_tools_keep_their_schema(wrap):
+    tool = blocking_tool if wrap is run_in_executor else sync_io_tool
+    wrapped = wrap(tool)
+    original, patched = Toolkit(), Toolkit()
+    original.register_tool_function(tool)
+    patched.register_tool_function(wrapped)
+
+    assert inspect.iscoroutinefunction(wrapped)
+    assert wrapped.__name__ == tool.__name__
+    assert patched.get_json_schemas() == original.get_json_schemas()
+
+
+def test_run_in_executor_returns_async_functions_unchanged():
+    assert run_in_executor(sync_io_tool) is sync_io_tool
+
+
+def test_run_coroutine_in_thread_rejects_sync_functions():
+    with pytest.raises(TypeError):
+        run_coroutine_in_thread(blocking_tool)
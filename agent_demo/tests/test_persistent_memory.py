@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import struct
+import threading
+
+import pytest
+from agentscope.message import Msg
+
+from memory import PersistentMemory
+
+
+def _msgs(count: int, start: int = 0) -> list[Msg]:
+    return [Msg("user", f"消息 {i}", "user") for i in range(start, start + count)]
+
+
+def _texts(msgs: list[Msg]) -> list[str]:
+    return [msg.get_text_content() for msg in msgs]
+
+
+def _open(tmp_path, **kwargs) -> PersistentMemory:
+    kwargs.setdefault("codec", "json")
+    return PersistentMemory(tmp_path / "chat", **kwargs)
+
+
+def test_reopen_restores_history_and_hot_window(tmp_path):
+    memory = _open(tmp_path, hot_window=3)
+    asyncio.run(memory.add(_msgs(5)))
+    asyncio.run(memory.add(_msgs(1, start=5)))
+
+    reopened = _open(tmp_path, hot_window=3)
+
+    assert asyncio.run(reopened.size()) == 6
+    assert _texts(asyncio.run(reopened.get_memory())) == ["消息 3", "消息 4", "消息 5"]
+    assert _texts(reopened.read(0, 2)) == ["消息 0", "消息 1"]
+
+
+def test_duplicates_are_skipped_across_reopen(tmp_path):
+    msgs = _msgs(3)
+    asyncio.run(_open(tmp_path).add(msgs))
+
+    reopened = _open(tmp_path)
+
+    assert asyncio.run(reopened.add_many([*msgs, *_msgs(1, start=3)])) == 1
+    assert asyncio.run(reopened.size()) == 4
+
+
+def test_torn_tail_is_truncated_on_reopen(tmp_path):
+    memory = _open(tmp_path)
+    asyncio.run(memory.add(_msgs(3)))
+    good_size = memory.log_path.stat().st_size
+    with open(memory.log_path, "ab") as f:
+        # 记录头声明了 100 字节，但只写入了一部分就崩溃
+        f.write(struct.pack("<IB", 100, 1) + b"{\"id\":")
+
+    reopened = _open(tmp_path)
+
+    assert _texts(asyncio.run(reopened.get_memory())) == _texts(_msgs(3))
+    assert reopened.log_path.stat().st_size == good_size
+    asyncio.run(reopened.add(_msgs(1, start=3)))
+    assert asyncio.run(_open(tmp_path).size()) == 4
+
+
+def test_missing_or_stale_index_is_rebuilt(tmp_path):
+    memory = _open(tmp_path)
+    msgs = _msgs(4)
+    asyncio.run(memory.add(msgs))
+    asyncio.run(memory.delete(1))
+    memory.index_path.unlink()
+
+    assert _texts(asyncio.run(_open(tmp_path).get_memory())) == ["消息 0", "消息 2", "消息 3"]
+
+    memory.index_path.write_bytes(b"garbage")
+    assert asyncio.run(_open(tmp_path).size()) == 3
+
+
+def test_unindexed_tail_records_are_recovered(tmp_path):
+    memory = _open(tmp_path)
+    asyncio.run(memory.add(_msgs(2)))
+    stale_index = memory.index_path.read_bytes()
+    asyncio.run(memory.add(_msgs(2, start=2)))
+    # 模拟写完日志、没来得及更新索引就崩溃
+    memory.index_path.write_bytes(stale_index)
+
+    assert _texts(asyncio.run(_open(tmp_path).get_memory())) == _texts(_msgs(4))
+
+
+def test_delete_and_clear_persist(tmp_path):
+    memory = _open(tmp_path, hot_window=2)
+    asyncio.run(memory.add(_msgs(4)))
+
+    asyncio.run(memory.delete(0))
+    # 热窗口从磁盘补入更早的消息
+    assert _texts(memory.content) == ["消息 1", "消息 3"]
+    assert _texts(asyncio.run(_open(tmp_path).get_memory())) == ["消息 0", "消息 1", "消息 3"]
+
+    asyncio.run(memory.clear())
+    assert asyncio.run(_open(tmp_path).size()) == 0
+    with pytest.raises(IndexError):
+        asyncio.run(memory.delete(0))
+
+
+def test_compaction_drops_dead_records(tmp_path):
+    memory = _open(tmp_path, compact_min_bytes=1)
+    asyncio.run(memory.add(_msgs(4)))
+    before = memory.log_path.stat().st_size
+
+    asyncio.run(memory.delete([0, 1, 2]))
+
+    assert memory.log_path.stat().st_size < before
+    reopened = _open(tmp_path)
+    assert _texts(asyncio.run(reopened.get_memory())) == ["消息 3"]
+    assert reopened._generation == 1
+
+
+def test_retrieve_searches_history_newest_first(tmp_path):
+    memory = _open(tmp_path, hot_window=2)
+    asyncio.run(memory.add(_msgs(12)))
+
+    assert _texts(asyncio.run(memory.retrieve("消息 1", limit=2))) == ["消息 11", "消息 10"]
+
+
+def test_leading_tool_results_are_hidden(tmp_path):
+    memory = _open(tmp_path, hot_window=2)
+    tool_use = Msg("a", [{"type": "tool_use", "id": "1", "name": "f", "input": {}}], "assistant")
+    tool_result = Msg(
+        "system",
+        [{"type": "tool_result", "id": "1", "name": "f", "output": "ok"}],
+        "system",
+    )
+    asyncio.run(memory.add([tool_use, tool_result, *_msgs(1)]))
+
+    assert _texts(asyncio.run(memory.get_memory())) == ["消息 0"]
+
+
+def test_rebuild_keeps_duplicate_ids(tmp_path):
+    memory = _open(tmp_path)
+    msg = _msgs(1)[0]
+    asyncio.run(memory.add([msg, *_msgs(1, start=1)]))
+    asyncio.run(memory.add(msg, allow_duplicates=True))
+    asyncio.run(memory.add(msg, allow_duplicates=True))
+    # 删掉第一条副本，其余同 id 的消息应当保留
+    asyncio.run(memory.delete(0))
+    memory.index_path.unlink()
+
+    rebuilt = _open(tmp_path)
+
+    assert _texts(asyncio.run(rebuilt.get_memory())) == ["消息 1", "消息 0", "消息 0"]
+    assert rebuilt._live_bytes == memory._live_bytes
+
+
+def test_pickle_codec_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="pickle5"):
+        _open(tmp_path, codec="pickle5")
+
+
+def test_file_io_runs_off_the_event_loop(tmp_path, monkeypatch):
+    memory = _open(tmp_path, compact_min_bytes=1)
+    threads = set()
+    append = memory._append
+
+    def record_thread(records):
+        threads.add(threading.get_ident())
+        return append(records)
+
+    monkeypatch.setattr(memory, "_append", record_thread)
+
+    async def main():
+        await memory.add(_msgs(3))
+        await memory.delete(0)
+        await memory.clear()
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(main())
+    assert threads and loop_thread not in threads
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import os
+import time
+
+import pytest
+
+from tools.python_worker_pool import PythonWorkerPool, _Job
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, "fork"),
+    reason="PythonWorkerPool 依赖 os.fork",
+)
+
+
+@pytest.fixture
+def pool():
+    pool = PythonWorkerPool(size=1, preload=("json",))
+    pool.start()
+    yield pool
+    pool.close()
+
+
+def test_runs_code_and_captures_output(pool):
+    result = pool.run("import json\nprint(json.dumps([1, 2]))")
+
+    assert result.returncode == 0
+    assert result.stdout == "[1, 2]\n"
+    assert result.stderr == ""
+
+
+def test_each_run_starts_from_a_clean_state(pool):
+    pool.run("import math\nmath.pi = 3\nleaked = 1")
+
+    result = pool.run("import math\nprint(math.pi > 3, 'leaked' in globals())")
+
+    assert result.stdout == "True False\n"
+
+
+def test_errors_and_exit_codes(pool):
+    error = pool.run("x = 1\nraise ValueError('bad')")
+    assert error.returncode == 1
+    assert "ValueError: bad" in error.stderr
+    assert "<tool_code>" in error.stderr
+
+    assert pool.run("import sys\nsys.exit(3)").returncode == 3
+
+
+def test_timeout_kills_the_code(pool):
+    start = time.monotonic()
+    result = pool.run("import time\nprint('start', flush=True)\ntime.sleep(30)", timeout=0.3)
+
+    assert time.monotonic() - start < 5
+    assert result.returncode == -1
+    assert result.stdout == "start\n"
+    assert "TimeoutError" in result.stderr
+    assert pool.run("print('next')").stdout == "next\n"
+
+
+def test_memory_limit_applies_to_the_child():
+    pool = PythonWorkerPool(size=1, preload=(), memory_limit=256 * 1024 * 1024)
+    try:
+        result = pool.run("x = bytearray(512 * 1024 * 1024)")
+        assert result.returncode == 1
+        assert "MemoryError" in result.stderr
+    finally:
+        pool.close()
+
+
+def test_cancel_kills_running_code_and_keeps_the_worker(pool):
+    worker = pool._workers[0]
+
+    async def run() -> None:
+        task = asyncio.create_task(pool.run_async("import time\ntime.sleep(30)"))
+        await asyncio.sleep(0.5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    start = time.monotonic()
+    asyncio.run(run())
+    result = pool.run("print('after')")
+
+    assert time.monotonic() - start < 5
+    assert result.stdout == "after\n"
+    assert pool._workers == [worker]
+
+
+class _CancelOnAttach(_Job):
+    """分配到 worker 后、worker 确认启动前就被取消。"""
+
+    def attach(self, worker) -> bool:
+        attached = super().attach(worker)
+        self.cancel()
+        return attached
+
+
+def test_cancel_before_the_worker_starts_replaces_it(pool):
+    worker = pool._workers[0]
+
+    start = time.monotonic()
+    result = pool._run("import time\ntime.sleep(30)", None, _CancelOnAttach())
+
+    # SIGUSR1 此时会落空，worker 被整个 kill 掉，代码不会继续执行到结束
+    assert time.monotonic() - start < 5
+    assert "CancelledError" in result.stderr
+    assert not worker.alive()
+    assert pool._workers != [worker]
+    assert pool.run("print('respawned')").stdout == "respawned\n"
+
+
+def test_dead_worker_is_respawned(pool):
+    pool._workers[0].kill()
+
+    error = pool.run("print('lost')")
+    result = pool.run("print('ok')")
+
+    assert error.returncode == -1 and "WorkerError" in error.stderr
+    assert result.stdout == "ok\n"
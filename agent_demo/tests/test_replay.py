@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import logging
+
+import pytest
+from agentscope.model import ChatResponse
+
+from model import CachedChatModel, CassetteMissError, ReplayChatModel
+from model._common import request_key
+from tests.fakes import FakeChatModel
+
+QUESTION = [{"role": "user", "content": "讲个笑话"}]
+OTHER = [{"role": "user", "content": "再讲一个"}]
+
+
+async def _texts(result):
+    if isinstance(result, ChatResponse):
+        return [result.content[0]["text"]]
+    return [chunk.content[0]["text"] async for chunk in result]
+
+
+def _call(model, messages):
+    async def main():
+        return await _texts(await model(messages))
+
+    return asyncio.run(main())
+
+
+@pytest.fixture
+def cassette(tmp_path):
+    path = tmp_path / "cassette.json"
+    recorder = ReplayChatModel(
+        path, model=FakeChatModel(["哈哈哈哈哈", "嘿嘿"], stream=True), mode="record",
+    )
+    _call(recorder, QUESTION)
+    _call(recorder, OTHER)
+    assert recorder.recorded == 2
+    return path
+
+
+def test_replay_round_trip_without_model(cassette):
+    replay = ReplayChatModel(cassette, time_scale=0, chunk_chars=2)
+
+    assert _call(replay, QUESTION) == ["哈哈", "哈哈哈哈", "哈哈哈哈哈"]
+    assert _call(replay, OTHER) == ["嘿嘿"]
+    assert replay.replayed == 2
+    assert replay.model_name == "fake"
+
+
+def test_non_streaming_replay_returns_final_response(cassette):
+    replay = ReplayChatModel(cassette, stream=False, time_scale=0)
+
+    assert _call(replay, OTHER) == ["嘿嘿"]
+
+
+def test_strict_miss_raises_by_default(cassette):
+    replay = ReplayChatModel(cassette, time_scale=0)
+
+    with pytest.raises(CassetteMissError):
+        _call(replay, [{"role": "user", "content": "没录过"}])
+
+
+def test_exhausted_recordings_raise_until_rewind(cassette):
+    replay = ReplayChatModel(cassette, time_scale=0)
+    _call(replay, QUESTION)
+
+    with pytest.raises(CassetteMissError):
+        _call(replay, QUESTION)
+    replay.rewind()
+    assert _call(replay, QUESTION)[-1] == "哈哈哈哈哈"
+
+
+def test_lenient_miss_falls_back_in_order_and_warns(cassette, caplog):
+    replay = ReplayChatModel(cassette, strict=False, time_scale=0)
+
+    with caplog.at_level(logging.WARNING, logger="model.replay"):
+        assert _call(replay, [{"role": "user", "content": "没录过"}])[-1] == "哈哈哈哈哈"
+
+    assert "没有与请求匹配的录制" in caplog.text
+
+
+def test_auto_mode_records_only_misses(cassette):
+    fake = FakeChatModel(["新录制"], stream=True)
+    auto = ReplayChatModel(cassette, model=fake, mode="auto", time_scale=0)
+
+    assert _call(auto, QUESTION)[-1] == "哈哈哈哈哈"
+    assert _call(auto, [{"role": "user", "content": "没录过"}])[-1] == "新录制"
+    assert len(fake.calls) == 1
+    assert len(ReplayChatModel(cassette).interactions) == 3
+
+
+def test_cassette_keys_match_cache_keys(cassette):
+    replay = ReplayChatModel(cassette)
+    cached = CachedChatModel(FakeChatModel(stream=True))
+
+    expected = request_key(cached.model_name, QUESTION, {})
+    assert replay.interactions[0]["key"] == expected
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import os
+
+import pytest
+from agentscope.message import TextBlock
+from agentscope.tool import ToolResponse, view_text_file
+
+from tools.parallel import run_coroutine_in_thread
+from tools.result_cache import ToolResultCache, idempotent_tool
+
+
+def _response(text: str, **kwargs) -> ToolResponse:
+    return ToolResponse(content=[TextBlock(type="text", text=text)], **kwargs)
+
+
+def test_same_arguments_hit_the_cache():
+    cache = ToolResultCache()
+    calls = []
+
+    @idempotent_tool(path_args=(), cache=cache)
+    def echo(text: str, upper: bool = False) -> ToolResponse:
+        calls.append(text)
+        return _response(text.upper() if upper else text)
+
+    assert echo("a").content[0]["text"] == "a"
+    assert echo(text="a", upper=False).content[0]["text"] == "a"
+    assert echo("a", upper=True).content[0]["text"] == "A"
+    assert calls == ["a", "a"]
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_cached_results_are_copies():
+    @idempotent_tool(path_args=(), cache=ToolResultCache())
+    def echo(text: str) -> ToolResponse:
+        return _response(text)
+
+    echo("a").content[0]["text"] = "changed"
+
+    assert echo("a").content[0]["text"] == "a"
+
+
+def test_file_changes_invalidate_the_entry(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("v1", encoding="utf-8")
+    calls = []
+
+    @idempotent_tool(cache=ToolResultCache())
+    async def read(file_path: str) -> ToolResponse:
+        calls.append(file_path)
+        return _response(open(file_path, encoding="utf-8").read())
+
+    assert asyncio.run(read(str(path))).content[0]["text"] == "v1"
+    assert asyncio.run(read(str(path))).content[0]["text"] == "v1"
+    path.write_text("v2!", encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert asyncio.run(read(str(path))).content[0]["text"] == "v2!"
+    assert len(calls) == 2
+
+
+def test_interrupted_results_are_not_cached():
+    calls = []
+
+    @idempotent_tool(path_args=(), cache=ToolResultCache())
+    def flaky(text: str) -> ToolResponse:
+        calls.append(text)
+        return _response(text, is_interrupted=len(calls) == 1)
+
+    flaky("a")
+    flaky("a")
+    flaky("a")
+
+    assert len(calls) == 2
+
+
+def test_lru_eviction_by_size():
+    cache = ToolResultCache(max_bytes=10)
+    cache.put("a", _response("x" * 4))
+    cache.put("b", _response("x" * 4))
+    cache.get("a")
+    cache.put("c", _response("x" * 4))
+    cache.put("huge", _response("x" * 11))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.get("huge") is None
+    assert cache.total_bytes == 8
+
+
+def test_streaming_tools_are_rejected():
+    async def stream(text: str):
+        yield _response(text)
+
+    with pytest.raises(TypeError):
+        idempotent_tool(stream)
+
+
+def test_wraps_view_text_file_off_the_loop(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("第一行\n第二行\n", encoding="utf-8")
+    tool = idempotent_tool(run_coroutine_in_thread(view_text_file), cache=ToolResultCache())
+
+    first = asyncio.run(tool(str(path)))
+    second = asyncio.run(tool(str(path)))
+
+    assert "第二行" in first.content[0]["text"]
+    assert second.content == first.content
+    assert tool.__name__ == "view_text_file"
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+from agentscope.message import Msg
+
+from memory import TokenWindowMemory, estimate_tokens
+
+
+def _count(msg: Msg) -> int:
+    return len(msg.get_text_content() or "")
+
+
+def _msg(text: str, role: str = "user") -> Msg:
+    return Msg(role, text, role)
+
+
+def _texts(msgs: list[Msg]) -> list[str]:
+    return [msg.get_text_content() for msg in msgs]
+
+
+class _Summarizer:
+    def __init__(self, text: str = "摘要") -> None:
+        self.text = text
+        self.calls: list[list[str]] = []
+
+    async def __call__(self, msgs: list[Msg]) -> Msg:
+        self.calls.append(_texts(msgs))
+        return Msg("summary", self.text, "system")
+
+
+def test_estimate_tokens_counts_cjk_as_one_token_each():
+    assert estimate_tokens(_msg("你好世界")) == 4 + 4
+    assert estimate_tokens(_msg("abcdefgh")) == 2 + 4
+    image = Msg("user", [{"type": "image", "source": {"type": "url", "url": "x"}}], "user")
+    assert estimate_tokens(image) > estimate_tokens(_msg(""))
+
+
+def test_drops_oldest_messages_over_budget():
+    memory = TokenWindowMemory(max_tokens=10, token_counter=_count, min_messages=1)
+
+    async def run() -> list[Msg]:
+        for text in ["aaaa", "bbbb", "cccc"]:
+            await memory.add(_msg(text))
+        return await memory.get_memory()
+
+    assert _texts(asyncio.run(run())) == ["bbbb", "cccc"]
+    assert memory.total_tokens == 8
+
+
+def test_keeps_min_messages_even_over_budget():
+    memory = TokenWindowMemory(max_tokens=10, token_counter=_count, min_messages=2)
+
+    asyncio.run(memory.add([_msg("a" * 8), _msg("b" * 8)]))
+
+    assert _texts(memory.content) == ["a" * 8, "b" * 8]
+    assert memory.total_tokens == 16
+
+
+def test_evicted_messages_are_summarized_in_one_call():
+    summarizer = _Summarizer()
+    memory = TokenWindowMemory(
+        max_tokens=12,
+        token_counter=_count,
+        summarizer=summarizer,
+        min_messages=1,
+        max_summary_tokens=4,
+    )
+
+    async def run() -> list[Msg]:
+        await memory.add([_msg("aaaa"), _msg("bbbb"), _msg("cccc")])
+        await memory.add(_msg("dddd"))
+        return await memory.get_memory()
+
+    history = asyncio.run(run())
+
+    assert _texts(history) == ["摘要", "cccc", "dddd"]
+    assert summarizer.calls == [["aaaa", "bbbb"]]
+    assert memory.total_tokens == 2 + 8
+
+
+def test_previous_summary_is_folded_into_the_next_one():
+    summarizer = _Summarizer()
+    memory = TokenWindowMemory(
+        max_tokens=8,
+        token_counter=_count,
+        summarizer=summarizer,
+        min_messages=1,
+        max_summary_tokens=2,
+    )
+
+    async def run() -> None:
+        for text in ["aaa", "bbb", "ccc", "ddd"]:
+            await memory.add(_msg(text))
+
+    asyncio.run(run())
+
+    assert summarizer.calls[0] == ["aaa"]
+    assert summarizer.calls[-1][0] == "摘要"
+    assert memory.total_tokens <= memory.max_tokens
+
+
+def test_oversized_summary_is_truncated():
+    memory = TokenWindowMemory(
+        max_tokens=20,
+        token_counter=_count,
+        summarizer=_Summarizer("很" * 50),
+        min_messages=1,
+        max_summary_tokens=6,
+    )
+
+    async def run() -> list[Msg]:
+        await memory.add([_msg("a" * 10), _msg("b" * 10), _msg("c" * 10)])
+        return await memory.get_memory()
+
+    history = asyncio.run(run())
+
+    assert history[0].get_text_content() == "很" * 5 + "…"
+    assert _texts(history[1:]) == ["c" * 10]
+    assert memory.total_tokens == 6 + 10
+
+
+def test_rejects_summary_budget_outside_the_window():
+    with pytest.raises(ValueError):
+        TokenWindowMemory(max_tokens=10, max_summary_tokens=10)
+
+
+def test_state_round_trip_counts_summary_once():
+    memory = TokenWindowMemory(
+        max_tokens=12,
+        token_counter=_count,
+        summarizer=_Summarizer(),
+        min_messages=1,
+        max_summary_tokens=4,
+    )
+    asyncio.run(memory.add([_msg("aaaa"), _msg("bbbb"), _msg("cccc"), _msg("dddd")]))
+
+    restored = TokenWindowMemory(
+        max_tokens=12,
+        token_counter=_count,
+        summarizer=_Summarizer(),
+        min_messages=1,
+        max_summary_tokens=4,
+    )
+    restored.load_state_dict(memory.state_dict())
+
+    assert restored.total_tokens == memory.total_tokens
+    assert _texts(asyncio.run(restored.get_memory())) == _texts(asyncio.run(memory.get_memory()))
+    asyncio.run(restored.clear())
+    assert restored.total_tokens == 0
+    assert asyncio.run(restored.get_memory()) == []
+
+
+def test_loaded_state_over_budget_is_trimmed_on_read():
+    memory = TokenWindowMemory(max_tokens=100, token_counter=_count, min_messages=1)
+    asyncio.run(memory.add([_msg("a" * 40), _msg("b" * 40)]))
+
+    smaller = TokenWindowMemory(max_tokens=50, token_counter=_count, min_messages=1)
+    smaller.load_state_dict(memory.state_dict())
+
+    assert _texts(asyncio.run(smaller.get_memory())) == ["b" * 40]
+    assert smaller.total_tokens == 40
+
+
+def test_delete_and_duplicate_ids():
+    memory = TokenWindowMemory(max_tokens=100, token_counter=_count)
+    first, second = _msg("aaaa"), _msg("bbbb")
+
+    async def run() -> int:
+        await memory.add([first, second])
+        added = await memory.add_many([first, _msg("cccc")])
+        await memory.delete(0)
+        return added
+
+    assert asyncio.run(run()) == 1
+    assert _texts(memory.content) == ["bbbb", "cccc"]
+    assert memory.total_tokens == 8
+    with pytest.raises(IndexError):
+        asyncio.run(memory.delete(5))
+
+
+def test_retrieve_returns_the_windowed_history():
+    memory = TokenWindowMemory(
+        max_tokens=12,
+        token_counter=_count,
+        summarizer=_Summarizer(),
+        min_messages=1,
+        max_summary_tokens=4,
+    )
+
+    async def run() -> list[Msg]:
+        await memory.add([_msg("aaaa"), _msg("bbbb"), _msg("cccc"), _msg("dddd")])
+        return await memory.retrieve("bbbb")
+
+    assert _texts(asyncio.run(run())) == ["摘要", "cccc", "dddd"]
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+
+import pytest
+from agentscope.message import Msg
+
+from customeAgent import MyAgent
+from tests.fakes import FakeChatModel
+from tracing import (
+    Tracer,
+    current_span,
+    export_chrome_trace,
+    export_otel_jsonl,
+    instrument_agent,
+    summarize_spans,
+    traced,
+)
+
+
+def _by_name(tracer: Tracer) -> dict:
+    return {span.name: span for span in tracer.spans}
+
+
+def test_nested_spans_share_the_trace_and_link_parents():
+    tracer = Tracer()
+
+    with tracer.span("outer") as outer:
+        with tracer.span("inner", step=1) as inner:
+            assert current_span() is inner
+        assert current_span() is outer
+    assert current_span() is None
+
+    assert inner.parent_id == outer.span_id
+    assert inner.trace_id == outer.trace_id
+    assert outer.parent_id is None
+    assert [span.name for span in tracer.spans] == ["inner", "outer"]
+    assert inner.attributes == {"step": 1}
+    assert outer.duration >= inner.duration
+
+
+def test_concurrent_tasks_keep_their_own_parents():
+    tracer = Tracer()
+
+    async def child(name: str) -> None:
+        with tracer.span(name):
+            await asyncio.sleep(0.01)
+            with tracer.span(f"{name}.leaf"):
+                await asyncio.sleep(0)
+
+    async def run() -> None:
+        with tracer.span("root"):
+            await asyncio.gather(child("a"), child("b"))
+
+    asyncio.run(run())
+
+    spans = _by_name(tracer)
+    assert spans["a"].parent_id == spans["b"].parent_id == spans["root"].span_id
+    assert spans["a.leaf"].parent_id == spans["a"].span_id
+    assert spans["b.leaf"].parent_id == spans["b"].span_id
+    assert spans["a"].lane != spans["b"].lane
+
+
+def test_errors_are_recorded_and_reraised():
+    tracer = Tracer()
+
+    with pytest.raises(ValueError):
+        with tracer.span("failing"):
+            raise ValueError("bad input")
+
+    assert tracer.spans[0].error == "ValueError: bad input"
+
+
+def test_traced_decorator_handles_sync_and_async_functions():
+    tracer = Tracer()
+
+    @traced(tracer=tracer)
+    def add(a: int, b: int) -> int:
+        return a + b
+
+    @traced("fetch", tracer=tracer, source="test")
+    async def fetch() -> int:
+        return add(1, 2)
+
+    assert asyncio.run(fetch()) == 3
+    spans = _by_name(tracer)
+    assert spans["fetch"].attributes == {"source": "test"}
+    assert spans[add.__qualname__].parent_id == spans["fetch"].span_id
+
+
+def test_max_spans_keeps_the_newest_and_summary_ranks_by_total():
+    tracer = Tracer(max_spans=3)
+    for name in ["a", "b", "c", "d"]:
+        with tracer.span(name):
+            pass
+
+    assert [span.name for span in tracer.spans] == ["b", "c", "d"]
+    tracer.spans[0].end_ns = tracer.spans[0].start_ns + 5_000_000_000
+    summary = summarize_spans(tracer.spans)
+    assert list(summary)[0] == "b"
+    assert summary["b"]["count"] == 1
+
+
+def test_instrumented_agent_records_nested_phases(tmp_path):
+    agent = MyAgent(model=FakeChatModel(["你好，我是 Friday。"], stream=True))
+    agent._disable_console_output = True
+    tracer = instrument_agent(agent, Tracer())
+
+    asyncio.run(agent(Msg("user", "你好", "user")))
+
+    spans = _by_name(tracer)
+    reply = spans["reply"]
+    for name in ("formatter.format", "model", "memory.add"):
+        assert spans[name].parent_id == reply.span_id
+    assert spans["model"].attributes["stream"] is True
+    assert "ttft" in spans["model"].attributes
+    assert reply.attributes == {"agent": "Friday"}
+
+    chrome = json.loads(export_chrome_trace(tracer, tmp_path / "trace.json").read_text())
+    assert {event["name"] for event in chrome["traceEvents"]} == set(spans)
+    lines = export_otel_jsonl(tracer, tmp_path / "spans.jsonl").read_text().splitlines()
+    records = {record["name"]: record for record in map(json.loads, lines)}
+    assert records["model"]["parentSpanId"] == reply.span_id
+    assert records["reply"]["status"] == {"code": "STATUS_CODE_OK"}
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import gc
+import warnings
+
+import pytest
+
+from benchmarks.fake_tts_server import FakeTTSConfig, start_fake_server
+from tools.tts_async_client import AsyncGPTSoVITSClient
+from tools.tts_cache import AudioCache
+from tools.tts_resilience import RetryPolicy
+
+
+class ScriptedClient(AsyncGPTSoVITSClient):
+    """不走网络的客户端：每个后端按给定延迟返回 `url` 对应的字节串。"""
+
+    def __init__(self, delays: dict[str, float], **kwargs) -> None:
+        super().__init__(retry_policy=RetryPolicy(max_attempts=1), **kwargs)
+        self.delays = delays
+        self.in_flight = 0
+        self.peak = 0
+        self.started: list[str] = []
+        self.cancelled: list[str] = []
+
+    async def _post_once(self, api_url, payload):
+        self.started.append(api_url)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays[api_url])
+        except asyncio.CancelledError:
+            self.cancelled.append(api_url)
+            raise
+        finally:
+            self.in_flight -= 1
+        return api_url.encode()
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    server, url = start_fake_server(FakeTTSConfig(latency=0.0, audio_seconds=0.01))
+    yield url
+    server.shutdown()
+
+
+def test_concurrency_is_capped():
+    client = ScriptedClient({"http://a": 0.02}, max_concurrency=2)
+    payloads = [{"text": str(i)} for i in range(6)]
+
+    results = asyncio.run(client.synthesize_many("http://a", payloads))
+
+    assert results == [b"http://a"] * 6
+    assert client.peak == 2
+
+
+def test_cache_hit_skips_request(tmp_path, server_url):
+    client = AsyncGPTSoVITSClient(cache=AudioCache(tmp_path))
+    payload = {"text": "你好"}
+
+    async def main():
+        first = await client.synthesize(server_url, payload)
+        # 服务停掉后仍能从缓存拿到同样的音频
+        second = await client.synthesize("http://127.0.0.1:9", payload)
+        await client.aclose()
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first[:4] == b"RIFF"
+    assert second == first
+
+
+def test_hedge_uses_backup_when_primary_is_slow():
+    client = ScriptedClient(
+        {"http://slow": 1.0, "http://fast": 0.0},
+        hedge_url="http://fast", hedge_delay=0.02,
+    )
+
+    audio = asyncio.run(client.synthesize("http://slow", {"text": "x"}))
+
+    assert audio == b"http://fast"
+    assert client.started == ["http://slow", "http://fast"]
+    assert client.cancelled == ["http://slow"]
+
+
+def test_no_hedge_when_primary_answers_in_time():
+    client = ScriptedClient(
+        {"http://a": 0.0, "http://b": 0.0}, hedge_url="http://b", hedge_delay=0.5,
+    )
+
+    assert asyncio.run(client.synthesize("http://a", {"text": "x"})) == b"http://a"
+    assert client.started == ["http://a"]
+
+
+def test_cancel_during_hedge_delay_cancels_primary():
+    client = ScriptedClient(
+        {"http://a": 1.0, "http://b": 1.0}, hedge_url="http://b", hedge_delay=0.5,
+    )
+
+    async def main():
+        task = asyncio.ensure_future(client.synthesize("http://a", {"text": "x"}))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # 让被取消的请求跑完清理逻辑；必须在事件循环结束前就已取消
+        await asyncio.sleep(0)
+        assert client.cancelled == ["http://a"]
+        assert client.in_flight == 0
+
+    asyncio.run(main())
+    assert client.started == ["http://a"]
+
+
+def test_reuse_across_event_loops_closes_old_pool(server_url):
+    client = AsyncGPTSoVITSClient()
+    pools = []
+
+    async def main():
+        audio = await client.synthesize(server_url, {"text": "x"}, use_cache=False)
+        pools.append(client.http)
+        return audio
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", ResourceWarning)
+        assert asyncio.run(main()) == asyncio.run(main())
+        assert pools[0] is not pools[1]
+        assert pools[0].is_closed and pools[1].is_closed
+        gc.collect()
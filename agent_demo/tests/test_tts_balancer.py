@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from tools import tts_balancer
+from tools.tts_balancer import BackendPool, get_backend_pool, register_backend_pool
+
+
+def test_requires_at_least_one_backend():
+    with pytest.raises(ValueError):
+        BackendPool([])
+
+
+def test_least_outstanding_respects_weights():
+    pool = BackendPool({"http://a/": 1.0, "http://b": 3.0})
+    assert set(pool.backends) == {"http://a", "http://b"}
+
+    chosen = []
+    for _ in range(4):
+        url = pool.choose()
+        pool.begin(url)
+        chosen.append(url)
+
+    # b 的权重是 a 的三倍，四个在途请求按 1:3 分配
+    assert chosen.count("http://a") == 1
+    assert chosen.count("http://b") == 3
+
+
+def test_exclude_and_availability_filters():
+    pool = BackendPool(["http://a", "http://b"])
+
+    assert pool.choose(exclude={"http://a"}) == "http://b"
+    assert pool.choose(exclude={"http://a", "http://b"}) is None
+    assert pool.choose(available=lambda url: url != "http://b") == "http://a"
+    # 全部不可用时仍然在候选中挑选，避免完全不可用
+    assert pool.choose(available=lambda url: False) in {"http://a", "http://b"}
+
+
+def test_failed_backend_sits_out_the_cooldown(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(tts_balancer.time, "monotonic", lambda: now[0])
+    pool = BackendPool(["http://a", "http://b"], failure_cooldown=5)
+
+    pool.begin("http://a")
+    pool.end("http://a", failed=True)
+
+    assert pool.backends["http://a"].outstanding == 0
+    assert all(pool.choose() == "http://b" for _ in range(10))
+    now[0] += 5
+    assert "http://a" in {pool.choose() for _ in range(50)}
+
+
+def test_ewma_prefers_unmeasured_then_faster_backends():
+    pool = BackendPool(["http://fast", "http://slow"], strategy="ewma", ewma_alpha=0.5)
+    pool.begin("http://slow")
+    pool.end("http://slow", latency=2.0)
+
+    assert pool.choose() == "http://fast"
+
+    pool.begin("http://fast")
+    pool.end("http://fast", latency=0.5)
+    pool.begin("http://fast")
+    pool.end("http://fast", latency=1.5)
+
+    assert pool.backends["http://fast"].ewma_latency == pytest.approx(1.0)
+    assert pool.choose() == "http://fast"
+
+
+def test_registered_pools_replace_and_close_old_ones():
+    first = BackendPool(["http://a"])
+    second = BackendPool(["http://b"])
+
+    register_backend_pool("test-pool", first)
+    register_backend_pool("test-pool", second)
+
+    assert get_backend_pool("test-pool") is second
+    assert first._stop_event.is_set()
+    assert get_backend_pool("http://x, http://y").backends.keys() == {"http://x", "http://y"}
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+
+from tools.audio_source import export_audio_file
+from tools.tts_cache import AudioCache
+
+
+def test_put_get_and_miss(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=1000)
+
+    path = cache.put("ab" * 32, b"wav-data")
+
+    assert path == tmp_path / "ab" / f"{'ab' * 32}.wav"
+    assert cache.get("ab" * 32) == b"wav-data"
+    assert cache.get("cd" * 32) is None
+    assert cache.total_bytes == len(b"wav-data")
+
+
+def test_evicts_least_recently_used_first(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=250)
+    for key in ("a1", "b1", "c1"):
+        cache.put(key, b"x" * 100)
+
+    assert cache.get("a1") is None
+    assert cache.get("b1") is not None
+    # b1 刚被读过，再写入时先淘汰 c1
+    cache.put("d1", b"x" * 100)
+
+    assert cache.get("c1") is None
+    assert cache.get("b1") is not None
+    assert not cache.path_for("c1").exists()
+    assert cache.total_bytes == 200
+
+
+def test_reopen_restores_lru_order_from_mtime(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=250)
+    cache.put("a1", b"x" * 100)
+    cache.put("b1", b"x" * 100)
+    os.utime(cache.path_for("a1"), ns=(2_000_000_000_000_000_000,) * 2)
+    os.utime(cache.path_for("b1"), ns=(1_000_000_000_000_000_000,) * 2)
+
+    reopened = AudioCache(tmp_path, max_bytes=250)
+    reopened.put("c1", b"x" * 100)
+
+    assert reopened.get("b1") is None
+    assert reopened.get("a1") is not None
+
+
+def test_failed_writer_leaves_no_entry(tmp_path):
+    cache = AudioCache(tmp_path)
+
+    with pytest.raises(ConnectionError):
+        with cache.writer("a1") as f:
+            f.write(b"partial")
+            raise ConnectionError
+
+    assert cache.get("a1") is None
+    assert list(tmp_path.rglob("*.part")) == []
+
+
+def test_exported_file_survives_eviction(tmp_path):
+    cache = AudioCache(tmp_path / "cache", max_bytes=150)
+    exported = export_audio_file(cache.put("a1", b"x" * 100), tmp_path / "out")
+
+    cache.put("b1", b"y" * 100)
+
+    assert cache.get("a1") is None
+    assert exported.read_bytes() == b"x" * 100
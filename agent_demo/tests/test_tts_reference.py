@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+import os
+import wave
+
+import pytest
+
+from tools.tts_reference import ReferenceAudioRegistry
+
+
+def write_wav(path, seconds, sample_rate=8000):
+    with wave.open(str(path), "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(sample_rate)
+        writer.writeframes(b"\x00\x00" * int(seconds * sample_rate))
+    return str(path)
+
+
+class CountingRegistry(ReferenceAudioRegistry):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.validations = 0
+
+    def _validate(self, path):
+        self.validations += 1
+        return super()._validate(path)
+
+
+def test_resolve_normalizes_path_and_reuses_entry(tmp_path, monkeypatch):
+    write_wav(tmp_path / "a.wav", 4)
+    monkeypatch.chdir(tmp_path)
+    registry = CountingRegistry()
+
+    first = registry.resolve("./a.wav")
+    second = registry.resolve("a.wav")
+
+    assert first is second
+    assert first.path == os.path.realpath(tmp_path / "a.wav")
+    assert first.duration == pytest.approx(4)
+    assert registry.validations == 1
+
+
+def test_modified_file_is_revalidated(tmp_path):
+    path = write_wav(tmp_path / "a.wav", 4)
+    registry = CountingRegistry()
+    before = registry.resolve(path)
+
+    write_wav(path, 5)
+    os.utime(path, ns=(before.mtime_ns + 10**9,) * 2)
+    after = registry.resolve(path)
+
+    assert after.duration == pytest.approx(5)
+    assert after.fingerprint != before.fingerprint
+    assert registry.validations == 2
+
+
+def test_missing_file_is_passed_through():
+    registry = ReferenceAudioRegistry()
+
+    assert registry.resolve("/remote/only/ref.wav") is None
+    assert registry.normalize_path("/remote/only/ref.wav") == "/remote/only/ref.wav"
+
+
+@pytest.mark.parametrize("name, header", [
+    ("ref.mp3", b"ID3\x03\x00\x00\x00"),
+    ("ref.flac", b"fLaC\x00\x00\x00\x22"),
+    ("ref.ogg", b"OggS\x00\x02\x00\x00"),
+])
+def test_non_wav_formats_skip_duration_check(tmp_path, name, header):
+    path = tmp_path / name
+    path.write_bytes(header + b"\x00" * 64)
+
+    entry = ReferenceAudioRegistry().resolve(str(path))
+
+    assert entry.duration is None
+    assert len(entry.fingerprint) == 64
+
+
+def test_out_of_range_wav_is_rejected(tmp_path):
+    path = write_wav(tmp_path / "short.wav", 1)
+
+    with pytest.raises(ValueError, match="超出范围"):
+        ReferenceAudioRegistry().resolve(path)
+
+
+def test_corrupt_wav_is_rejected(tmp_path):
+    path = tmp_path / "broken.wav"
+    path.write_bytes(b"RIFF\x00\x00\x00\x00WAVE")
+
+    with pytest.raises(ValueError, match="不是有效的 WAV"):
+        ReferenceAudioRegistry().resolve(str(path))
+
+
+def test_failures_are_cached_until_file_changes(tmp_path):
+    path = write_wav(tmp_path / "short.wav", 1)
+    registry = CountingRegistry()
+
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            registry.resolve(path)
+    assert registry.validations == 1
+
+    mtime_ns = os.stat(path).st_mtime_ns
+    write_wav(path, 4)
+    os.utime(path, ns=(mtime_ns + 10**9,) * 2)
+
+    assert registry.resolve(path).duration == pytest.approx(4)
+    assert registry.validations == 2
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+import httpx
+import pytest
+import requests
+
+from tools import tts_resilience
+from tools.tts_client import GPTSoVITSClient
+from tools.tts_resilience import (
+    NO_RETRY,
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    CircuitOpenError,
+    RetryPolicy,
+    is_backend_failure,
+    is_transient_error,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(tts_resilience.time, "monotonic", clock)
+    return clock
+
+
+def _http_error(status: int) -> requests.exceptions.HTTPError:
+    response = requests.Response()
+    response.status_code = status
+    return requests.exceptions.HTTPError(response=response)
+
+
+def test_backoff_is_jittered_under_an_exponential_cap():
+    policy = RetryPolicy(max_attempts=5, base_delay=0.5, max_delay=3.0, multiplier=2.0)
+
+    for retry_index, ceiling in enumerate([0.5, 1.0, 2.0, 3.0, 3.0]):
+        samples = [policy.backoff(retry_index) for _ in range(200)]
+        assert all(0 <= s <= ceiling for s in samples)
+        assert max(samples) > ceiling / 2
+    assert len(list(policy.delays())) == 4
+    assert list(NO_RETRY.delays()) == []
+
+
+def test_classifies_transient_and_request_errors():
+    request = httpx.Request("POST", "http://tts/tts")
+
+    assert is_transient_error(requests.exceptions.ConnectionError())
+    assert is_transient_error(requests.exceptions.ReadTimeout())
+    assert is_transient_error(httpx.ConnectTimeout("timeout"))
+    assert is_transient_error(_http_error(503))
+    assert is_transient_error(_http_error(429))
+    assert is_transient_error(
+        httpx.HTTPStatusError("", request=request, response=httpx.Response(502)),
+    )
+    assert not is_transient_error(_http_error(400))
+    assert not is_transient_error(ValueError())
+    assert is_backend_failure(CircuitOpenError("http://tts", 1.0))
+    assert not is_backend_failure(_http_error(422))
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("http://tts", failure_threshold=3, recovery_timeout=10)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 4
+    with pytest.raises(CircuitOpenError) as info:
+        breaker.before_request()
+    assert info.value.retry_after == pytest.approx(6)
+
+
+def test_half_open_allows_a_single_probe(clock):
+    breaker = CircuitBreaker("http://tts", failure_threshold=1, recovery_timeout=10)
+    breaker.record_failure()
+    clock.now += 10
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.before_request()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    # 探测失败重新打开，探测成功恢复正常
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 10
+    breaker.before_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_request()
+
+
+def test_released_probe_can_be_retried(clock):
+    breaker = CircuitBreaker("http://tts", failure_threshold=1, recovery_timeout=10)
+    breaker.record_failure()
+    clock.now += 10
+    breaker.before_request()
+
+    breaker.release()
+
+    breaker.before_request()
+
+
+def test_registry_shares_breakers_and_can_be_disabled(clock):
+    registry = CircuitBreakerRegistry(failure_threshold=1)
+    assert registry.get("http://a") is registry.get("http://a")
+
+    registry.get("http://a").record_failure()
+
+    assert not registry.allows("http://a")
+    assert registry.allows("http://b")
+    assert CircuitBreakerRegistry(failure_threshold=0).get("http://a") is None
+
+
+def _hedging_client(
+    monkeypatch,
+    errors: dict[str, Exception],
+) -> tuple[GPTSoVITSClient, list[str]]:
+    client = GPTSoVITSClient(hedge_url="http://backup", hedge_delay=5.0)
+    calls: list[str] = []
+
+    def post(api_url: str, payload: dict) -> requests.Response:
+        calls.append(api_url)
+        if api_url in errors:
+            raise errors[api_url]
+        response = requests.Response()
+        response._content = api_url.encode()
+        return response
+
+    monkeypatch.setattr(client, "_post", post)
+    return client, calls
+
+
+def test_hedge_falls_back_only_on_backend_failures(monkeypatch):
+    client, calls = _hedging_client(monkeypatch, {"http://main": _http_error(503)})
+    assert client._fetch_audio("http://main", {}) == b"http://backup"
+    assert calls == ["http://main", "http://backup"]
+
+    client, calls = _hedging_client(monkeypatch, {"http://main": _http_error(400)})
+    with pytest.raises(requests.exceptions.HTTPError):
+        client._fetch_audio("http://main", {})
+    assert calls == ["http://main"]
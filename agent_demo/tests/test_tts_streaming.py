@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import base64
+import io
+import wave
+
+import pytest
+
+from benchmarks.fake_tts_server import FakeTTSConfig, make_silent_wav, start_fake_server
+from tools import tts_client
+from tools.gpt_sovits_tts import gpt_sovits_text_to_audio_stream
+from tools.tts_cache import AudioCache
+from tools.tts_client import GPTSoVITSClient
+
+CONFIG = FakeTTSConfig(latency=0.0, audio_seconds=0.05, sample_rate=8000, stream_chunks=5)
+
+
+@pytest.fixture(scope="module")
+def api_url():
+    server, url = start_fake_server(CONFIG)
+    yield url
+    server.shutdown()
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    client = GPTSoVITSClient(cache=AudioCache(tmp_path / "tts"))
+    monkeypatch.setattr(tts_client, "_default_client", client)
+    yield client
+    client.close()
+
+
+def _synthesize(api_url: str, **kwargs) -> list:
+    return list(gpt_sovits_text_to_audio_stream(
+        "你好", "/remote/ref.wav", "参考文本", api_url=api_url, **kwargs,
+    ))
+
+
+def _pcm(response) -> bytes:
+    [block] = response.content
+    data = base64.b64decode(block["source"]["data"])
+    with wave.open(io.BytesIO(data), "rb") as reader:
+        assert reader.getframerate() == CONFIG.sample_rate
+        return reader.readframes(reader.getnframes())
+
+
+def _expected_pcm() -> bytes:
+    with wave.open(io.BytesIO(make_silent_wav(CONFIG.audio_seconds, CONFIG.sample_rate))) as r:
+        return r.readframes(r.getnframes())
+
+
+def test_stream_yields_playable_chunks_then_summary(api_url, client):
+    responses = _synthesize(api_url, chunk_size=256)
+
+    *audio, summary = responses
+    assert len(audio) > 1
+    assert not any(r.is_last for r in audio) and summary.is_last
+    assert b"".join(_pcm(r) for r in audio) == _expected_pcm()
+    assert f"共 {len(audio)} 个音频分块" in summary.content[0]["text"]
+
+
+def test_stream_replays_from_cache(api_url, client):
+    first = _synthesize(api_url)
+    # 服务不可达时仍能从缓存回放
+    cached = _synthesize("http://127.0.0.1:9")
+
+    assert b"".join(_pcm(r) for r in cached[:-1]) == b"".join(_pcm(r) for r in first[:-1])
+
+
+def test_stream_reports_errors_as_text(client):
+    responses = _synthesize("http://127.0.0.1:9", use_cache=False)
+
+    [error] = responses
+    assert error.content[0]["type"] == "text"
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+from tools.tts_text import split_text
+
+
+def test_short_text_is_a_single_segment():
+    assert split_text("  你好，世界。 ") == ["你好，世界。"]
+    assert split_text("   ") == []
+
+
+def test_splits_on_sentence_boundaries_and_merges_short_ones():
+    text = "第一句话。第二句话！第三句话？" * 3
+    segments = split_text(text, max_chars=12)
+
+    assert "".join(segments) == text
+    assert all(len(s) <= 12 for s in segments)
+    # 相邻的短句合并到接近上限，而不是每句一个请求
+    assert segments[0] == "第一句话。第二句话！"
+
+
+def test_long_sentence_falls_back_to_clauses_then_hard_cut():
+    clause = "这是一个很长的分句"
+    text = "，".join([clause] * 4) + "。" + "长" * 25
+    segments = split_text(text, max_chars=20)
+
+    assert "".join(segments) == text
+    assert all(len(s) <= 20 for s in segments)
+
+
+def test_english_never_cuts_words():
+    text = "The quick brown fox jumps over the lazy dog. " * 6
+    segments = split_text(text, lang="en", max_chars=50)
+
+    assert " ".join(segments) == text.strip()
+    assert all(len(s) <= 50 for s in segments)
+    words = set(text.split())
+    assert all(word in words for s in segments for word in s.split())
+
+
+def test_default_limit_depends_on_language():
+    text = "a" * 100
+    assert len(split_text(text, lang="en")) == 1
+    assert len(split_text(text, lang="zh")) == 2
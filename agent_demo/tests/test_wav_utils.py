@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+import io
+import wave
+
+import pytest
+
+from tools.wav_utils import concat_wav, split_wav_stream
+
+
+def _wav(frames: bytes, channels: int = 1, sampwidth: int = 2, rate: int = 32000) -> bytes:
+    output = io.BytesIO()
+    with wave.open(output, "wb") as writer:
+        writer.setnchannels(channels)
+        writer.setsampwidth(sampwidth)
+        writer.setframerate(rate)
+        writer.writeframes(frames)
+    return output.getvalue()
+
+
+def _read(data: bytes) -> tuple[tuple[int, int, int], bytes]:
+    with wave.open(io.BytesIO(data), "rb") as reader:
+        params = (reader.getnchannels(), reader.getsampwidth(), reader.getframerate())
+        return params, reader.readframes(reader.getnframes())
+
+
+def test_concat_joins_frames_in_order():
+    parts = [bytes([i]) * 200 for i in range(3)]
+
+    params, frames = _read(concat_wav([_wav(p) for p in parts]))
+
+    assert params == (1, 2, 32000)
+    assert frames == b"".join(parts)
+
+
+def test_single_segment_is_returned_as_is():
+    data = _wav(b"\x01\x02" * 10)
+    assert concat_wav([data]) is data
+
+
+def test_rejects_empty_and_mismatched_segments():
+    with pytest.raises(ValueError):
+        concat_wav([])
+    with pytest.raises(ValueError, match="第 1 段"):
+        concat_wav([_wav(b"\x00" * 8), _wav(b"\x00" * 8, rate=16000)])
+
+
+def _streaming_header(data: bytes) -> bytes:
+    """模拟流式响应的文件头：RIFF 和 data 块长度都是占位值。"""
+    return data[:4] + b"\xff\xff\xff\xff" + data[8:40] + b"\xff\xff\xff\xff"
+
+
+def _split(data: bytes, sizes: list[int]) -> list[bytes]:
+    chunks, start = [], 0
+    for size in sizes:
+        chunks.append(data[start:start + size])
+        start += size
+    return [*chunks, data[start:]]
+
+
+def test_split_stream_wraps_every_chunk_in_a_valid_header():
+    frames = bytes(range(256)) * 4
+    data = _streaming_header(_wav(frames)) + frames
+    # 文件头被拆到两个分块里，之后的分块边界不按采样帧对齐
+    chunks = _split(data, [20, 30, 101, 300])
+
+    parts = [_read(part) for part in split_wav_stream(chunks)]
+
+    assert all(params == (1, 2, 32000) for params, _ in parts)
+    assert all(len(pcm) % 2 == 0 for _, pcm in parts)
+    assert b"".join(pcm for _, pcm in parts) == frames
+
+
+def test_split_stream_aligns_to_stereo_frames():
+    frames = bytes(range(240))
+    data = _wav(frames, channels=2)
+    parts = [_read(part) for part in split_wav_stream(_split(data, [44, 7, 50]))]
+
+    assert all(len(pcm) % 4 == 0 for _, pcm in parts)
+    assert b"".join(pcm for _, pcm in parts) == frames
+
+
+def test_split_stream_rejects_bad_input():
+    with pytest.raises(ValueError, match="不是 WAV"):
+        list(split_wav_stream([b"ID3\x03" + b"\x00" * 40]))
+    with pytest.raises(ValueError, match="文件头不完整"):
+        list(split_wav_stream([b"RIFF"]))
@@ -1,5 +1,36 @@
 # -*- coding: utf-8 -*-
-"""Tools package for agent_demo."""
-from .gpt_sovits_tts import gpt_sovits_text_to_audio
+"""Tools package for agent_demo.
 
-__all__ = ["gpt_sovits_text_to_audio"]
+子模块在首次访问其中的名字时才导入，见 `lazy_import.attach`：只用
+`execute_python_code_warm` 时不会导入 TTS 客户端及其依赖的 httpx、requests。
+"""
+from typing import TYPE_CHECKING
+
+from lazy_import import attach
+
+if TYPE_CHECKING:
+    from .gpt_sovits_tts import (
+        gpt_sovits_text_to_audio,
+        gpt_sovits_text_to_audio_async,
+        gpt_sovits_text_to_audio_stream,
+    )
+    from .python_exec import execute_python_code_warm
+
+__all__ = [
+    "execute_python_code_warm",
+    "gpt_sovits_text_to_audio",
+    "gpt_sovits_text_to_audio_async",
+    "gpt_sovits_text_to_audio_stream",
+]
+
+__getattr__, __dir__ = attach(
+    __name__,
+    {
+        "gpt_sovits_tts": [
+            "gpt_sovits_text_to_audio",
+            "gpt_sovits_text_to_audio_async",
+            "gpt_sovits_text_to_audio_stream",
+        ],
+        "python_exec": ["execute_python_code_warm"],
+    },
+)
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""文件形式的 AudioBlock：音频数据留在磁盘上，块里只保存文件路径。"""
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from agentscope.message import AudioBlock
+
+DEFAULT_OUTPUT_DIR = Path(
+    os.environ.get(
+        "GPT_SOVITS_OUTPUT_DIR",
+        Path.home() / ".local" / "share" / "agent_demo" / "tts_output",
+    )
+)
+
+
+def file_audio_block(path: str | os.PathLike) -> AudioBlock:
+    """构建指向本地音频文件的 AudioBlock。
+
+    块里只保存文件的绝对路径（URLSource），不复制、不 base64 编码音频数据。
+    AgentScope 的 formatter 遇到本地路径时会自行读取文件。
+
+    Args:
+        path (str | os.PathLike): 音频文件路径
+
+    Returns:
+        AudioBlock: source 类型为 "url" 的音频块
+    """
+    return AudioBlock(
+        type="audio",
+        source={
+            "type": "url",
+            "url": os.path.abspath(path),
+        },
+    )
+
+
+def export_audio_file(
+    path: str | os.PathLike,
+    output_dir: str | os.PathLike = DEFAULT_OUTPUT_DIR,
+) -> Path:
+    """把缓存中的音频文件导出到不会被淘汰的输出目录。
+
+    `AudioCache` 会按 LRU 删除旧文件，而交给调用方的路径可能长期保存在
+    记忆和持久化日志里，因此返回给调用方之前先导出一份。优先创建硬链接
+    （不复制数据，缓存淘汰时只删除缓存目录中的那个名字），跨文件系统时
+    退回复制。缓存文件名是内容摘要，同名文件已存在时直接复用。
+
+    Args:
+        path (str | os.PathLike): 缓存中的音频文件
+        output_dir (str | os.PathLike, optional): 输出目录
+
+    Returns:
+        Path: 输出目录中的文件路径
+    """
+    path = Path(path)
+    output_dir = Path(output_dir)
+    target = output_dir / path.name
+    if target.is_file():
+        return target
+    output_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(path, target)
+    except FileExistsError:
+        pass
+    except OSError:
+        # 跨文件系统等无法硬链接的情况：先复制到临时文件再原子替换
+        fd, tmp_path = tempfile.mkstemp(dir=output_dir, suffix=".part")
+        os.close(fd)
+        try:
+            shutil.copyfile(path, tmp_path)
+            os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+    return target
@@ -1,13 +1,27 @@
 # -*- coding: utf-8 -*-
 """GPT-SoVITS text-to-speech tool for voice cloning."""
+import asyncio
 import base64
-from typing import Literal
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Generator, Literal
 
+import httpx
 import requests
 
 from agentscope.message import AudioBlock, TextBlock
 from agentscope.tool import ToolResponse
 
+from .audio_source import export_audio_file, file_audio_block
+from .tts_async_client import get_default_async_client
+from .tts_cache import AudioCache, make_cache_key
+from .tts_client import DEFAULT_CHUNK_SIZE, DEFAULT_MAX_WORKERS, get_default_client
+from .tts_reference import get_default_registry
+from .tts_resilience import CircuitOpenError
+from .tts_text import split_text
+from .wav_utils import concat_wav, split_wav_stream
+
 
 def gpt_sovits_text_to_audio(
     text: str,
@@ -20,9 +34,16 @@ def gpt_sovits_text_to_audio(
     top_k: int = 5,
     top_p: float = 0.8,
     temperature: float = 0.8,
+    use_cache: bool = True,
+    split_sentences: bool = True,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    audio_output: Literal["base64", "file"] = "base64",
 ) -> ToolResponse:
     """使用 GPT-SoVITS 将文本转换为语音，支持声音克隆。
 
+    长文本会在句子 / 标点边界处切分成多个片段并发合成，再按原顺序拼接
+    PCM 数据，总耗时取决于最长的片段而不是全文长度。
+
     Args:
         text (str): 要合成的文本内容
         ref_audio_path (str): 参考音频文件路径（用于克隆声音）
@@ -31,11 +52,19 @@ def gpt_sovits_text_to_audio(
             合成文本的语言，默认为 "zh"（中文）
         prompt_lang (Literal["zh", "en", "ja", "yue"], optional):
             参考音频的语言，默认为 "zh"（中文）
-        api_url (str, optional): GPT-SoVITS API 地址，默认为 "http://localhost:9880"
+        api_url (str, optional): GPT-SoVITS API 地址，默认为 "http://localhost:9880"；
+            传入逗号分隔的多个地址时在这些实例之间负载均衡
         speed (float, optional): 语速控制，范围 0.5-2.0，默认为 1.0
         top_k (int, optional): 采样参数，控制多样性，默认为 5
         top_p (float, optional): 核采样参数，默认为 0.8
         temperature (float, optional): 温度参数，控制随机性，默认为 0.8
+        use_cache (bool, optional): 是否复用相同参数的历史合成结果，默认为 True
+        split_sentences (bool, optional): 是否把长文本切分后并发合成，默认为 True
+        max_workers (int, optional): 并发合成的最大片段数，默认为 4
+        audio_output (Literal["base64", "file"], optional):
+            音频的返回形式。"base64" 把音频内联到 AudioBlock 中；"file" 只返回
+            本地 WAV 文件路径（位于不会被缓存淘汰的输出目录），不编码音频数据。
+            默认为 "base64"
 
     Returns:
         ToolResponse: 包含 AudioBlock 的响应，如果出错则包含错误信息
@@ -48,80 +77,306 @@ def gpt_sovits_text_to_audio(
         ... )
         >>> # response.content[0] 包含 AudioBlock
     """
+    client = get_default_client()
     try:
         # 构建请求 payload
-        payload = {
-            "text": text,
-            "text_lang": text_lang,
-            "ref_audio_path": ref_audio_path,
-            "prompt_text": prompt_text,
-            "prompt_lang": prompt_lang,
-            "speed": speed,
-            "top_k": top_k,
-            "top_p": top_p,
-            "temperature": temperature,
-        }
-
-        # 调用 GPT-SoVITS API
-        response = requests.post(
-            f"{api_url}/tts",
-            json=payload,
-            timeout=60,
+        payload = _build_payload(
+            text, ref_audio_path, prompt_text, text_lang, prompt_lang,
+            speed, top_k, top_p, temperature,
         )
-        response.raise_for_status()
-
-        # 处理返回的音频数据
-        audio_data = response.content
-        audio_base64 = base64.b64encode(audio_data).decode("utf-8")
-
-        # 构建 AudioBlock
-        audio_block = AudioBlock(
-            type="audio",
-            source={
-                "type": "base64",
-                "media_type": "audio/wav",
-                "data": audio_base64,
-            },
+
+        # 文件模式下直接返回缓存文件路径，整段音频不经过内存
+        if audio_output == "file":
+            path = _lookup_audio_file(client.cache, payload, use_cache)
+            if path is not None:
+                return ToolResponse(content=[file_audio_block(path)], is_last=True)
+
+        # 调用 GPT-SoVITS API（复用连接池，相同请求命中磁盘缓存）
+        payloads = _segment_payloads(payload, split_sentences)
+        audio_data = concat_wav(
+            client.synthesize_many(
+                api_url, payloads, max_workers=max_workers, use_cache=use_cache,
+            )
         )
 
+        if audio_output == "file":
+            path = _store_audio_file(client.cache, payload, audio_data, use_cache)
+            audio_block = file_audio_block(path)
+        else:
+            audio_block = _audio_block(audio_data)
+
         return ToolResponse(
             content=[audio_block],
             is_last=True,
         )
 
-    except requests.exceptions.ConnectionError:
-        return ToolResponse(
-            content=[
-                TextBlock(
-                    type="text",
-                    text=f"TTS 连接失败：无法连接到 GPT-SoVITS API ({api_url})。"
-                    "请确保服务已启动（运行 `python api_v2.py -a 0.0.0.0 -p 9880`）。",
-                )
-            ],
-            is_last=True,
+    except Exception as e:
+        return _error_response(e, api_url, client.timeout)
+
+
+async def gpt_sovits_text_to_audio_async(
+    text: str,
+    ref_audio_path: str,
+    prompt_text: str,
+    text_lang: Literal["zh", "en", "ja", "yue"] = "zh",
+    prompt_lang: Literal["zh", "en", "ja", "yue"] = "zh",
+    api_url: str = "http://localhost:9880",
+    speed: float = 1.0,
+    top_k: int = 5,
+    top_p: float = 0.8,
+    temperature: float = 0.8,
+    use_cache: bool = True,
+    split_sentences: bool = True,
+    audio_output: Literal["base64", "file"] = "base64",
+) -> ToolResponse:
+    """使用 GPT-SoVITS 将文本转换为语音（异步版本），支持声音克隆。
+
+    在 asyncio 事件循环中运行的 Agent（如 ReActAgent）应优先注册本工具：
+    合成期间不会阻塞事件循环，多个 Agent 可以并行合成。
+    长文本同样会切分后并发合成再按顺序拼接。并发数受默认异步客户端的
+    `max_concurrency` 限制，任务被取消时请求立即中断。
+
+    Args:
+        text (str): 要合成的文本内容
+        ref_audio_path (str): 参考音频文件路径（用于克隆声音）
+        prompt_text (str): 参考音频对应的文本内容
+        text_lang (Literal["zh", "en", "ja", "yue"], optional):
+            合成文本的语言，默认为 "zh"（中文）
+        prompt_lang (Literal["zh", "en", "ja", "yue"], optional):
+            参考音频的语言，默认为 "zh"（中文）
+        api_url (str, optional): GPT-SoVITS API 地址，默认为 "http://localhost:9880"；
+            传入逗号分隔的多个地址时在这些实例之间负载均衡
+        speed (float, optional): 语速控制，范围 0.5-2.0，默认为 1.0
+        top_k (int, optional): 采样参数，控制多样性，默认为 5
+        top_p (float, optional): 核采样参数，默认为 0.8
+        temperature (float, optional): 温度参数，控制随机性，默认为 0.8
+        use_cache (bool, optional): 是否复用相同参数的历史合成结果，默认为 True
+        split_sentences (bool, optional): 是否把长文本切分后并发合成，默认为 True
+        audio_output (Literal["base64", "file"], optional):
+            音频的返回形式。"base64" 把音频内联到 AudioBlock 中；"file" 只返回
+            本地 WAV 文件路径（位于不会被缓存淘汰的输出目录），不编码音频数据。
+            默认为 "base64"
+
+    Returns:
+        ToolResponse: 包含 AudioBlock 的响应，如果出错则包含错误信息
+    """
+    client = get_default_async_client()
+    try:
+        payload = _build_payload(
+            text, ref_audio_path, prompt_text, text_lang, prompt_lang,
+            speed, top_k, top_p, temperature,
         )
-    except requests.exceptions.Timeout:
-        return ToolResponse(
-            content=[
-                TextBlock(
-                    type="text",
-                    text=f"TTS 超时：请求在 {60} 秒后超时。请尝试缩短文本或检查服务器性能。",
-                )
-            ],
-            is_last=True,
+        if audio_output == "file":
+            path = await asyncio.to_thread(
+                _lookup_audio_file, client.cache, payload, use_cache,
+            )
+            if path is not None:
+                return ToolResponse(content=[file_audio_block(path)], is_last=True)
+
+        payloads = _segment_payloads(payload, split_sentences)
+        audio_data = concat_wav(
+            await client.synthesize_many(api_url, payloads, use_cache=use_cache)
         )
-    except requests.exceptions.HTTPError as e:
+
+        if audio_output == "file":
+            path = await asyncio.to_thread(
+                _store_audio_file, client.cache, payload, audio_data, use_cache,
+            )
+            audio_block = file_audio_block(path)
+        else:
+            audio_block = _audio_block(audio_data)
+
         return ToolResponse(
-            content=[
-                TextBlock(
-                    type="text",
-                    text=f"TTS HTTP 错误：{e.response.status_code} - {e.response.text}",
-                )
-            ],
+            content=[audio_block],
             is_last=True,
         )
+
     except Exception as e:
-        return ToolResponse(
-            content=[TextBlock(type="text", text=f"TTS 错误: {str(e)}")],
-            is_last=True,
+        return _error_response(e, api_url, client.timeout)
+
+
+def gpt_sovits_text_to_audio_stream(
+    text: str,
+    ref_audio_path: str,
+    prompt_text: str,
+    text_lang: Literal["zh", "en", "ja", "yue"] = "zh",
+    prompt_lang: Literal["zh", "en", "ja", "yue"] = "zh",
+    api_url: str = "http://localhost:9880",
+    speed: float = 1.0,
+    top_k: int = 5,
+    top_p: float = 0.8,
+    temperature: float = 0.8,
+    use_cache: bool = True,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Generator[ToolResponse, None, None]:
+    """使用 GPT-SoVITS 流式合成语音，边合成边返回音频分块，支持声音克隆。
+
+    与 `gpt_sovits_text_to_audio` 不同，本工具不会把整段音频读入内存后再返回，
+    而是每收到一个分块就产出一个只包含该分块的 ToolResponse
+    （`is_last=False`），播放端拿到第一个分块即可开始播放。每个分块都带有
+    自己的 WAV 头，可以单独解码播放。
+    全部分块发送完毕后，最后产出一个 `is_last=True` 的文字摘要。
+
+    Args:
+        text (str): 要合成的文本内容
+        ref_audio_path (str): 参考音频文件路径（用于克隆声音）
+        prompt_text (str): 参考音频对应的文本内容
+        text_lang (Literal["zh", "en", "ja", "yue"], optional):
+            合成文本的语言，默认为 "zh"（中文）
+        prompt_lang (Literal["zh", "en", "ja", "yue"], optional):
+            参考音频的语言，默认为 "zh"（中文）
+        api_url (str, optional): GPT-SoVITS API 地址，默认为 "http://localhost:9880"；
+            传入逗号分隔的多个地址时在这些实例之间负载均衡
+        speed (float, optional): 语速控制，范围 0.5-2.0，默认为 1.0
+        top_k (int, optional): 采样参数，控制多样性，默认为 5
+        top_p (float, optional): 核采样参数，默认为 0.8
+        temperature (float, optional): 温度参数，控制随机性，默认为 0.8
+        use_cache (bool, optional): 是否复用相同参数的历史合成结果，默认为 True
+        chunk_size (int, optional): 每个音频分块的最大字节数，默认为 32KB
+
+    Yields:
+        ToolResponse: 每个响应包含一个音频分块的 AudioBlock（完整的 WAV），
+            最后一个响应包含合成摘要；出错时产出错误信息并结束
+    """
+    client = get_default_client()
+    total_bytes = 0
+    num_chunks = 0
+    try:
+        payload = _build_payload(
+            text, ref_audio_path, prompt_text, text_lang, prompt_lang,
+            speed, top_k, top_p, temperature,
+        )
+        # 服务端只在第一个分块带 WAV 头，重新封装后每个分块都是独立的 WAV
+        for chunk in split_wav_stream(
+            client.synthesize_stream(
+                api_url, payload, chunk_size=chunk_size, use_cache=use_cache,
+            )
+        ):
+            total_bytes += len(chunk)
+            num_chunks += 1
+            yield ToolResponse(
+                content=[_audio_block(chunk)],
+                stream=True,
+                is_last=False,
+            )
+
+    except Exception as e:
+        yield _error_response(e, api_url, client.timeout)
+        return
+
+    yield ToolResponse(
+        content=[
+            TextBlock(
+                type="text",
+                text=f"语音合成完成：共 {num_chunks} 个音频分块，{total_bytes} 字节。",
+            )
+        ],
+        stream=True,
+        is_last=True,
+    )
+
+
+def _build_payload(
+    text: str,
+    ref_audio_path: str,
+    prompt_text: str,
+    text_lang: str,
+    prompt_lang: str,
+    speed: float,
+    top_k: int,
+    top_p: float,
+    temperature: float,
+) -> dict[str, Any]:
+    """构建 `/tts` 请求体，参考音频经登记表校验并规范化路径。"""
+    return {
+        "text": text,
+        "text_lang": text_lang,
+        "ref_audio_path": get_default_registry().normalize_path(ref_audio_path),
+        "prompt_text": prompt_text,
+        "prompt_lang": prompt_lang,
+        "speed": speed,
+        "top_k": top_k,
+        "top_p": top_p,
+        "temperature": temperature,
+    }
+
+
+def _segment_payloads(
+    payload: dict[str, Any],
+    split_sentences: bool,
+) -> list[dict[str, Any]]:
+    """按句子切分文本，为每个片段生成一份请求体。"""
+    if not split_sentences:
+        return [payload]
+    segments = split_text(payload["text"], lang=payload["text_lang"])
+    if len(segments) <= 1:
+        return [payload]
+    return [{**payload, "text": segment} for segment in segments]
+
+
+def _lookup_audio_file(
+    cache: AudioCache | None,
+    payload: dict[str, Any],
+    use_cache: bool,
+) -> Path | None:
+    """在缓存中查找整段文本对应的音频文件，命中时导出到输出目录。"""
+    if not use_cache or cache is None:
+        return None
+    path = cache.lookup(make_cache_key(payload))
+    if path is None:
+        return None
+    try:
+        return export_audio_file(path)
+    except FileNotFoundError:
+        # 查找之后恰好被其他线程淘汰，按未命中处理
+        return None
+
+
+def _store_audio_file(
+    cache: AudioCache | None,
+    payload: dict[str, Any],
+    audio_data: bytes,
+    use_cache: bool,
+) -> Path:
+    """把音频保存为文件：启用缓存时存入缓存目录并导出，否则写入临时文件。"""
+    if use_cache and cache is not None:
+        key = make_cache_key(payload)
+        # 单片段合成时 synthesize 已经写过同一个键，不必再写一遍
+        return export_audio_file(cache.lookup(key) or cache.put(key, audio_data))
+    fd, path = tempfile.mkstemp(prefix="gpt_sovits_", suffix=".wav")
+    with os.fdopen(fd, "wb") as f:
+        f.write(audio_data)
+    return Path(path)
+
+
+def _audio_block(audio_data: bytes) -> AudioBlock:
+    """把 WAV 数据编码为 base64 并包装成 AudioBlock。"""
+    return AudioBlock(
+        type="audio",
+        source={
+            "type": "base64",
+            "media_type": "audio/wav",
+            "data": base64.b64encode(audio_data).decode("utf-8"),
+        },
+    )
+
+
+def _error_response(error: Exception, api_url: str, timeout: float) -> ToolResponse:
+    """把请求异常（requests 或 httpx）转换为带错误提示的 ToolResponse。"""
+    if isinstance(error, CircuitOpenError):
+        text = f"TTS 服务暂不可用：{error}。请检查 GPT-SoVITS 服务状态。"
+    elif isinstance(error, (requests.exceptions.ConnectionError, httpx.ConnectError)):
+        text = (
+            f"TTS 连接失败：无法连接到 GPT-SoVITS API ({api_url})。"
+            "请确保服务已启动（运行 `python api_v2.py -a 0.0.0.0 -p 9880`）。"
         )
+    elif isinstance(error, (requests.exceptions.Timeout, httpx.TimeoutException)):
+        text = f"TTS 超时：请求在 {timeout} 秒后超时。请尝试缩短文本或检查服务器性能。"
+    elif isinstance(error, (requests.exceptions.HTTPError, httpx.HTTPStatusError)):
+        text = f"TTS HTTP 错误：{error.response.status_code} - {error.response.text}"
+    else:
+        text = f"TTS 错误: {str(error)}"
+    return ToolResponse(
+        content=[TextBlock(type="text", text=text)],
+        is_last=True,
+    )
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""让同步工具函数在线程池中执行，以便多个工具调用可以并发运行。"""
+import asyncio
+import functools
+import inspect
+from concurrent.futures import Executor
+from typing import Any, Callable
+
+from agentscope.tool import ToolResponse
+
+
+def run_in_executor(
+    func: Callable[..., ToolResponse],
+    executor: Executor | None = None,
+) -> Callable[..., Any]:
+    """把同步工具函数包装成异步函数，调用时在线程池（或进程池）中执行。
+
+    `Toolkit` 会在事件循环线程上直接调用同步工具，即使 ReAct 智能体
+    开启了 `parallel_tool_calls`，一步中的多个同步工具调用也只能依次执行。
+    包装后的函数保留原函数的名称、签名和 docstring，注册到 `Toolkit` 后
+    生成的 JSON schema 与原函数相同，同时会与其他工具调用并发执行。
+
+    异步函数和生成器函数原样返回。
+
+    Args:
+        func (Callable[..., ToolResponse]): 同步工具函数
+        executor (Executor | None, optional): 执行器，默认使用事件循环的默认线程池；
+            传入 `ProcessPoolExecutor` 时 `func` 及其参数、返回值需可被 pickle
+
+    Returns:
+        Callable[..., Any]: 可直接传给 `Toolkit.register_tool_function` 的异步函数
+    """
+    if (
+        inspect.iscoroutinefunction(func)
+        or inspect.isgeneratorfunction(func)
+        or inspect.isasyncgenfunction(func)
+    ):
+        return func
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> ToolResponse:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor,
+            functools.partial(func, *args, **kwargs),
+        )
+
+    return wrapper
+
+
+def run_coroutine_in_thread(func: Callable[..., Any]) -> Callable[..., Any]:
+    """让内部做同步阻塞 IO 的异步工具函数在工作线程中执行。
+
+    有些工具虽然定义为 `async def`，函数体里却是同步读写文件（例如
+    agentscope 自带的 `view_text_file`），直接注册会在事件循环线程上阻塞。
+    包装后每次调用在默认线程池中用一个独立的事件循环运行原协程，不阻塞
+    调用方的事件循环。只适用于不依赖调用方事件循环中任何对象的工具。
+
+    Args:
+        func (Callable[..., Any]): 异步工具函数
+
+    Returns:
+        Callable[..., Any]: 签名和 docstring 与原函数相同的异步函数
+    """
+    if not inspect.iscoroutinefunction(func):
+        raise TypeError(f"{func.__name__} 不是异步函数，同步函数请使用 run_in_executor")
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> ToolResponse:
+        return await asyncio.to_thread(asyncio.run, func(*args, **kwargs))
+
+    return wrapper
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""在预热的 worker 池中执行 Python 代码的工具函数。"""
+import os
+from typing import Any
+
+from agentscope.message import TextBlock
+from agentscope.tool import ToolResponse, execute_python_code
+
+from .python_worker_pool import get_default_python_pool
+
+
+async def execute_python_code_warm(
+    code: str,
+    timeout: float = 300,
+    **kwargs: Any,
+) -> ToolResponse:
+    """Execute the given python code and capture the return code, standard
+    output and error. Note you must `print` the output to get the result.
+    Each execution starts from a clean state: variables and imports from
+    previous executions are not kept.
+
+    Args:
+        code (`str`):
+            The Python code to be executed.
+        timeout (`float`, defaults to `300`):
+            The maximum time (in seconds) allowed for the code to run.
+
+    Returns:
+        `ToolResponse`:
+            The response containing the return code, standard output, and
+            standard error of the executed code.
+    """
+    if not hasattr(os, "fork"):
+        # 不支持 fork 的平台退回到每次启动新解释器的实现
+        return await execute_python_code(code, timeout=timeout, **kwargs)
+
+    result = await get_default_python_pool().run_async(code, timeout)
+    return ToolResponse(
+        content=[
+            TextBlock(
+                type="text",
+                text=f"<returncode>{result.returncode}</returncode>"
+                f"<stdout>{result.stdout}</stdout>"
+                f"<stderr>{result.stderr}</stderr>",
+            ),
+        ],
+    )
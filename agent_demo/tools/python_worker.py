@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""Python 代码执行 worker 的入口脚本，由 `PythonWorkerPool` 以子进程方式启动。
+
+worker 启动时预先导入常用模块，然后逐行从 stdin 读取 JSON 请求
+`{"code", "timeout", "cpu_time_limit", "memory_limit"}`。每个请求都 fork
+出一个子进程执行代码：子进程继承已导入的模块（无需重新启动解释器），
+执行完即退出，全局变量、导入、猴子补丁等状态都不会留到下一次。
+子进程在执行前设置 CPU 时间和内存上限，超时由 worker 直接 kill。
+fork 出子进程后先写回一行 `{"started": true}`，执行结束后再以一行 JSON
+`{"returncode", "stdout", "stderr"}` 写回结果。收到 `started` 之后，
+worker 收到 SIGUSR1 时立即 kill 子进程，同样写回一行结果，用于调用方
+取消执行；在此之前取消时 SIGUSR1 没有可 kill 的子进程，调用方应直接
+kill 整个 worker。
+
+本脚本只依赖标准库，且只能在支持 fork 的平台上运行。
+"""
+import builtins
+import importlib
+import json
+import linecache
+import os
+import select
+import signal
+import sys
+import tempfile
+import time
+import traceback
+from typing import Callable
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - 非 POSIX 平台
+    resource = None
+
+_POLL_INTERVALS = (0.0005, 0.001, 0.002, 0.005, 0.01)
+
+# 正在执行的子进程及其是否被取消，由 SIGUSR1 的处理函数读写
+_current_child: int | None = None
+_cancelled = False
+
+
+def main() -> None:
+    # 协议使用原来的 stdout，之后把 fd 1 指向 /dev/null，防止预导入模块的输出混入协议
+    protocol_out = os.fdopen(os.dup(1), "w", encoding="utf-8", buffering=1)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+
+    for name in sys.argv[1:]:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            # 可选模块（如 numpy）未安装时跳过
+            pass
+
+    _warm_up()
+    signal.signal(signal.SIGUSR1, _cancel_current)
+
+    while True:
+        line = sys.stdin.readline()
+        if not line:
+            break
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        response = _run(
+            request["code"],
+            request.get("timeout"),
+            request.get("cpu_time_limit"),
+            request.get("memory_limit"),
+            lambda: protocol_out.write('{"started": true}\n'),
+        )
+        protocol_out.write(json.dumps(response, ensure_ascii=False) + "\n")
+
+
+def _warm_up() -> None:
+    """在 fork 之前走一遍编译、执行和异常格式化。
+
+    预导入的模块都是从 .pyc 加载的，解析器和 traceback 格式化在首次使用时
+    还有数毫秒的初始化开销；在 worker 中先做一次，fork 出的子进程就不必
+    每次重复。
+    """
+    try:
+        exec(compile("x = [i * i for i in range(3)]\n1 / 0", "<warmup>", "exec"), {})
+    except ZeroDivisionError as e:
+        traceback.format_exception(type(e), e, e.__traceback__)
+
+
+def _cancel_current(signum: int, frame: object) -> None:
+    """SIGUSR1：kill 正在执行的子进程，没有执行中的代码时忽略。
+
+    调用方只在收到 `started` 之后才发送 SIGUSR1，此时一定有子进程；
+    子进程刚结束时收到的迟到信号不会影响下一次执行。
+    """
+    global _cancelled
+    if _current_child is not None:
+        _cancelled = True
+        os.kill(_current_child, signal.SIGKILL)
+
+
+def _run(
+    code: str,
+    timeout: float | None,
+    cpu_time_limit: int | None,
+    memory_limit: int | None,
+    on_started: Callable[[], object],
+) -> dict:
+    global _current_child, _cancelled
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        _cancelled = False
+        # fork 与记录子进程 pid 之间屏蔽 SIGUSR1，取消信号不会落空
+        signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGUSR1})
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGUSR1, signal.SIG_DFL)
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, {signal.SIGUSR1})
+            _child(code, out.fileno(), err.fileno(), cpu_time_limit, memory_limit)
+        _current_child = pid
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, {signal.SIGUSR1})
+        try:
+            # 告知调用方子进程已就绪，此后的取消才能用 SIGUSR1 送达
+            on_started()
+            status, timed_out = _wait(pid, timeout)
+        finally:
+            _current_child = None
+        out.seek(0)
+        err.seek(0)
+        stdout = out.read().decode("utf-8", errors="replace")
+        stderr = err.read().decode("utf-8", errors="replace")
+
+    if _cancelled:
+        suffix = "CancelledError: The code execution was cancelled."
+        return {
+            "returncode": -1,
+            "stdout": stdout,
+            "stderr": f"{stderr}\n{suffix}" if stderr else suffix,
+        }
+    if timed_out:
+        suffix = f"TimeoutError: The code execution exceeded the timeout of {timeout} seconds."
+        return {
+            "returncode": -1,
+            "stdout": stdout,
+            "stderr": f"{stderr}\n{suffix}" if stderr else suffix,
+        }
+    return {
+        "returncode": os.waitstatus_to_exitcode(status),
+        "stdout": stdout,
+        "stderr": stderr,
+    }
+
+
+def _wait(pid: int, timeout: float | None) -> tuple[int, bool]:
+    """等待子进程结束；超时则 kill 掉并返回 (status, True)。"""
+    if hasattr(os, "pidfd_open"):
+        try:
+            pidfd = os.pidfd_open(pid)
+        except OSError:
+            # 内核不支持 pidfd（Linux < 5.3）时退回轮询
+            pass
+        else:
+            try:
+                ready, _, _ = select.select([pidfd], [], [], timeout)
+            finally:
+                os.close(pidfd)
+            if not ready:
+                os.kill(pid, signal.SIGKILL)
+            _, status = os.waitpid(pid, 0)
+            return status, not ready
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    attempt = 0
+    while True:
+        done, status = os.waitpid(pid, os.WNOHANG)
+        if done:
+            return status, False
+        if deadline is not None and time.monotonic() >= deadline:
+            os.kill(pid, signal.SIGKILL)
+            _, status = os.waitpid(pid, 0)
+            return status, True
+        # 短代码通常几毫秒内结束，先密集轮询再逐步放宽间隔
+        time.sleep(_POLL_INTERVALS[min(attempt, len(_POLL_INTERVALS) - 1)])
+        attempt += 1
+
+
+def _child(
+    code: str,
+    out_fd: int,
+    err_fd: int,
+    cpu_time_limit: int | None,
+    memory_limit: int | None,
+) -> None:
+    exit_code = 0
+    try:
+        # stdin 是与 worker 通信的管道，不能让用户代码（及其子进程）读到
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.close(devnull)
+        os.dup2(out_fd, 1)
+        os.dup2(err_fd, 2)
+        sys.stdin = open(0, encoding="utf-8", closefd=False)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        if resource is not None:
+            if cpu_time_limit:
+                resource.setrlimit(resource.RLIMIT_CPU, (cpu_time_limit, cpu_time_limit))
+            if memory_limit:
+                resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+        filename = "<tool_code>"
+        # 登记源码，异常堆栈中才能显示出错的代码行
+        linecache.cache[filename] = (len(code), None, code.splitlines(True), filename)
+        namespace = {"__name__": "__main__", "__builtins__": builtins}
+        exec(compile(code, filename, "exec"), namespace)
+    except SystemExit as e:
+        if e.code is None:
+            exit_code = 0
+        elif isinstance(e.code, int):
+            exit_code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            exit_code = 1
+    except BaseException as e:
+        # 去掉 worker 自身的栈帧，与直接运行脚本时的输出保持一致
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        exit_code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""幂等工具的结果缓存：参数和相关文件都没变时直接返回上次的结果。"""
+import copy
+import functools
+import hashlib
+import inspect
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Iterable
+
+from agentscope.tool import ToolResponse
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class ToolResultCache:
+    """按估算字节数限制容量的工具结果 LRU 缓存，线程安全。
+
+    Args:
+        max_bytes (int, optional): 缓存结果的总大小上限（按文本长度估算）
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[ToolResponse, int]] = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> ToolResponse | None:
+        """查找缓存，命中时返回结果的深拷贝。"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(entry[0])
+
+    def put(self, key: str, response: ToolResponse) -> None:
+        """写入缓存；超过容量上限的单个结果不缓存。"""
+        size = _estimate_size(response)
+        if size > self.max_bytes:
+            return
+        response = copy.deepcopy(response)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old[1]
+            self._entries[key] = (response, size)
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+
+_default_cache = ToolResultCache()
+
+
+def get_default_tool_cache() -> ToolResultCache:
+    """获取所有幂等工具默认共用的结果缓存。"""
+    return _default_cache
+
+
+def idempotent_tool(
+    func: Callable[..., Any] | None = None,
+    *,
+    path_args: Iterable[str] = ("file_path",),
+    cache: ToolResultCache | None = None,
+) -> Callable[..., Any]:
+    """把工具函数声明为幂等的，相同调用直接返回缓存的结果。
+
+    缓存键由工具名、全部参数（含默认值）以及 `path_args` 指定的各个路径参数
+    所指文件的绝对路径、`mtime_ns` 和大小组成。文件被修改、替换或删除后
+    键随之变化，旧结果自然失效，不需要手动清理。流式或被中断的结果不缓存。
+
+    只应用于结果完全由参数和这些文件决定、且没有副作用的工具，例如
+    `view_text_file`。包装后的函数保留原函数的签名和 docstring，可以直接
+    注册到 `Toolkit`。可以直接调用 `idempotent_tool(view_text_file)`，
+    也可以作为装饰器 `@idempotent_tool(path_args=("path",))` 使用。
+
+    Args:
+        func (Callable[..., Any] | None, optional): 工具函数（同步或异步）
+        path_args (Iterable[str], optional): 表示文件路径的参数名
+        cache (ToolResultCache | None, optional): 结果缓存，默认使用所有工具共用的缓存
+
+    Returns:
+        Callable[..., Any]: 带缓存的工具函数
+    """
+    path_args = tuple(path_args)
+
+    def decorate(tool_func: Callable[..., Any]) -> Callable[..., Any]:
+        if inspect.isasyncgenfunction(tool_func) or inspect.isgeneratorfunction(tool_func):
+            raise TypeError(f"流式工具 {tool_func.__name__} 不能使用结果缓存")
+        signature = inspect.signature(tool_func)
+        result_cache = cache or _default_cache
+
+        def make_key(args: tuple, kwargs: dict) -> str:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            files = {
+                name: _file_state(bound.arguments[name])
+                for name in path_args
+                if isinstance(bound.arguments.get(name), str)
+            }
+            raw = json.dumps(
+                {
+                    "tool": f"{tool_func.__module__}.{tool_func.__qualname__}",
+                    "args": bound.arguments,
+                    "files": files,
+                },
+                sort_keys=True,
+                ensure_ascii=False,
+                default=repr,
+            )
+            return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+        def cacheable(response: Any) -> bool:
+            return (
+                isinstance(response, ToolResponse)
+                and not response.stream
+                and not response.is_interrupted
+            )
+
+        if inspect.iscoroutinefunction(tool_func):
+
+            @functools.wraps(tool_func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> ToolResponse:
+                key = make_key(args, kwargs)
+                response = result_cache.get(key)
+                if response is None:
+                    response = await tool_func(*args, **kwargs)
+                    if cacheable(response):
+                        result_cache.put(key, response)
+                return response
+
+            return async_wrapper
+
+        @functools.wraps(tool_func)
+        def wrapper(*args: Any, **kwargs: Any) -> ToolResponse:
+            key = make_key(args, kwargs)
+            response = result_cache.get(key)
+            if response is None:
+                response = tool_func(*args, **kwargs)
+                if cacheable(response):
+                    result_cache.put(key, response)
+            return response
+
+        return wrapper
+
+    if func is not None:
+        return decorate(func)
+    return decorate
+
+
+def _file_state(path: str) -> tuple[str, int, int] | str:
+    abs_path = os.path.abspath(os.path.expanduser(path))
+    try:
+        stat = os.stat(abs_path)
+    except OSError:
+        return abs_path
+    return abs_path, stat.st_mtime_ns, stat.st_size
+
+
+def _estimate_size(response: ToolResponse) -> int:
+    size = 0
+    for block in response.content:
+        if block.get("type") == "text":
+            size += len(block.get("text", ""))
+        else:
+            source = block.get("source", {})
+            size += len(source.get("data", "") or source.get("url", ""))
+    return size
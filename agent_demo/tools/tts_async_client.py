@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+"""基于 httpx 的异步 GPT-SoVITS 客户端，不阻塞事件循环。"""
+import asyncio
+import time
+from typing import Any, AsyncGenerator
+
+import httpx
+
+from .tts_balancer import get_backend_pool
+from .tts_cache import AudioCache, make_cache_key
+from .tts_client import (
+    DEFAULT_HEDGE_DELAY,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_TIMEOUT,
+    get_default_client,
+)
+from .tts_resilience import (
+    CircuitBreakerRegistry,
+    CircuitOpenError,
+    RetryPolicy,
+    is_backend_failure,
+    is_transient_error,
+)
+
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+class AsyncGPTSoVITSClient:
+    """异步版本的 GPT-SoVITS 客户端。
+
+    - 连接池：内部持有一个 `httpx.AsyncClient`，请求之间复用 keep-alive 连接
+    - 并发限制：同一时刻最多 `max_concurrency` 个合成请求在途，多余的请求排队，
+      避免把单个 GPT-SoVITS 实例压垮
+    - 取消：合成过程中任务被取消时，`asyncio.CancelledError` 会立即中断等待并
+      关闭底层连接，不会写入半截缓存
+
+    - 容错：与同步客户端相同的负载均衡、退避重试、熔断和对冲请求，
+      对冲时落后的请求会被取消
+
+    `httpx.AsyncClient` 与创建它的事件循环绑定，因此客户端会在检测到事件循环
+    变化（例如多次 `asyncio.run`）时自动重建连接池；旧的连接池在它的事件循环
+    通过 `asyncio.run` 结束时自动关闭。
+
+    Args:
+        cache (AudioCache | None, optional): 音频缓存，为 None 时不使用缓存
+        max_concurrency (int, optional): 最大并发合成请求数
+        pool_size (int, optional): 连接池最大连接数
+        timeout (float, optional): 单次请求超时时间（秒）
+        retry_policy (RetryPolicy | None, optional): 重试策略，默认最多尝试 3 次
+        failure_threshold (int, optional): 触发熔断的连续失败次数，<= 0 时不熔断
+        recovery_timeout (float, optional): 熔断后多久放行探测请求（秒）
+        hedge_url (str | None, optional): 对冲请求使用的备用后端地址
+        hedge_delay (float, optional): 主后端多久未返回时发出对冲请求（秒）
+    """
+
+    def __init__(
+        self,
+        cache: AudioCache | None = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+        retry_policy: RetryPolicy | None = None,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        hedge_url: str | None = None,
+        hedge_delay: float = DEFAULT_HEDGE_DELAY,
+    ) -> None:
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breakers = CircuitBreakerRegistry(failure_threshold, recovery_timeout)
+        self.hedge_url = hedge_url
+        self.hedge_delay = hedge_delay
+        self._http: httpx.AsyncClient | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._closer: AsyncGenerator[None, None] | None = None
+
+    def _ensure_loop_resources(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._http is not None:
+            return
+        self._loop = loop
+        self._http = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size,
+            ),
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        # 连接池只能在创建它的事件循环中关闭，循环结束后再关闭会失败并泄漏连接。
+        # 登记一个异步生成器：asyncio.run 退出前会依次关闭所有异步生成器，
+        # 连接池随之关闭
+        self._closer = _close_with_loop(self._http)
+        asyncio.ensure_future(self._closer.__anext__())
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """当前事件循环下的 `httpx.AsyncClient`。"""
+        self._ensure_loop_resources()
+        return self._http
+
+    async def synthesize(
+        self,
+        api_url: str,
+        payload: dict[str, Any],
+        use_cache: bool = True,
+    ) -> bytes:
+        """异步调用 `/tts` 合成音频，命中缓存时直接返回缓存数据。
+
+        Args:
+            api_url (str): GPT-SoVITS API 地址
+            payload (dict[str, Any]): 请求体
+            use_cache (bool, optional): 是否读写缓存
+
+        Returns:
+            bytes: WAV 音频数据
+
+        Raises:
+            httpx.HTTPError: 请求失败或返回非 2xx 状态码
+        """
+        key = None
+        if use_cache and self.cache is not None:
+            key = make_cache_key(payload)
+            # 读文件放到线程池里，避免磁盘 IO 阻塞事件循环
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                return cached
+
+        self._ensure_loop_resources()
+        async with self._semaphore:
+            audio_data = await self._fetch_audio(api_url, payload)
+
+        if key is not None:
+            await asyncio.to_thread(self.cache.put, key, audio_data)
+        return audio_data
+
+    async def synthesize_many(
+        self,
+        api_url: str,
+        payloads: list[dict[str, Any]],
+        use_cache: bool = True,
+    ) -> list[bytes]:
+        """并发合成多个请求，结果顺序与 `payloads` 一致。
+
+        并发度受客户端的 `max_concurrency` 限制；任一片段失败时取消其余片段。
+
+        Args:
+            api_url (str): GPT-SoVITS API 地址
+            payloads (list[dict[str, Any]]): 请求体列表
+            use_cache (bool, optional): 是否读写缓存
+
+        Returns:
+            list[bytes]: 与 `payloads` 一一对应的 WAV 音频数据
+
+        Raises:
+            httpx.HTTPError: 任一片段请求失败
+        """
+        tasks = [
+            asyncio.ensure_future(self.synthesize(api_url, p, use_cache=use_cache))
+            for p in payloads
+        ]
+        try:
+            return list(await asyncio.gather(*tasks))
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def aclose(self) -> None:
+        """关闭连接池。"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+            self._loop = None
+
+    async def _fetch_audio(self, api_url: str, payload: dict[str, Any]) -> bytes:
+        """请求音频数据，按配置对冲到备用后端。
+
+        调用方被取消或提前返回时，仍在进行的请求都会被取消。
+        """
+        if not self.hedge_url or self.hedge_url == api_url:
+            return await self._post(api_url, payload)
+
+        primary = asyncio.ensure_future(self._post(api_url, payload))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self.hedge_delay)
+            if done:
+                error = primary.exception()
+                if error is None:
+                    return primary.result()
+                if not is_backend_failure(error):
+                    raise error
+                # 主后端在对冲延迟内就不可用（超时、5xx 或已熔断），直接改用备用后端
+                return await self._post(self.hedge_url, payload)
+
+            tasks.append(asyncio.ensure_future(self._post(self.hedge_url, payload)))
+            pending = set(tasks)
+            first_error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        return task.result()
+                    if not is_backend_failure(error):
+                        # 请求本身有误，另一个后端也会失败，不必再等
+                        raise error
+                    first_error = first_error or error
+            raise first_error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _post(self, api_url: str, payload: dict[str, Any]) -> bytes:
+        """带负载均衡、重试和熔断的 `/tts` 请求，返回音频数据。"""
+        pool = get_backend_pool(api_url)
+        delays = self.retry_policy.delays()
+        failed: set[str] = set()
+        while True:
+            url = pool.choose(exclude=failed, available=self.breakers.allows)
+            if url is None:
+                failed.clear()
+                url = pool.choose(available=self.breakers.allows)
+            pool.begin(url)
+            start = time.monotonic()
+            try:
+                audio_data = await self._post_once(url, payload)
+            except asyncio.CancelledError:
+                pool.end(url)
+                raise
+            except Exception as e:
+                transient = is_transient_error(e)
+                pool.end(url, failed=transient or isinstance(e, CircuitOpenError))
+                if not transient and not isinstance(e, CircuitOpenError):
+                    raise
+                failed.add(url)
+                has_fallback = len(failed) < len(pool)
+                if isinstance(e, CircuitOpenError):
+                    if has_fallback:
+                        continue
+                    raise
+                delay = next(delays, None)
+                if delay is None:
+                    raise
+                if not has_fallback:
+                    await asyncio.sleep(delay)
+                continue
+            pool.end(url, latency=time.monotonic() - start)
+            return audio_data
+
+    async def _post_once(self, api_url: str, payload: dict[str, Any]) -> bytes:
+        breaker = self.breakers.get(api_url)
+        if breaker is not None:
+            breaker.before_request()
+        try:
+            response = await self._http.post(f"{api_url}/tts", json=payload)
+            response.raise_for_status()
+        except BaseException as e:
+            if breaker is not None:
+                if is_transient_error(e):
+                    breaker.record_failure()
+                elif isinstance(e, Exception):
+                    breaker.record_success()
+                else:
+                    breaker.release()
+            raise
+        if breaker is not None:
+            breaker.record_success()
+        return response.content
+
+
+async def _close_with_loop(http: httpx.AsyncClient) -> AsyncGenerator[None, None]:
+    """事件循环关闭异步生成器（`shutdown_asyncgens`）时关闭连接池。"""
+    try:
+        yield
+    finally:
+        await http.aclose()
+
+
+_default_async_client: AsyncGPTSoVITSClient | None = None
+
+
+def get_default_async_client() -> AsyncGPTSoVITSClient:
+    """获取进程内共享的默认异步客户端，与同步客户端共用同一个磁盘缓存。"""
+    global _default_async_client
+    if _default_async_client is None:
+        _default_async_client = AsyncGPTSoVITSClient(cache=get_default_client().cache)
+    return _default_async_client
+
+
+def set_default_async_client(client: AsyncGPTSoVITSClient) -> None:
+    """替换默认异步客户端，例如修改并发上限或缓存配置。"""
+    global _default_async_client
+    _default_async_client = client
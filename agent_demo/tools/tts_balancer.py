@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""多个 GPT-SoVITS 实例之间的负载均衡。"""
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Literal
+
+import requests
+
+Strategy = Literal["least_outstanding", "ewma"]
+
+
+@dataclass
+class Backend:
+    """一个 GPT-SoVITS 实例的运行状态。
+
+    Attributes:
+        url (str): 实例地址
+        weight (float): 路由权重，权重越大分到的请求越多
+        outstanding (int): 当前在途请求数
+        ewma_latency (float | None): 请求耗时的指数加权移动平均（秒），未测量时为 None
+        unhealthy_until (float): 在此时刻（monotonic）之前视为不健康
+    """
+
+    url: str
+    weight: float = 1.0
+    outstanding: int = 0
+    ewma_latency: float | None = None
+    unhealthy_until: float = 0.0
+
+    def is_healthy(self, now: float) -> bool:
+        return now >= self.unhealthy_until
+
+
+class BackendPool:
+    """GPT-SoVITS 实例池，为每个请求挑选负载最低的实例。
+
+    路由策略：
+    - "least_outstanding"：选 `(在途请求数 + 1) / 权重` 最小的实例
+    - "ewma"：在上式基础上再乘以耗时的 EWMA，同时考虑排队和实例快慢；
+      尚未测量过耗时的实例优先被选中，以便尽快获得测量值
+
+    请求失败的实例会被标记为不健康 `failure_cooldown` 秒，期间不参与路由
+    （所有实例都不健康时仍会尝试，避免完全不可用）。配置了
+    `health_check_interval` 时，后台线程定期请求各实例的 `health_path`，
+    恢复响应的实例立即重新参与路由。
+
+    Args:
+        backends (list[str] | dict[str, float]): 实例地址列表，或地址到权重的映射
+        strategy (Strategy, optional): 路由策略
+        ewma_alpha (float, optional): EWMA 的平滑系数，越大越看重最近的请求
+        failure_cooldown (float, optional): 请求失败后实例被摘除的时长（秒）
+        health_check_interval (float | None, optional): 健康检查间隔（秒），None 表示不检查
+        health_path (str, optional): 健康检查请求的路径，返回非 5xx 即视为健康
+    """
+
+    def __init__(
+        self,
+        backends: list[str] | dict[str, float],
+        strategy: Strategy = "least_outstanding",
+        ewma_alpha: float = 0.3,
+        failure_cooldown: float = 10.0,
+        health_check_interval: float | None = None,
+        health_path: str = "/docs",
+    ) -> None:
+        if isinstance(backends, dict):
+            items = list(backends.items())
+        else:
+            items = [(url, 1.0) for url in backends]
+        if not items:
+            raise ValueError("BackendPool 至少需要一个后端地址")
+        self.backends = {
+            url.rstrip("/"): Backend(url=url.rstrip("/"), weight=weight)
+            for url, weight in items
+        }
+        self.strategy = strategy
+        self.ewma_alpha = ewma_alpha
+        self.failure_cooldown = failure_cooldown
+        self.health_check_interval = health_check_interval
+        self.health_path = health_path
+        self._lock = threading.Lock()
+        self._health_thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+
+    def __len__(self) -> int:
+        return len(self.backends)
+
+    def choose(
+        self,
+        exclude: set[str] | frozenset[str] = frozenset(),
+        available: Callable[[str], bool] | None = None,
+    ) -> str | None:
+        """挑选一个实例地址。
+
+        Args:
+            exclude (set[str], optional): 本次不考虑的实例（例如刚刚失败过的）
+            available (Callable[[str], bool] | None, optional):
+                额外的可用性判断，例如熔断器是否打开
+
+        Returns:
+            str | None: 选中的实例地址；`exclude` 排除了全部实例时返回 None
+        """
+        self._ensure_health_checks()
+        now = time.monotonic()
+        with self._lock:
+            candidates = [b for b in self.backends.values() if b.url not in exclude]
+            if not candidates:
+                return None
+            usable = [
+                b for b in candidates
+                if b.is_healthy(now) and (available is None or available(b.url))
+            ]
+            pool = usable or candidates
+            scores = [self._score(b) for b in pool]
+            best = min(scores)
+            return random.choice([b for b, s in zip(pool, scores) if s == best]).url
+
+    def begin(self, url: str) -> None:
+        """记录一个请求开始。"""
+        with self._lock:
+            self.backends[url].outstanding += 1
+
+    def end(self, url: str, latency: float | None = None, failed: bool = False) -> None:
+        """记录一个请求结束，成功时更新耗时 EWMA，失败时暂时摘除实例。"""
+        with self._lock:
+            backend = self.backends[url]
+            backend.outstanding = max(0, backend.outstanding - 1)
+            if failed:
+                backend.unhealthy_until = time.monotonic() + self.failure_cooldown
+            elif latency is not None:
+                if backend.ewma_latency is None:
+                    backend.ewma_latency = latency
+                else:
+                    backend.ewma_latency += self.ewma_alpha * (latency - backend.ewma_latency)
+
+    def check_health(self) -> None:
+        """对所有实例做一次健康检查。"""
+        for url in list(self.backends):
+            try:
+                healthy = requests.get(f"{url}{self.health_path}", timeout=2).status_code < 500
+            except requests.exceptions.RequestException:
+                healthy = False
+            with self._lock:
+                backend = self.backends[url]
+                if healthy:
+                    backend.unhealthy_until = 0.0
+                else:
+                    backend.unhealthy_until = time.monotonic() + self.failure_cooldown
+
+    def close(self) -> None:
+        """停止后台健康检查。"""
+        self._stop_event.set()
+
+    def _score(self, backend: Backend) -> float:
+        load = (backend.outstanding + 1) / backend.weight
+        if self.strategy == "ewma":
+            if backend.ewma_latency is None:
+                return 0.0
+            return load * backend.ewma_latency
+        return load
+
+    def _ensure_health_checks(self) -> None:
+        if self.health_check_interval is None or self._health_thread is not None:
+            return
+        with self._lock:
+            if self._health_thread is not None:
+                return
+            self._health_thread = threading.Thread(
+                target=self._health_loop,
+                name="tts-health-check",
+                daemon=True,
+            )
+            self._health_thread.start()
+
+    def _health_loop(self) -> None:
+        while not self._stop_event.wait(self.health_check_interval):
+            self.check_health()
+
+
+_pools: dict[str, BackendPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_backend_pool(api_url: str) -> BackendPool:
+    """根据工具参数 `api_url` 获取实例池。
+
+    `api_url` 可以是单个地址，也可以是逗号分隔的多个地址（此时自动开启
+    每 10 秒一次的健康检查）。通过 `register_backend_pool` 注册过的名字或地址
+    优先使用注册的实例池，便于配置权重和路由策略。
+    """
+    with _pools_lock:
+        pool = _pools.get(api_url)
+        if pool is None:
+            urls = [url.strip() for url in api_url.split(",") if url.strip()]
+            pool = BackendPool(
+                urls,
+                health_check_interval=10.0 if len(urls) > 1 else None,
+            )
+            _pools[api_url] = pool
+        return pool
+
+
+def register_backend_pool(name: str, pool: BackendPool) -> None:
+    """注册一个实例池，之后以 `name` 作为工具的 `api_url` 即可使用它。"""
+    with _pools_lock:
+        old_pool = _pools.get(name)
+        _pools[name] = pool
+    if old_pool is not None and old_pool is not pool:
+        old_pool.close()
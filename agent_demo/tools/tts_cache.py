@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""GPT-SoVITS 合成结果的磁盘缓存（按内容寻址，LRU + 容量上限淘汰）。"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator
+
+from .tts_reference import get_default_registry
+
+DEFAULT_CACHE_DIR = Path(
+    os.environ.get(
+        "GPT_SOVITS_CACHE_DIR",
+        Path.home() / ".cache" / "agent_demo" / "tts",
+    )
+)
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def make_cache_key(payload: dict[str, Any]) -> str:
+    """根据请求参数计算缓存键。
+
+    参数按键排序后序列化再做 sha256，因此同一组
+    (text, ref_audio_path, prompt_text, 合成参数) 总是得到同一个键。
+    如果参考音频在本机可访问，还会把它的内容指纹（由参考音频登记表计算，
+    文件未改动时不会重复哈希）计入键中，替换参考音频后旧的缓存自然失效。
+
+    Args:
+        payload (dict[str, Any]): 发送给 `/tts` 的请求体
+
+    Returns:
+        str: 64 位十六进制摘要
+    """
+    material = dict(payload)
+    reference = get_default_registry().resolve(payload.get("ref_audio_path", ""))
+    if reference is not None:
+        material["_ref_fingerprint"] = reference.fingerprint
+    raw = json.dumps(material, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """按内容寻址的音频文件缓存。
+
+    每条缓存以 `<cache_dir>/<key[:2]>/<key>.wav` 的形式保存。内存里维护一份
+    按最近使用时间排序的索引，命中时刷新文件 mtime，因此进程重启后仍能
+    恢复 LRU 顺序。总大小超过 `max_bytes` 时从最久未使用的条目开始删除。
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | os.PathLike = DEFAULT_CACHE_DIR,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: OrderedDict[str, int] | None = None
+        self._total_bytes = 0
+
+    def path_for(self, key: str) -> Path:
+        """返回缓存键对应的文件路径（文件不一定存在）。"""
+        return self.cache_dir / key[:2] / f"{key}.wav"
+
+    def get(self, key: str) -> bytes | None:
+        """读取缓存的音频数据，未命中返回 None。"""
+        path = self.lookup(key)
+        if path is None:
+            return None
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            self._forget(key)
+            return None
+
+    def lookup(self, key: str) -> Path | None:
+        """查找缓存文件并标记为最近使用，未命中返回 None。"""
+        with self._lock:
+            index = self._load_index()
+            if key not in index:
+                return None
+            index.move_to_end(key)
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self._forget(key)
+            return None
+        return path
+
+    def put(self, key: str, data: bytes) -> Path:
+        """写入一条缓存并按需淘汰旧条目，返回缓存文件路径。"""
+        with self.writer(key) as f:
+            f.write(data)
+        return self.path_for(key)
+
+    @contextmanager
+    def writer(self, key: str) -> Iterator[BinaryIO]:
+        """以流的方式写入一条缓存。
+
+        数据先写入同目录下的临时文件，`with` 块正常结束后才原子替换为正式
+        缓存文件；块内抛出异常（例如流式下载中途断开）时丢弃临时文件，
+        不会留下半截缓存。
+        """
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                yield f
+                size = f.tell()
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self._record(key, size)
+
+    def clear(self) -> None:
+        """删除全部缓存文件。"""
+        with self._lock:
+            index = self._load_index()
+            for key in list(index):
+                self.path_for(key).unlink(missing_ok=True)
+            index.clear()
+            self._total_bytes = 0
+
+    @property
+    def total_bytes(self) -> int:
+        """当前缓存占用的字节数。"""
+        with self._lock:
+            self._load_index()
+            return self._total_bytes
+
+    def _load_index(self) -> OrderedDict[str, int]:
+        """首次访问时扫描缓存目录，按 mtime 重建 LRU 索引（需持有锁）。"""
+        if self._index is not None:
+            return self._index
+        entries = []
+        if self.cache_dir.is_dir():
+            for path in self.cache_dir.glob("*/*.wav"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, path.stem, stat.st_size))
+        entries.sort()
+        self._index = OrderedDict((key, size) for _, key, size in entries)
+        self._total_bytes = sum(self._index.values())
+        return self._index
+
+    def _record(self, key: str, size: int) -> None:
+        with self._lock:
+            index = self._load_index()
+            self._total_bytes += size - index.pop(key, 0)
+            index[key] = size
+            while self._total_bytes > self.max_bytes and len(index) > 1:
+                old_key, old_size = index.popitem(last=False)
+                self.path_for(old_key).unlink(missing_ok=True)
+                self._total_bytes -= old_size
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            index = self._load_index()
+            self._total_bytes -= index.pop(key, 0)
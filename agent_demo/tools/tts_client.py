@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""GPT-SoVITS HTTP 客户端：复用连接池并接入磁盘缓存。"""
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Iterator
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .tts_balancer import get_backend_pool
+from .tts_cache import AudioCache, make_cache_key
+from .tts_resilience import (
+    CircuitBreakerRegistry,
+    CircuitOpenError,
+    RetryPolicy,
+    is_backend_failure,
+    is_transient_error,
+)
+
+DEFAULT_TIMEOUT = 60
+DEFAULT_POOL_SIZE = 16
+DEFAULT_CHUNK_SIZE = 32 * 1024
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_HEDGE_DELAY = 2.0
+
+
+class GPTSoVITSClient:
+    """带 keep-alive 连接池和合成结果缓存的 GPT-SoVITS 客户端。
+
+    同一个客户端内所有请求共用一个 `requests.Session`，底层连接在请求之间
+    保持复用，省去每次合成都要重新建立 TCP 连接的开销。
+
+    `api_url` 可以是逗号分隔的多个地址或已注册的实例池名字（见 `tts_balancer`），
+    每次请求（包括每次重试）都由实例池挑选当前负载最低的实例，失败时优先
+    换到其他实例重试。
+
+    后端出现临时故障（连接失败、超时、5xx、429）时按 `retry_policy` 退避重试；
+    同一后端连续失败达到 `failure_threshold` 次后熔断，熔断期间直接失败，
+    不再占用连接和等待超时。配置了 `hedge_url` 时，主后端超过 `hedge_delay`
+    秒仍未返回（或已熔断）就向备用后端发出同样的请求，采用先成功的结果。
+
+    Args:
+        cache (AudioCache | None, optional): 音频缓存，为 None 时不使用缓存
+        pool_size (int, optional): 每个后端地址保留的最大连接数
+        timeout (float, optional): 单次请求超时时间（秒）
+        retry_policy (RetryPolicy | None, optional): 重试策略，默认最多尝试 3 次
+        failure_threshold (int, optional): 触发熔断的连续失败次数，<= 0 时不熔断
+        recovery_timeout (float, optional): 熔断后多久放行探测请求（秒）
+        hedge_url (str | None, optional): 对冲请求使用的备用后端地址
+        hedge_delay (float, optional): 主后端多久未返回时发出对冲请求（秒）
+    """
+
+    def __init__(
+        self,
+        cache: AudioCache | None = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+        retry_policy: RetryPolicy | None = None,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        hedge_url: str | None = None,
+        hedge_delay: float = DEFAULT_HEDGE_DELAY,
+    ) -> None:
+        self.cache = cache
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breakers = CircuitBreakerRegistry(failure_threshold, recovery_timeout)
+        self.hedge_url = hedge_url
+        self.hedge_delay = hedge_delay
+        self._session: requests.Session | None = None
+        self._hedge_executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """懒加载的共享会话。"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=self.pool_size,
+                        pool_maxsize=self.pool_size,
+                    )
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._session = session
+        return self._session
+
+    def synthesize(
+        self,
+        api_url: str,
+        payload: dict[str, Any],
+        use_cache: bool = True,
+    ) -> bytes:
+        """调用 `/tts` 合成音频，命中缓存时直接返回缓存数据。
+
+        Args:
+            api_url (str): GPT-SoVITS API 地址
+            payload (dict[str, Any]): 请求体
+            use_cache (bool, optional): 是否读写缓存
+
+        Returns:
+            bytes: WAV 音频数据
+
+        Raises:
+            requests.exceptions.RequestException: 请求失败或返回非 2xx 状态码
+        """
+        key = None
+        if use_cache and self.cache is not None:
+            key = make_cache_key(payload)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        audio_data = self._fetch_audio(api_url, payload)
+
+        if key is not None:
+            self.cache.put(key, audio_data)
+        return audio_data
+
+    def synthesize_many(
+        self,
+        api_url: str,
+        payloads: list[dict[str, Any]],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        use_cache: bool = True,
+    ) -> list[bytes]:
+        """并发合成多个请求，结果顺序与 `payloads` 一致。
+
+        请求在最多 `max_workers` 个线程中并发执行，共享同一个连接池；
+        每个片段各自读写缓存，重复出现的句子只合成一次。
+
+        Args:
+            api_url (str): GPT-SoVITS API 地址
+            payloads (list[dict[str, Any]]): 请求体列表
+            max_workers (int, optional): 最大并发请求数
+            use_cache (bool, optional): 是否读写缓存
+
+        Returns:
+            list[bytes]: 与 `payloads` 一一对应的 WAV 音频数据
+
+        Raises:
+            requests.exceptions.RequestException: 任一片段请求失败
+        """
+        if len(payloads) <= 1 or max_workers <= 1:
+            return [self.synthesize(api_url, p, use_cache=use_cache) for p in payloads]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(payloads))) as executor:
+            return list(
+                executor.map(
+                    lambda p: self.synthesize(api_url, p, use_cache=use_cache),
+                    payloads,
+                )
+            )
+
+    def synthesize_stream(
+        self,
+        api_url: str,
+        payload: dict[str, Any],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        use_cache: bool = True,
+    ) -> Iterator[bytes]:
+        """以流式模式调用 `/tts`，边接收边产出音频分块。
+
+        请求体会附加 `streaming_mode=True`，服务端生成一段就返回一段。
+        命中缓存时按 `chunk_size` 从缓存文件分块读取；未命中时在转发分块的
+        同时写入缓存，完整接收后才生效。
+
+        Args:
+            api_url (str): GPT-SoVITS API 地址
+            payload (dict[str, Any]): 请求体
+            chunk_size (int, optional): 每个分块的最大字节数
+            use_cache (bool, optional): 是否读写缓存
+
+        Yields:
+            bytes: 音频分块，第一个分块包含 WAV 头
+
+        Raises:
+            requests.exceptions.RequestException: 请求失败或返回非 2xx 状态码
+        """
+        payload = {**payload, "streaming_mode": True}
+        key = None
+        if use_cache and self.cache is not None:
+            key = make_cache_key(payload)
+            path = self.cache.lookup(key)
+            if path is not None:
+                with open(path, "rb") as f:
+                    while chunk := f.read(chunk_size):
+                        yield chunk
+                return
+
+        # 只对建立连接、拿到响应头的阶段重试；开始产出分块后不再重放请求
+        with self._post(api_url, payload, stream=True) as response:
+            chunks = response.iter_content(chunk_size=chunk_size)
+            if key is None:
+                yield from chunks
+                return
+            with self.cache.writer(key) as cache_file:
+                for chunk in chunks:
+                    cache_file.write(chunk)
+                    yield chunk
+
+    def close(self) -> None:
+        """关闭连接池。"""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+            if self._hedge_executor is not None:
+                self._hedge_executor.shutdown(wait=False)
+                self._hedge_executor = None
+
+    def _fetch_audio(self, api_url: str, payload: dict[str, Any]) -> bytes:
+        """请求音频数据，按配置对冲到备用后端。"""
+        if not self.hedge_url or self.hedge_url == api_url:
+            return self._post(api_url, payload).content
+
+        executor = self._get_hedge_executor()
+        primary = executor.submit(lambda: self._post(api_url, payload).content)
+        try:
+            return primary.result(timeout=self.hedge_delay)
+        except FutureTimeoutError:
+            pass
+        except Exception as e:
+            if not is_backend_failure(e):
+                raise
+            # 主后端在对冲延迟内就不可用（超时、5xx 或已熔断），直接改用备用后端
+            return self._post(self.hedge_url, payload).content
+
+        hedge = executor.submit(lambda: self._post(self.hedge_url, payload).content)
+        pending = {primary, hedge}
+        first_error: BaseException | None = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    # 落后的请求无法中断，让它在后台完成并被丢弃
+                    return future.result()
+                if not is_backend_failure(error):
+                    # 请求本身有误，另一个后端也会失败，不必再等
+                    raise error
+                first_error = first_error or error
+        raise first_error
+
+    def _post(
+        self,
+        api_url: str,
+        payload: dict[str, Any],
+        stream: bool = False,
+    ) -> requests.Response:
+        """带负载均衡、重试和熔断的 `/tts` 请求，返回状态码为 2xx 的响应。"""
+        pool = get_backend_pool(api_url)
+        delays = self.retry_policy.delays()
+        failed: set[str] = set()
+        while True:
+            url = pool.choose(exclude=failed, available=self.breakers.allows)
+            if url is None:
+                # 所有实例都已失败过一次，重新在全部实例中挑选
+                failed.clear()
+                url = pool.choose(available=self.breakers.allows)
+            pool.begin(url)
+            start = time.monotonic()
+            try:
+                response = self._post_once(url, payload, stream)
+            except Exception as e:
+                transient = is_transient_error(e)
+                pool.end(url, failed=transient or isinstance(e, CircuitOpenError))
+                if not transient and not isinstance(e, CircuitOpenError):
+                    raise
+                failed.add(url)
+                has_fallback = len(failed) < len(pool)
+                if isinstance(e, CircuitOpenError):
+                    # 熔断不消耗重试次数，有其他实例时立即切换
+                    if has_fallback:
+                        continue
+                    raise
+                delay = next(delays, None)
+                if delay is None:
+                    raise
+                if not has_fallback:
+                    time.sleep(delay)
+                continue
+            except BaseException:
+                pool.end(url)
+                raise
+            pool.end(url, latency=time.monotonic() - start)
+            return response
+
+    def _post_once(
+        self,
+        api_url: str,
+        payload: dict[str, Any],
+        stream: bool,
+    ) -> requests.Response:
+        breaker = self.breakers.get(api_url)
+        if breaker is not None:
+            breaker.before_request()
+        try:
+            response = self.session.post(
+                f"{api_url}/tts",
+                json=payload,
+                timeout=self.timeout,
+                stream=stream,
+            )
+            response.raise_for_status()
+        except BaseException as e:
+            if breaker is not None:
+                if is_transient_error(e):
+                    breaker.record_failure()
+                elif isinstance(e, Exception):
+                    breaker.record_success()
+                else:
+                    breaker.release()
+            raise
+        if breaker is not None:
+            breaker.record_success()
+        return response
+
+    def _get_hedge_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(
+                    max_workers=self.pool_size * 2,
+                    thread_name_prefix="tts-hedge",
+                )
+            return self._hedge_executor
+
+
+_default_client: GPTSoVITSClient | None = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> GPTSoVITSClient:
+    """获取进程内共享的默认客户端（默认启用磁盘缓存）。"""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = GPTSoVITSClient(cache=AudioCache())
+    return _default_client
+
+
+def set_default_client(client: GPTSoVITSClient) -> None:
+    """替换默认客户端，例如修改缓存目录、容量或连接池大小。"""
+    global _default_client
+    with _default_client_lock:
+        old_client, _default_client = _default_client, client
+    if old_client is not None and old_client is not client:
+        old_client.close()
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""参考音频登记表：对声音克隆用的参考音频只做一次指纹计算和校验。"""
+import hashlib
+import os
+import threading
+import wave
+from dataclasses import dataclass
+
+# GPT-SoVITS 要求参考音频时长在 3~10 秒之间，超出范围会直接返回 400
+MIN_DURATION = 3.0
+MAX_DURATION = 10.0
+
+
+@dataclass(frozen=True)
+class ReferenceAudio:
+    """一条已登记的参考音频。
+
+    Attributes:
+        path (str): 发送给 GPT-SoVITS 的路径（规范化后的绝对路径）
+        fingerprint (str): 文件内容的 sha256 摘要
+        duration (float | None): 音频时长（秒），非 WAV 格式不解析时长，为 None
+        mtime_ns (int): 登记时的文件修改时间
+        size (int): 登记时的文件大小
+    """
+
+    path: str
+    fingerprint: str
+    duration: float | None
+    mtime_ns: int
+    size: int
+
+
+class ReferenceAudioRegistry:
+    """参考音频登记表。
+
+    同一个说话人的参考音频在每次合成时都会被传入，登记表按文件的
+    (mtime, size) 判断是否需要重新处理：文件未改动时直接复用上次的
+    规范化路径、内容指纹和校验结果，不再重复读取和哈希整个文件。
+
+    规范化路径保证 `./voice_samples/a.wav` 与 `voice_samples/a.wav`
+    以同一个路径发送给后端，命中 GPT-SoVITS 按路径缓存的参考音频特征；
+    内容指纹则用作合成结果缓存键的一部分。
+
+    只在本机能访问到的文件才会登记；不存在于本机的路径（例如只存在于
+    远程 GPT-SoVITS 服务器上的文件）原样透传，由服务端负责读取。
+    时长只对 WAV 文件校验，mp3/flac/ogg 等其它格式交给服务端解码。
+    校验失败的结果同样按 (路径, mtime, size) 缓存，文件未改动时直接抛出
+    上次的错误，不再重复读取。
+
+    Args:
+        min_duration (float, optional): 参考音频最短时长（秒）
+        max_duration (float, optional): 参考音频最长时长（秒）
+    """
+
+    def __init__(
+        self,
+        min_duration: float = MIN_DURATION,
+        max_duration: float = MAX_DURATION,
+    ) -> None:
+        self.min_duration = min_duration
+        self.max_duration = max_duration
+        self._entries: dict[str, ReferenceAudio] = {}
+        self._failures: dict[tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, ref_audio_path: str) -> ReferenceAudio | None:
+        """登记并返回参考音频，本机不存在该文件时返回 None。
+
+        Args:
+            ref_audio_path (str): 参考音频路径
+
+        Returns:
+            ReferenceAudio | None: 登记结果
+
+        Raises:
+            ValueError: WAV 文件已损坏或时长超出允许范围
+        """
+        if not ref_audio_path or not os.path.isfile(ref_audio_path):
+            return None
+        path = os.path.realpath(ref_audio_path)
+        stat = os.stat(path)
+
+        failure_key = (path, stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            failure = self._failures.get(failure_key)
+        if entry is not None and (entry.mtime_ns, entry.size) == failure_key[1:]:
+            return entry
+        if failure is not None:
+            raise ValueError(failure)
+
+        try:
+            duration = self._validate(path)
+        except ValueError as e:
+            with self._lock:
+                self._failures[failure_key] = str(e)
+            raise
+        entry = ReferenceAudio(
+            path=path,
+            fingerprint=_file_sha256(path),
+            duration=duration,
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+        )
+        with self._lock:
+            self._entries[path] = entry
+        return entry
+
+    def normalize_path(self, ref_audio_path: str) -> str:
+        """返回应当发送给后端的参考音频路径。"""
+        entry = self.resolve(ref_audio_path)
+        return entry.path if entry is not None else ref_audio_path
+
+    def _validate(self, path: str) -> float | None:
+        if not _is_wav(path):
+            return None
+        try:
+            with wave.open(path, "rb") as reader:
+                duration = reader.getnframes() / reader.getframerate()
+        except (wave.Error, EOFError) as e:
+            raise ValueError(f"参考音频不是有效的 WAV 文件：{path}（{e}）") from e
+        if not self.min_duration <= duration <= self.max_duration:
+            raise ValueError(
+                f"参考音频时长 {duration:.1f} 秒超出范围，"
+                f"需在 {self.min_duration:g}~{self.max_duration:g} 秒之间：{path}"
+            )
+        return duration
+
+
+def _is_wav(path: str) -> bool:
+    with open(path, "rb") as f:
+        header = f.read(12)
+    return header[:4] == b"RIFF" and header[8:12] == b"WAVE"
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+_default_registry = ReferenceAudioRegistry()
+
+
+def get_default_registry() -> ReferenceAudioRegistry:
+    """获取进程内共享的参考音频登记表。"""
+    return _default_registry
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""TTS 后端的容错策略：指数退避重试与熔断器。"""
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterator
+
+import httpx
+import requests
+
+
+class CircuitOpenError(Exception):
+    """熔断器处于打开状态，请求被直接拒绝。"""
+
+    def __init__(self, api_url: str, retry_after: float) -> None:
+        super().__init__(
+            f"GPT-SoVITS 后端 {api_url} 连续失败已熔断，{retry_after:.1f} 秒后再尝试"
+        )
+        self.api_url = api_url
+        self.retry_after = retry_after
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """判断异常是否属于后端的临时故障（连接失败、超时、5xx、429）。
+
+    4xx 等由请求本身引起的错误重试也不会成功，不计入后端故障。
+    """
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    if isinstance(error, (httpx.TransportError,)):
+        return True
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        return _is_transient_status(error.response.status_code)
+    if isinstance(error, httpx.HTTPStatusError):
+        return _is_transient_status(error.response.status_code)
+    return False
+
+
+def is_backend_failure(error: BaseException) -> bool:
+    """判断异常是否说明后端本身不可用（临时故障或已熔断）。
+
+    只有这类失败才值得改用其他后端重试或对冲；请求本身有误时换一个
+    后端也会得到同样的错误，只会加倍负载。
+    """
+    return isinstance(error, CircuitOpenError) or is_transient_error(error)
+
+
+def _is_transient_status(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """带随机抖动的指数退避重试策略。
+
+    第 n 次重试前等待 `uniform(0, min(max_delay, base_delay * multiplier ** n))` 秒
+    （full jitter），避免大量客户端在后端恢复的瞬间同时重试。
+
+    Attributes:
+        max_attempts (int): 最多尝试次数（含第一次），为 1 时不重试
+        base_delay (float): 首次重试的退避上限（秒）
+        max_delay (float): 单次退避的最大上限（秒）
+        multiplier (float): 每次重试退避上限的增长倍数
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 0.2
+    max_delay: float = 5.0
+    multiplier: float = 2.0
+
+    def backoff(self, retry_index: int) -> float:
+        """第 `retry_index` 次重试（从 0 开始）前的等待时间。"""
+        ceiling = min(self.max_delay, self.base_delay * self.multiplier ** retry_index)
+        return random.uniform(0, ceiling)
+
+    def delays(self) -> Iterator[float]:
+        """依次产出每次重试前的等待时间，共 `max_attempts - 1` 个。"""
+        for retry_index in range(self.max_attempts - 1):
+            yield self.backoff(retry_index)
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+
+class CircuitBreaker:
+    """单个后端的熔断器。
+
+    - closed：正常放行，连续失败达到 `failure_threshold` 次后转为 open
+    - open：直接抛出 `CircuitOpenError`，不再请求后端；
+      经过 `recovery_timeout` 秒后转为 half-open
+    - half-open：只放行一个探测请求，成功则恢复 closed，失败则重新 open
+
+    Args:
+        api_url (str): 后端地址，仅用于错误信息
+        failure_threshold (int, optional): 触发熔断的连续失败次数
+        recovery_timeout (float, optional): 熔断后多久允许探测（秒）
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        api_url: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+    ) -> None:
+        self.api_url = api_url
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def before_request(self) -> None:
+        """请求前调用，熔断时抛出 `CircuitOpenError`。"""
+        with self._lock:
+            self._refresh()
+            if self._state == self.CLOSED:
+                return
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            retry_after = max(0.0, self._opened_at + self.recovery_timeout - time.monotonic())
+            raise CircuitOpenError(self.api_url, retry_after)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """请求被取消、无法判断后端状态时调用，只释放半开状态下的探测名额。"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _refresh(self) -> None:
+        if (
+            self._state == self.OPEN
+            and time.monotonic() - self._opened_at >= self.recovery_timeout
+        ):
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+
+class CircuitBreakerRegistry:
+    """按后端地址维护熔断器，`failure_threshold <= 0` 时不熔断。"""
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, api_url: str) -> CircuitBreaker | None:
+        if self.failure_threshold <= 0:
+            return None
+        with self._lock:
+            breaker = self._breakers.get(api_url)
+            if breaker is None:
+                breaker = CircuitBreaker(api_url, self.failure_threshold, self.recovery_timeout)
+                self._breakers[api_url] = breaker
+            return breaker
+
+    def allows(self, api_url: str) -> bool:
+        """后端的熔断器是否未打开（用于负载均衡时跳过已熔断的实例）。"""
+        breaker = self.get(api_url)
+        return breaker is None or breaker.state != CircuitBreaker.OPEN
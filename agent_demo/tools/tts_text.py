@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""TTS 文本切分：按句子 / 标点边界把长文本切成适合并行合成的片段。"""
+import re
+import textwrap
+
+# 每个片段的默认最大长度。中日粤按字符计，英文按字母计（约 30-40 个单词）
+DEFAULT_MAX_CHARS = {"zh": 60, "ja": 60, "yue": 60, "en": 200}
+
+_CJK_SENTENCE = re.compile(r"(?<=[。！？；…!?;])\s*")
+_CJK_CLAUSE = re.compile(r"(?<=[，、：,:])\s*")
+_EN_SENTENCE = re.compile(r"(?<=[.!?;])\s+")
+_EN_CLAUSE = re.compile(r"(?<=[,:])\s+")
+
+
+def split_text(
+    text: str,
+    lang: str = "zh",
+    max_chars: int | None = None,
+) -> list[str]:
+    """把文本切分成不超过 `max_chars` 的片段，尽量在句子边界处断开。
+
+    切分分三步：
+    1. 按句末标点（。！？；… 或英文 . ! ? ;）切成句子
+    2. 超长的句子再按逗号、顿号、冒号等分句标点切开，仍然超长则硬切
+       （英文在空格处断开，不会切断单词）
+    3. 把相邻的短片段重新合并到接近 `max_chars`，避免产生大量极短请求
+
+    Args:
+        text (str): 待切分的文本
+        lang (str, optional): 文本语言，"zh" / "ja" / "yue" / "en"
+        max_chars (int | None, optional): 片段最大长度，默认按语言取值
+
+    Returns:
+        list[str]: 按原文顺序排列的片段；文本不超过 `max_chars` 时只有一个片段
+    """
+    text = text.strip()
+    if max_chars is None:
+        max_chars = DEFAULT_MAX_CHARS.get(lang, DEFAULT_MAX_CHARS["zh"])
+    if len(text) <= max_chars:
+        return [text] if text else []
+
+    is_en = lang == "en"
+    sentence_pattern = _EN_SENTENCE if is_en else _CJK_SENTENCE
+    clause_pattern = _EN_CLAUSE if is_en else _CJK_CLAUSE
+    separator = " " if is_en else ""
+
+    pieces: list[str] = []
+    for sentence in _split(sentence_pattern, text):
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+            continue
+        for clause in _split(clause_pattern, sentence):
+            if len(clause) <= max_chars:
+                pieces.append(clause)
+            elif is_en:
+                pieces.extend(textwrap.wrap(clause, max_chars))
+            else:
+                pieces.extend(
+                    clause[i:i + max_chars] for i in range(0, len(clause), max_chars)
+                )
+
+    segments: list[str] = []
+    for piece in pieces:
+        if segments and len(segments[-1]) + len(separator) + len(piece) <= max_chars:
+            segments[-1] += separator + piece
+        else:
+            segments.append(piece)
+    return segments
+
+
+def _split(pattern: re.Pattern, text: str) -> list[str]:
+    return [part.strip() for part in pattern.split(text) if part.strip()]
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""WAV 辅助函数。"""
+import io
+import struct
+import wave
+from typing import Iterable, Iterator
+
+
+def concat_wav(segments: list[bytes]) -> bytes:
+    """按顺序拼接多段 WAV 音频。
+
+    只拼接 PCM 帧数据，不做任何重新编码；所有片段的声道数、采样位宽和
+    采样率必须一致（同一个 GPT-SoVITS 模型的输出总是一致的）。
+
+    Args:
+        segments (list[bytes]): 完整的 WAV 文件数据（含文件头）
+
+    Returns:
+        bytes: 拼接后的 WAV 文件数据
+
+    Raises:
+        ValueError: 片段为空或音频参数不一致
+    """
+    if not segments:
+        raise ValueError("没有可拼接的音频片段")
+    if len(segments) == 1:
+        return segments[0]
+
+    frames: list[bytes] = []
+    params = None
+    for index, segment in enumerate(segments):
+        with wave.open(io.BytesIO(segment), "rb") as reader:
+            segment_params = (
+                reader.getnchannels(),
+                reader.getsampwidth(),
+                reader.getframerate(),
+            )
+            if params is None:
+                params = segment_params
+            elif segment_params != params:
+                raise ValueError(
+                    f"第 {index} 段音频参数 {segment_params} 与第 0 段 {params} 不一致"
+                )
+            frames.append(reader.readframes(reader.getnframes()))
+
+    output = io.BytesIO()
+    with wave.open(output, "wb") as writer:
+        writer.setnchannels(params[0])
+        writer.setsampwidth(params[1])
+        writer.setframerate(params[2])
+        writer.writeframes(b"".join(frames))
+    return output.getvalue()
+
+
+def split_wav_stream(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """把流式 WAV 数据重新切分为各自独立的 WAV 文件。
+
+    流式响应只有第一个分块带 WAV 头（且其中的长度字段通常无效），之后的
+    分块都是裸 PCM。这里解析一次文件头，再给每个分块加上长度正确的文件头，
+    分块边界按采样帧对齐，每个产出的分块都能单独播放。
+
+    Args:
+        chunks (Iterable[bytes]): 原始的流式分块，第一个分块以 WAV 头开始
+
+    Yields:
+        bytes: 完整的 WAV 文件数据（含文件头）
+
+    Raises:
+        ValueError: 数据不是 PCM WAV，或文件头不完整
+    """
+    buffer = b""
+    params = None
+    for chunk in chunks:
+        buffer += chunk
+        if params is None:
+            header = _parse_wav_header(buffer)
+            if header is None:
+                continue
+            params, offset = header
+            buffer = buffer[offset:]
+        frame_size = params[0] * params[1]
+        usable = len(buffer) - len(buffer) % frame_size
+        if usable:
+            yield _wrap_pcm(buffer[:usable], params)
+            buffer = buffer[usable:]
+    if params is None and buffer:
+        raise ValueError("WAV 文件头不完整")
+
+
+def _parse_wav_header(data: bytes) -> tuple[tuple[int, int, int], int] | None:
+    """解析 WAV 文件头。
+
+    Returns:
+        tuple[tuple[int, int, int], int] | None: ((声道数, 采样位宽, 采样率),
+            PCM 数据的起始偏移)；数据还不够解析完整文件头时返回 None
+    """
+    if len(data) < 12:
+        return None
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("不是 WAV 数据")
+    params = None
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id, size = struct.unpack_from("<4sI", data, pos)
+        if chunk_id == b"data":
+            if params is None:
+                raise ValueError("WAV 数据块之前缺少 fmt 块")
+            return params, pos + 8
+        if chunk_id == b"fmt ":
+            if pos + 24 > len(data):
+                return None
+            audio_format, channels, rate, _, _, bits = struct.unpack_from(
+                "<HHIIHH", data, pos + 8,
+            )
+            if audio_format != 1:
+                raise ValueError(f"只支持 PCM 编码的 WAV，实际格式为 {audio_format}")
+            params = (channels, bits // 8, rate)
+        pos += 8 + size + (size & 1)
+    return None
+
+
+def _wrap_pcm(pcm: bytes, params: tuple[int, int, int]) -> bytes:
+    output = io.BytesIO()
+    with wave.open(output, "wb") as writer:
+        writer.setnchannels(params[0])
+        writer.setsampwidth(params[1])
+        writer.setframerate(params[2])
+        writer.writeframes(pcm)
+    return output.getvalue()
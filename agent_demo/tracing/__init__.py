@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""Latency tracing for agent_demo agents."""
+from .exporters import export_chrome_trace, export_otel_jsonl
+from .instrument import instrument_agent
+from .tracer import (
+    Span,
+    Tracer,
+    current_span,
+    get_default_tracer,
+    set_default_tracer,
+    summarize_spans,
+    traced,
+)
+
+__all__ = [
+    "Span",
+    "Tracer",
+    "current_span",
+    "export_chrome_trace",
+    "export_otel_jsonl",
+    "get_default_tracer",
+    "instrument_agent",
+    "set_default_tracer",
+    "summarize_spans",
+    "traced",
+]
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""把 span 导出为 Chrome trace JSON 或 OpenTelemetry 兼容的 JSON Lines。"""
+import json
+import os
+from pathlib import Path
+from typing import Any, Iterable
+
+from .tracer import Span, Tracer
+
+
+def export_chrome_trace(tracer: Tracer, path: str | os.PathLike) -> Path:
+    """导出为 Chrome trace 格式，可以用 chrome://tracing 或 https://ui.perfetto.dev 打开。
+
+    每个 asyncio 任务显示为一行，并发的工具调用会并排显示。
+
+    Args:
+        tracer (Tracer): 追踪器
+        path (str | os.PathLike): 输出文件路径
+
+    Returns:
+        Path: 输出文件路径
+    """
+    pid = os.getpid()
+    events = [
+        {
+            "name": span.name,
+            "cat": span.name.split(".", 1)[0],
+            "ph": "X",
+            "ts": (span.start_ns + tracer.epoch_offset_ns) / 1000,
+            "dur": (span.end_ns - span.start_ns) / 1000,
+            "pid": pid,
+            "tid": span.lane,
+            "args": _chrome_args(span),
+        }
+        for span in _finished(tracer.spans)
+    ]
+    return _write(path, json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}))
+
+
+def export_otel_jsonl(tracer: Tracer, path: str | os.PathLike, service_name: str = "agent_demo") -> Path:
+    """导出为 OpenTelemetry span 格式（字段与 OTLP/JSON 一致），每行一个 span。
+
+    Args:
+        tracer (Tracer): 追踪器
+        path (str | os.PathLike): 输出文件路径
+        service_name (str, optional): 写入每个 span 的 `service.name` 资源属性
+
+    Returns:
+        Path: 输出文件路径
+    """
+    lines = []
+    for span in _finished(tracer.spans):
+        record = {
+            "resource": {"attributes": _otel_attributes({"service.name": service_name})},
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "parentSpanId": span.parent_id or "",
+            "name": span.name,
+            "kind": "SPAN_KIND_INTERNAL",
+            "startTimeUnixNano": str(span.start_ns + tracer.epoch_offset_ns),
+            "endTimeUnixNano": str(span.end_ns + tracer.epoch_offset_ns),
+            "attributes": _otel_attributes(span.attributes),
+            "status": (
+                {"code": "STATUS_CODE_ERROR", "message": span.error}
+                if span.error else {"code": "STATUS_CODE_OK"}
+            ),
+        }
+        lines.append(json.dumps(record, ensure_ascii=False))
+    return _write(path, "".join(f"{line}\n" for line in lines))
+
+
+def _finished(spans: Iterable[Span]) -> list[Span]:
+    return [span for span in spans if span.end_ns is not None]
+
+
+def _chrome_args(span: Span) -> dict[str, Any]:
+    args = {key: _plain(value) for key, value in span.attributes.items()}
+    if span.error:
+        args["error"] = span.error
+    return args
+
+
+def _otel_attributes(attributes: dict[str, Any]) -> list[dict[str, Any]]:
+    result = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        result.append({"key": key, "value": typed})
+    return result
+
+
+def _plain(value: Any) -> Any:
+    return value if isinstance(value, (bool, int, float, str)) or value is None else str(value)
+
+
+def _write(path: str | os.PathLike, text: str) -> Path:
+    path = Path(path).expanduser()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""给已有的智能体挂上追踪：回复、格式化、模型调用、工具执行和记忆写入。"""
+import functools
+import inspect
+import time
+from typing import TYPE_CHECKING, Any, AsyncGenerator, Callable
+
+from .tracer import Span, Tracer, get_default_tracer
+
+if TYPE_CHECKING:
+    from agentscope.agent import AgentBase
+
+_TRACED_FLAG = "__agent_demo_traced__"
+
+
+class _TracedModel:
+    """记录每次模型调用的代理，其余属性（stream、model_name 等）原样转发。"""
+
+    def __init__(self, model: Any, tracer: Tracer) -> None:
+        self._model = model
+        self._tracer = tracer
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._model, name)
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        span = self._tracer.start_span(
+            "model",
+            model_name=getattr(self._model, "model_name", type(self._model).__name__),
+            stream=bool(getattr(self._model, "stream", False)),
+        )
+        try:
+            response = await self._model(*args, **kwargs)
+        except BaseException as e:
+            self._tracer.end_span(span, e)
+            raise
+        if inspect.isasyncgen(response):
+            return _trace_stream(self._tracer, span, response, _record_chunk)
+        _record_usage(span, response)
+        self._tracer.end_span(span)
+        return response
+
+
+def instrument_agent(agent: "AgentBase", tracer: Tracer | None = None) -> Tracer:
+    """为智能体的各个阶段记录 span，原地修改并返回使用的追踪器。
+
+    记录的 span（存在对应属性时）：
+
+    - `reply`：一次完整回复，其余 span 都是它的子 span
+    - `reasoning` / `acting` / `summarizing`：ReAct 的推理、工具调用、总结步骤
+    - `formatter.format`：把消息格式化为模型输入
+    - `model`：模型调用，流式响应计到最后一块收完为止；附带 `ttft`
+      （首块耗时，秒）和 `input_tokens` / `output_tokens`
+    - `tool`：一次工具调用，附带工具名，流式结果计到最后一块
+    - `memory.add` / `memory.add_many`：写入记忆
+
+    formatter 等组件被多个智能体共享时只会包装一次，span 的父子关系由调用
+    时的上下文决定，仍然归属正确的智能体。
+
+    Args:
+        agent (AgentBase): 要追踪的智能体
+        tracer (Tracer | None, optional): 追踪器，默认使用默认追踪器
+
+    Returns:
+        Tracer: 使用的追踪器
+    """
+    tracer = tracer or get_default_tracer()
+    _wrap_method(agent, "reply", tracer, agent=getattr(agent, "name", ""))
+    for step in ("_reasoning", "_acting", "_summarizing"):
+        _wrap_method(agent, step, tracer, name=step.lstrip("_"))
+
+    formatter = getattr(agent, "formatter", None)
+    if formatter is not None:
+        _wrap_method(formatter, "format", tracer, name="formatter.format")
+
+    memory = getattr(agent, "memory", None)
+    if memory is not None:
+        _wrap_method(memory, "add", tracer, name="memory.add")
+        _wrap_method(memory, "add_many", tracer, name="memory.add_many")
+
+    model = getattr(agent, "model", None)
+    if model is not None and not isinstance(model, _TracedModel):
+        agent.model = _TracedModel(model, tracer)
+
+    toolkit = getattr(agent, "toolkit", None)
+    if toolkit is not None and hasattr(toolkit, "call_tool_function"):
+        _wrap_tool_calls(toolkit, tracer)
+    return tracer
+
+
+def _wrap_method(
+    obj: Any,
+    attr: str,
+    tracer: Tracer,
+    name: str | None = None,
+    **attributes: Any,
+) -> None:
+    method = getattr(obj, attr, None)
+    if method is None or getattr(method, _TRACED_FLAG, False):
+        return
+
+    @functools.wraps(method)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with tracer.span(name or attr, **attributes):
+            return await method(*args, **kwargs)
+
+    setattr(wrapper, _TRACED_FLAG, True)
+    setattr(obj, attr, wrapper)
+
+
+def _wrap_tool_calls(toolkit: Any, tracer: Tracer) -> None:
+    call_tool_function = toolkit.call_tool_function
+    if getattr(call_tool_function, _TRACED_FLAG, False):
+        return
+
+    @functools.wraps(call_tool_function)
+    async def wrapper(tool_call: dict, *args: Any, **kwargs: Any) -> Any:
+        span = tracer.start_span("tool", tool=tool_call.get("name", ""))
+        try:
+            stream = await call_tool_function(tool_call, *args, **kwargs)
+        except BaseException as e:
+            tracer.end_span(span, e)
+            raise
+        return _trace_stream(tracer, span, stream, _record_tool_chunk)
+
+    setattr(wrapper, _TRACED_FLAG, True)
+    toolkit.call_tool_function = wrapper
+
+
+async def _trace_stream(
+    tracer: Tracer,
+    span: Span,
+    stream: AsyncGenerator,
+    on_item: Callable[[Span, Any], None],
+) -> AsyncGenerator:
+    """转发流式结果，收完最后一块（或提前关闭）时结束 span。"""
+    error = None
+    try:
+        async for item in stream:
+            on_item(span, item)
+            yield item
+    except GeneratorExit:
+        raise
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        tracer.end_span(span, error)
+
+
+def _record_chunk(span: Span, chunk: Any) -> None:
+    if "ttft" not in span.attributes:
+        span.set(ttft=(time.perf_counter_ns() - span.start_ns) / 1e9)
+    _record_usage(span, chunk)
+
+
+def _record_usage(span: Span, response: Any) -> None:
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        span.set(input_tokens=usage.input_tokens, output_tokens=usage.output_tokens)
+
+
+def _record_tool_chunk(span: Span, chunk: Any) -> None:
+    if getattr(chunk, "is_interrupted", False):
+        span.set(interrupted=True)
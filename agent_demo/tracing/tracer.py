@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""轻量的 span 记录器：单调时钟计时，通过 contextvars 自动维护父子关系。"""
+import contextlib
+import contextvars
+import functools
+import inspect
+import os
+import statistics
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator
+
+_current_span: contextvars.ContextVar["Span | None"] = contextvars.ContextVar(
+    "agent_demo_current_span",
+    default=None,
+)
+
+
+@dataclass
+class Span:
+    """一段被记录的操作。
+
+    时间均为 `time.perf_counter_ns()` 的读数，只能相互比较；导出时由
+    `Tracer.epoch_offset_ns` 换算为 Unix 时间。
+
+    Attributes:
+        name (str): 操作名，例如 `model`、`formatter.format`
+        trace_id (str): 所属调用链的 id（32 位十六进制）
+        span_id (str): 本 span 的 id（16 位十六进制）
+        parent_id (str | None): 父 span 的 id，根 span 为 None
+        start_ns (int): 开始时间
+        end_ns (int | None): 结束时间，未结束时为 None
+        lane (int): 开始时所在的 asyncio 任务（或线程）的编号，用于 Chrome trace 分行显示
+        attributes (dict[str, Any]): 附加信息，例如 token 数、工具名
+        error (str | None): 操作抛出的异常，正常结束时为 None
+    """
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start_ns: int
+    end_ns: int | None = None
+    lane: int = 0
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def duration(self) -> float | None:
+        """耗时（秒），未结束时为 None。"""
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1e9
+
+    def set(self, **attributes: Any) -> None:
+        """添加或覆盖附加信息。"""
+        self.attributes.update(attributes)
+
+
+class Tracer:
+    """记录 span 的追踪器。
+
+    `span` 既可以用作上下文管理器，也可以通过 `traced` 装饰函数；嵌套的
+    span 通过 contextvars 自动成为子 span，并发的 asyncio 任务各自维护
+    自己的当前 span，互不干扰。已结束的 span 保存在 `spans` 中，可以用
+    `tracing.exporters` 导出为 Chrome trace 或 OpenTelemetry 格式。
+
+    Args:
+        max_spans (int | None, optional): 最多保留的已结束 span 数，超出时丢弃最早的；
+            None 表示不限
+    """
+
+    def __init__(self, max_spans: int | None = 100_000) -> None:
+        self.max_spans = max_spans
+        self.spans: list[Span] = []
+        self.epoch_offset_ns = time.time_ns() - time.perf_counter_ns()
+        self._lanes: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def start_span(self, name: str, **attributes: Any) -> Span:
+        """开始一个 span，父 span 为当前上下文中的 span，但不把它设为当前 span。
+
+        适用于跨越多次 yield 的操作（例如流式响应），需要手动调用 `end_span`。
+        """
+        parent = _current_span.get()
+        return Span(
+            name=name,
+            trace_id=parent.trace_id if parent else os.urandom(16).hex(),
+            span_id=os.urandom(8).hex(),
+            parent_id=parent.span_id if parent else None,
+            start_ns=time.perf_counter_ns(),
+            lane=self._lane(),
+            attributes=attributes,
+        )
+
+    def end_span(self, span: Span, error: BaseException | None = None) -> None:
+        """结束 span 并记录下来。"""
+        span.end_ns = time.perf_counter_ns()
+        if error is not None:
+            span.error = f"{type(error).__name__}: {error}"
+        with self._lock:
+            self.spans.append(span)
+            if self.max_spans is not None and len(self.spans) > self.max_spans:
+                del self.spans[: len(self.spans) - self.max_spans]
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """记录一段代码的耗时，期间新开始的 span 都是它的子 span。"""
+        span = self.start_span(name, **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            self.end_span(span, e)
+            raise
+        else:
+            self.end_span(span)
+        finally:
+            _current_span.reset(token)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+
+    def _lane(self) -> int:
+        # 没有导入过 asyncio 就不可能在协程中，不为此导入 asyncio（启动耗时可观）
+        asyncio = sys.modules.get("asyncio")
+        try:
+            key = id(asyncio.current_task()) if asyncio else threading.get_ident()
+        except RuntimeError:
+            key = threading.get_ident()
+        with self._lock:
+            return self._lanes.setdefault(key, len(self._lanes))
+
+
+def current_span() -> Span | None:
+    """返回当前上下文中的 span。"""
+    return _current_span.get()
+
+
+def traced(
+    name: str | Callable[..., Any] | None = None,
+    tracer: "Tracer | None" = None,
+    **attributes: Any,
+) -> Callable[..., Any]:
+    """把函数的每次调用记录为一个 span，支持同步和异步函数。
+
+    可以直接使用 `@traced`，也可以指定名字 `@traced("reply", agent="Friday")`。
+
+    Args:
+        name (str | None, optional): span 名，默认为函数的 `__qualname__`
+        tracer (Tracer | None, optional): 使用的追踪器，默认为调用时的默认追踪器
+        **attributes: 附加到每个 span 上的信息
+
+    Returns:
+        Callable[..., Any]: 装饰器，或直接装饰后的函数
+    """
+    if callable(name):
+        return traced()(name)
+
+    def decorate(func: Callable[..., Any]) -> Callable[..., Any]:
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with (tracer or get_default_tracer()).span(span_name, **attributes):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with (tracer or get_default_tracer()).span(span_name, **attributes):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def summarize_spans(spans: list[Span]) -> dict[str, dict[str, float]]:
+    """按 span 名汇总耗时，用于找出最耗时的阶段。
+
+    Returns:
+        dict[str, dict[str, float]]: 每个 span 名的 count、total、mean、p95（秒），
+            按 total 从大到小排列
+    """
+    durations: dict[str, list[float]] = {}
+    for span in spans:
+        if span.duration is not None:
+            durations.setdefault(span.name, []).append(span.duration)
+    summary = {}
+    for span_name, values in durations.items():
+        p95 = (
+            statistics.quantiles(values, n=20, method="inclusive")[18]
+            if len(values) > 1 else values[0]
+        )
+        summary[span_name] = {
+            "count": len(values),
+            "total": sum(values),
+            "mean": statistics.fmean(values),
+            "p95": p95,
+        }
+    return dict(sorted(summary.items(), key=lambda item: item[1]["total"], reverse=True))
+
+
+_default_tracer = Tracer()
+_default_tracer_lock = threading.Lock()
+
+
+def get_default_tracer() -> Tracer:
+    """获取进程内共享的默认追踪器。"""
+    return _default_tracer
+
+
+def set_default_tracer(tracer: Tracer) -> None:
+    """替换默认追踪器。"""
+    global _default_tracer
+    with _default_tracer_lock:
+        _default_tracer = tracer
@@ -10,21 +10,22 @@ from agentscope.message import Msg
 from agentscope.model import DashScopeChatModel
 from agentscope.tool import Toolkit
 
-from tools.gpt_sovits_tts import gpt_sovits_text_to_audio
+from pipeline import FanoutRunner
+from tools.gpt_sovits_tts import gpt_sovits_text_to_audio_async
+from tools.tts_reference import get_default_registry
 
 
-async def main() -> None:
-    """创建一个支持语音克隆的 ReAct 智能体并运行示例对话。"""
-    # 准备工具
+def create_jarvis() -> ReActAgent:
+    """创建一个支持语音克隆的 ReAct 智能体。"""
+    # 准备工具（使用异步版本，合成期间不阻塞事件循环）
     toolkit = Toolkit()
-    toolkit.register_tool_function(gpt_sovits_text_to_audio)
+    toolkit.register_tool_function(gpt_sovits_text_to_audio_async)
 
-    # 创建 Agent
-    jarvis = ReActAgent(
+    return ReActAgent(
         name="Jarvis",
         sys_prompt=(
             "你是一个名为 Jarvis 的智能助手。"
-            "当用户要求语音回复时，请使用 gpt_sovits_text_to_audio 工具生成语音。"
+            "当用户要求语音回复时，请使用 gpt_sovits_text_to_audio_async 工具生成语音。"
             "语音合成需要提供参考音频路径和对应的参考文本。"
         ),
         model=DashScopeChatModel(
@@ -37,10 +38,21 @@ async def main() -> None:
         memory=InMemoryMemory(),
     )
 
+
+async def main() -> None:
+    """并发运行两个互不相关的语音合成示例。"""
     # 配置参考音频（用户上传的声音样本）
     ref_audio_path = "./voice_samples/my_voice.wav"
     prompt_text = "这是我的声音样本，用于语音克隆。"
 
+    # 提前登记参考音频：只校验、哈希一次，后续每次合成直接复用
+    try:
+        get_default_registry().resolve(ref_audio_path)
+    except ValueError as e:
+        print(f"参考音频不可用：{e}")
+        print("请换一段 3~10 秒的录音后重试。")
+        return
+
     # 示例对话 1：简单语音合成
     msg1 = Msg(
         name="user",
@@ -51,11 +63,6 @@ async def main() -> None:
         role="user",
     )
 
-    print("=" * 50)
-    print("示例 1：简单语音合成")
-    print("=" * 50)
-    await jarvis(msg1)
-
     # 示例对话 2：长文本语音合成
     msg2 = Msg(
         name="user",
@@ -68,10 +75,18 @@ async def main() -> None:
         role="user",
     )
 
-    print("\n" + "=" * 50)
-    print("示例 2：长文本语音合成")
-    print("=" * 50)
-    await jarvis(msg2)
+    # 两个示例互不依赖，各用一个智能体实例同时处理，总耗时约为较慢的一个
+    runner = FanoutRunner(create_jarvis, pool_size=2, timeout=300)
+    results = await runner.run([msg1, msg2])
+
+    for title, result in zip(["示例 1：简单语音合成", "示例 2：长文本语音合成"], results):
+        print("\n" + "=" * 50)
+        print(f"{title}（耗时 {result.latency:.1f} 秒）")
+        print("=" * 50)
+        if result.ok:
+            print(result.reply.get_text_content())
+        else:
+            print(f"失败：{result.error!r}")
 
 
 if __name__ == "__main__":